@@ -23,13 +23,16 @@ from .config.static import *
 from .train import loss, train
 from . import adapt
 from . import baseline
+from . import benchmark
 from . import convert
 from . import data
 from . import edit
+from . import edit_and_synthesize
 from . import evaluate
 from . import load
 from . import model
 from . import partition
 from . import plot
 from . import preprocess
+from . import serve
 from . import synthesize
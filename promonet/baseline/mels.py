@@ -1,5 +1,3 @@
-from pathlib import Path
-
 import torch
 import torchaudio
 import torchutil
@@ -50,24 +48,10 @@ def from_features(
     device = spectrogram.device
 
     with torchutil.time.context('load'):
-
-        # Cache model
-        if (
-            not hasattr(from_features, 'model') or
-            from_features.checkpoint != checkpoint or
-            from_features.device != device
-        ):
-            model = promonet.model.MelGenerator().to(device)
-            if type(checkpoint) is str:
-                checkpoint = Path(checkpoint)
-            if checkpoint.is_dir():
-                checkpoint = torchutil.checkpoint.latest_path(
-                    checkpoint,
-                    'generator-*.pt')
-            model, *_ = torchutil.checkpoint.load(checkpoint, model)
-            from_features.model = model
-            from_features.checkpoint = checkpoint
-            from_features.device = device
+        model = promonet.model.cache.generators(
+            checkpoint,
+            device,
+            promonet.model.MelGenerator)
 
     with torchutil.time.context('generate'):
 
@@ -93,8 +77,8 @@ def from_features(
             device=device)
 
         # Reconstruct
-        with torchutil.inference.context(from_features.model):
-            return from_features.model(
+        with torchutil.inference.context(model):
+            return model(
                 spectrogram[None],
                 speakers,
                 spectral_balance_ratio,
@@ -0,0 +1,16 @@
+from .core import *
+from . import batch
+from . import compiled
+from . import fused
+from . import grid
+from . import harmonics
+from . import latency
+from . import limiter
+from . import loudness
+from . import preprocess
+from . import serve
+from . import session
+from . import speaker
+from . import streaming
+from . import synthesize
+from . import workers
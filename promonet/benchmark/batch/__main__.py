@@ -0,0 +1,53 @@
+from pathlib import Path
+
+import yapecs
+
+import promonet
+
+
+###############################################################################
+# Benchmark batched synthesis
+###############################################################################
+
+
+def parse_args():
+    """Parse command-line arguments"""
+    parser = yapecs.ArgumentParser(
+        description='Benchmark batched against per-file synthesis')
+    parser.add_argument(
+        '--num_files',
+        type=int,
+        default=64,
+        help='The number of random utterances to synthesize')
+    parser.add_argument(
+        '--min_frames',
+        type=int,
+        default=100,
+        help='The minimum utterance length in frames')
+    parser.add_argument(
+        '--max_frames',
+        type=int,
+        default=800,
+        help='The maximum utterance length in frames')
+    parser.add_argument(
+        '--batch_frames',
+        type=int,
+        nargs='+',
+        default=[2048, 8192, 32768],
+        help='The padded frame budgets per batch to benchmark')
+    parser.add_argument(
+        '--checkpoint',
+        type=Path,
+        help='The generator checkpoint')
+    parser.add_argument(
+        '--output_file',
+        type=Path,
+        help='Optional JSON file to save results')
+    parser.add_argument(
+        '--gpu',
+        type=int,
+        help='The GPU index; defaults to CPU')
+    return parser.parse_args()
+
+
+promonet.benchmark.batch.from_random(**vars(parse_args()))
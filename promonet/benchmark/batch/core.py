@@ -0,0 +1,84 @@
+import json
+import tempfile
+from pathlib import Path
+
+import torch
+
+import promonet
+
+
+###############################################################################
+# Benchmark batched synthesis
+###############################################################################
+
+
+def from_random(
+    num_files=64,
+    min_frames=100,
+    max_frames=800,
+    batch_frames=[2048, 8192, 32768],
+    checkpoint=None,
+    output_file=None,
+    gpu=None
+):
+    """Compare per-file and length-bucketed batched synthesis throughput"""
+    generator = torch.Generator().manual_seed(promonet.RANDOM_SEED)
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+
+        # Save random features in the layout produced by preprocessing
+        (
+            *files,
+            output_files,
+            speakers,
+            seconds
+        ) = promonet.benchmark.random_files(
+            directory,
+            num_files,
+            min_frames,
+            max_frames,
+            generator)
+
+        # Warm up model cache so that loading is not benchmarked
+        promonet.synthesize.from_files_to_files(
+            *[file[:1] for file in files],
+            output_files[:1],
+            speakers[:1],
+            checkpoint=checkpoint,
+            gpu=gpu)
+
+        # Benchmark per-file synthesis
+        results = {'seconds': seconds}
+        elapsed = promonet.benchmark.elapsed(
+            promonet.synthesize.from_files_to_files,
+            *files,
+            output_files,
+            speakers,
+            checkpoint=checkpoint,
+            gpu=gpu)
+        results['per-file'] = {'elapsed': elapsed, 'rtf': seconds / elapsed}
+
+        # Benchmark batched synthesis
+        for frames in batch_frames:
+            elapsed = promonet.benchmark.elapsed(
+                promonet.synthesize.from_files_to_files,
+                *files,
+                output_files,
+                speakers,
+                checkpoint=checkpoint,
+                gpu=gpu,
+                max_frames=frames)
+            results[f'batched-{frames}'] = {
+                'elapsed': elapsed,
+                'rtf': seconds / elapsed,
+                'speedup': results['per-file']['elapsed'] / elapsed}
+
+    # Print results and maybe save to disk
+    print(json.dumps(results, indent=4, sort_keys=True))
+    if output_file is not None:
+        with open(output_file, 'w') as file:
+            json.dump(results, file, indent=4, sort_keys=True)
+
+    return results
+
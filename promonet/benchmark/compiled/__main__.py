@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import yapecs
+
+import promonet
+
+
+###############################################################################
+# Benchmark compiled inference
+###############################################################################
+
+
+def parse_args():
+    """Parse command-line arguments"""
+    parser = yapecs.ArgumentParser(
+        description='Benchmark inference backends')
+    parser.add_argument(
+        '--frames',
+        type=int,
+        nargs='+',
+        default=[100, 400, 1600],
+        help='The utterance lengths in frames')
+    parser.add_argument(
+        '--repeats',
+        type=int,
+        default=10,
+        help='The number of timed repetitions per utterance length')
+    parser.add_argument(
+        '--backends',
+        nargs='+',
+        default=['eager', 'onnxruntime', 'torchscript'],
+        help='The inference backends to benchmark')
+    parser.add_argument(
+        '--checkpoint',
+        type=Path,
+        help='The generator checkpoint')
+    parser.add_argument(
+        '--output_file',
+        type=Path,
+        help='Optional JSON file to save results')
+    parser.add_argument(
+        '--gpu',
+        type=int,
+        help='The GPU index; defaults to CPU')
+    return parser.parse_args()
+
+
+promonet.benchmark.compiled.from_random(**vars(parse_args()))
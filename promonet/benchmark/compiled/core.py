@@ -0,0 +1,96 @@
+import json
+
+import torch
+
+import promonet
+
+
+###############################################################################
+# Benchmark compiled inference
+###############################################################################
+
+
+def from_random(
+    frames=[100, 400, 1600],
+    repeats=10,
+    backends=['eager', 'onnxruntime', 'torchscript'],
+    checkpoint=None,
+    output_file=None,
+    gpu=None
+):
+    """Compare startup time and steady-state RTF of inference backends
+
+    Startup is the time to load the generator and synthesize the first
+    utterance. Compiled startup is measured both before the compiled
+    artifact exists (cold) and when it is loaded from disk (warm). Any
+    existing compiled artifacts of the checkpoint are removed first.
+    """
+    generator = torch.Generator().manual_seed(promonet.RANDOM_SEED)
+    speaker = promonet.benchmark.random_speaker(generator)
+    features = {
+        length: promonet.benchmark.random_features(length, generator)
+        for length in frames}
+
+    # Remove compiled artifacts
+    checkpoint = promonet.model.cache.resolve(checkpoint)
+    for suffix in ['.onnx', '.ts']:
+        promonet.model.jit.artifact_file(
+            checkpoint,
+            suffix=suffix
+        ).unlink(missing_ok=True)
+
+    # Benchmark startup
+    results = {'startup': {}}
+    conditions = []
+    for backend in backends:
+        if backend == 'eager':
+            conditions.append(('eager', backend))
+        else:
+            conditions += [
+                (f'{backend}-cold', backend),
+                (f'{backend}-warm', backend)]
+    for name, backend in conditions:
+        promonet.model.cache.generators.clear()
+        results['startup'][name] = promonet.benchmark.elapsed(
+            promonet.synthesize.from_features,
+            *features[frames[0]],
+            speaker=speaker,
+            checkpoint=checkpoint,
+            gpu=gpu,
+            backend=backend)
+
+    # Benchmark steady-state real-time factor
+    results['rtf'] = {}
+    for backend in backends:
+        results['rtf'][backend] = {}
+        for length in frames:
+
+            # Warm up shape-specialized execution plans
+            for _ in range(2):
+                promonet.synthesize.from_features(
+                    *features[length],
+                    speaker=speaker,
+                    checkpoint=checkpoint,
+                    gpu=gpu,
+                    backend=backend)
+
+            # Time
+            elapsed = sum(
+                promonet.benchmark.elapsed(
+                    promonet.synthesize.from_features,
+                    *features[length],
+                    speaker=speaker,
+                    checkpoint=checkpoint,
+                    gpu=gpu,
+                    backend=backend)
+                for _ in range(repeats)) / repeats
+            results['rtf'][backend][length] = (
+                promonet.convert.frames_to_seconds(length) / elapsed)
+
+    # Print results and maybe save to disk
+    print(json.dumps(results, indent=4, sort_keys=True))
+    if output_file is not None:
+        with open(output_file, 'w') as file:
+            json.dump(results, file, indent=4, sort_keys=True)
+
+    return results
@@ -0,0 +1,171 @@
+import time
+
+import ppgs
+import torch
+
+import promonet
+
+
+###############################################################################
+# Benchmarking utilities
+###############################################################################
+
+
+def random_features(frames, generator=None):
+    """Create random input features with the shapes saved by preprocessing
+
+    Arguments
+        frames: The number of frames
+        generator: Optional random number generator
+
+    Returns
+        loudness: shape=(promonet.NUM_FFT // 2 + 1, frames)
+        pitch: shape=(1, frames)
+        periodicity: shape=(1, frames)
+        ppg: shape=(promonet.PPG_CHANNELS, frames)
+    """
+    # Loudness in decibels
+    loudness = (
+        (promonet.REF_DB - promonet.MIN_DB) *
+        torch.rand(
+            (promonet.NUM_FFT // 2 + 1, frames),
+            generator=generator) +
+        promonet.MIN_DB)
+
+    # Pitch uniformly distributed in base-2 log-space
+    pitch = 2 ** (
+        (promonet.LOG_FMAX - promonet.LOG_FMIN) *
+        torch.rand((1, frames), generator=generator) +
+        promonet.LOG_FMIN)
+
+    # Periodicity
+    periodicity = torch.rand((1, frames), generator=generator)
+
+    # Phonetic posteriorgram
+    ppg = torch.softmax(
+        torch.randn(
+            (promonet.PPG_CHANNELS, frames),
+            generator=generator),
+        dim=0)
+
+    return loudness, pitch, periodicity, ppg
+
+
+def random_files(directory, num_files, min_frames, max_frames, generator=None):
+    """Save random features of random lengths in the layout of preprocessing
+
+    Returns
+        loudness_files, pitch_files, periodicity_files, ppg_files: The files
+        output_files: The corresponding audio files to synthesize
+        speakers: The speaker indices or embedding files
+        seconds: The total duration of the audio to synthesize
+    """
+    prefixes = [directory / f'{i:06d}' for i in range(num_files)]
+    speakers = []
+    frames = 0
+    for prefix in prefixes:
+        length = int(torch.randint(
+            min_frames,
+            max_frames + 1,
+            (1,),
+            generator=generator))
+        loudness, pitch, periodicity, ppg = random_features(length, generator)
+        torch.save(loudness, f'{prefix}-loudness.pt')
+        torch.save(pitch, f'{prefix}-pitch.pt')
+        torch.save(periodicity, f'{prefix}-periodicity.pt')
+        torch.save(ppg, f'{prefix}{ppgs.representation_file_extension()}')
+        speaker = random_speaker(generator)
+        if promonet.ZERO_SHOT:
+            torch.save(speaker, f'{prefix}-speaker.pt')
+            speaker = f'{prefix}-speaker.pt'
+        speakers.append(speaker)
+        frames += length
+    return (
+        [f'{prefix}-loudness.pt' for prefix in prefixes],
+        [f'{prefix}-pitch.pt' for prefix in prefixes],
+        [f'{prefix}-periodicity.pt' for prefix in prefixes],
+        [
+            f'{prefix}{ppgs.representation_file_extension()}'
+            for prefix in prefixes],
+        [prefix.parent / f'{prefix.name}.wav' for prefix in prefixes],
+        speakers,
+        promonet.convert.frames_to_seconds(frames))
+
+
+def random_inputs(frames, batch_size=1, generator=None):
+    """Create a random batch of inputs to promonet.model.Generator
+
+    Returns
+        loudness: shape=(batch_size, promonet.NUM_FFT // 2 + 1, frames)
+        pitch: shape=(batch_size, frames)
+        periodicity: shape=(batch_size, frames)
+        ppg: shape=(batch_size, promonet.PPG_CHANNELS, frames)
+        speakers: shape=(batch_size,) or
+            shape=(batch_size, promonet.WAVLM_EMBEDDING_CHANNELS)
+        spectral_balance_ratios: shape=(batch_size,)
+        loudness_ratios: shape=(batch_size,)
+        previous_samples: shape=(batch_size, 1, promonet.NUM_PREVIOUS_SAMPLES)
+    """
+    loudness, pitch, periodicity, ppg = [
+        torch.stack(feature) for feature in zip(*[
+            random_features(frames, generator) for _ in range(batch_size)])]
+    if promonet.ZERO_SHOT:
+        speakers = torch.cat([
+            random_speaker(generator) for _ in range(batch_size)])
+    else:
+        speakers = torch.tensor([
+            random_speaker(generator) for _ in range(batch_size)])
+    return (
+        loudness,
+        pitch[:, 0],
+        periodicity[:, 0],
+        ppg,
+        speakers,
+        torch.ones(batch_size),
+        torch.ones(batch_size),
+        torch.zeros(batch_size, 1, promonet.NUM_PREVIOUS_SAMPLES))
+
+
+def random_speaker(generator=None):
+    """Create a random speaker index or embedding"""
+    if promonet.ZERO_SHOT:
+        return torch.nn.functional.normalize(
+            torch.randn(
+                (1, promonet.WAVLM_EMBEDDING_CHANNELS),
+                generator=generator),
+            dim=-1)
+    return int(
+        torch.randint(promonet.NUM_SPEAKERS, (1,), generator=generator))
+
+
+def elapsed(fn, *args, gpu=None, **kwargs):
+    """Measure the wall-clock time of a function call in seconds
+
+    The GPU is synchronized before and after the call, so that the time
+    excludes pending work and includes all work launched by the call.
+
+    Arguments
+        fn: The function to time. Receives the GPU index as gpu.
+        args: Positional arguments of fn
+        gpu: The GPU index
+        kwargs: Keyword arguments of fn
+
+    Returns
+        seconds: The wall-clock time in seconds
+    """
+    if gpu is not None:
+        torch.cuda.synchronize(gpu)
+    start = time.perf_counter()
+    fn(*args, gpu=gpu, **kwargs)
+    if gpu is not None:
+        torch.cuda.synchronize(gpu)
+    return time.perf_counter() - start
+
+
+def percentiles(values, quantiles=(.5, .9, .99)):
+    """Summarize a one-dimensional tensor of measurements"""
+    values = values.to(torch.float64)
+    return {
+        f'p{int(100 * quantile)}': torch.quantile(values, quantile).item()
+        for quantile in quantiles
+    } | {'mean': values.mean().item(), 'max': values.max().item()}
@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import yapecs
+
+import promonet
+
+
+###############################################################################
+# Benchmark fused editing and synthesis
+###############################################################################
+
+
+def parse_args():
+    """Parse command-line arguments"""
+    parser = yapecs.ArgumentParser(
+        description='Benchmark in-memory editing and synthesis against '
+                    'editing to disk followed by synthesis')
+    parser.add_argument(
+        '--num_files',
+        type=int,
+        default=64,
+        help='The number of random utterances to edit and synthesize')
+    parser.add_argument(
+        '--min_frames',
+        type=int,
+        default=100,
+        help='The minimum utterance length in frames')
+    parser.add_argument(
+        '--max_frames',
+        type=int,
+        default=800,
+        help='The maximum utterance length in frames')
+    parser.add_argument(
+        '--checkpoint',
+        type=Path,
+        help='The generator checkpoint')
+    parser.add_argument(
+        '--gpu',
+        type=int,
+        help='The GPU index')
+    parser.add_argument(
+        '--output_file',
+        type=Path,
+        help='Optional JSON file to save results')
+    return parser.parse_args()
+
+
+promonet.benchmark.fused.from_random(**vars(parse_args()))
@@ -0,0 +1,151 @@
+import json
+import tempfile
+from pathlib import Path
+
+import ppgs
+import torch
+
+import promonet
+
+
+###############################################################################
+# Benchmark fused editing and synthesis
+###############################################################################
+
+
+def from_random(
+    num_files=64,
+    min_frames=100,
+    max_frames=800,
+    checkpoint=None,
+    gpu=None,
+    output_file=None
+):
+    """Measure the time saved by editing in memory before synthesis
+
+    Each edit condition of evaluation is run three ways: editing to disk
+    followed by synthesis from disk, fused editing and synthesis, and fused
+    editing and synthesis that also saves the edited features.
+    """
+    generator = torch.Generator().manual_seed(promonet.RANDOM_SEED)
+    device = torch.device('cpu' if gpu is None else f'cuda:{gpu}')
+
+    # Edit conditions of evaluation
+    conditions = {
+        'shifted-071': {
+            'pitch_shift_cents': promonet.convert.ratio_to_cents(.71)},
+        'stretched-071': {
+            'time_stretch_ratio': .71,
+            'stretch_unvoiced': False},
+        'scaled-071': {
+            'loudness_scale_db': promonet.convert.ratio_to_db(.71)}}
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+
+        # Save random features in the layout produced by preprocessing
+        (
+            *files,
+            output_files,
+            speakers,
+            seconds
+        ) = promonet.benchmark.random_files(
+            directory,
+            num_files,
+            min_frames,
+            max_frames,
+            generator)
+
+        # Load generator so that it is not benchmarked
+        promonet.synthesize.cached_model(checkpoint, device)
+
+        # Benchmark
+        results = {'seconds': seconds}
+        for key, edit in conditions.items():
+            output_prefixes = [
+                file.parent / f'{file.stem}-{key}' for file in output_files]
+            results[key] = {
+                'two-stage': promonet.benchmark.elapsed(
+                    two_stage,
+                    *files,
+                    output_prefixes,
+                    output_files,
+                    speakers,
+                    checkpoint=checkpoint,
+                    gpu=gpu,
+                    **edit),
+                'fused': promonet.benchmark.elapsed(
+                    promonet.edit_and_synthesize.from_files_to_files,
+                    *files,
+                    output_files,
+                    speakers,
+                    checkpoint=checkpoint,
+                    gpu=gpu,
+                    **edit),
+                'fused-save-features': promonet.benchmark.elapsed(
+                    promonet.edit_and_synthesize.from_files_to_files,
+                    *files,
+                    output_files,
+                    speakers,
+                    checkpoint=checkpoint,
+                    gpu=gpu,
+                    output_prefixes=output_prefixes,
+                    **edit)}
+            results[key]['saved'] = (
+                results[key]['two-stage'] - results[key]['fused'])
+            results[key]['speedup'] = (
+                results[key]['two-stage'] / results[key]['fused'])
+
+        # Total over conditions
+        results['total'] = {
+            name: sum(results[key][name] for key in conditions)
+            for name in ['two-stage', 'fused', 'fused-save-features', 'saved']}
+        results['total']['speedup'] = (
+            results['total']['two-stage'] / results['total']['fused'])
+
+    # Print results and maybe save to disk
+    print(json.dumps(results, indent=4, sort_keys=True))
+    if output_file is not None:
+        with open(output_file, 'w') as file:
+            json.dump(results, file, indent=4, sort_keys=True)
+
+    return results
+
+
+###############################################################################
+# Utilities
+###############################################################################
+
+
+def two_stage(
+    loudness_files,
+    pitch_files,
+    periodicity_files,
+    ppg_files,
+    output_prefixes,
+    output_files,
+    speakers,
+    checkpoint=None,
+    gpu=None,
+    **edit
+):
+    """Edit features to disk and then synthesize from disk"""
+    promonet.edit.from_files_to_files(
+        loudness_files,
+        pitch_files,
+        periodicity_files,
+        ppg_files,
+        output_prefixes,
+        **edit)
+    viterbi = '-viterbi' if promonet.VITERBI_DECODE_PITCH else ''
+    promonet.synthesize.from_files_to_files(
+        [f'{prefix}-loudness.pt' for prefix in output_prefixes],
+        [f'{prefix}{viterbi}-pitch.pt' for prefix in output_prefixes],
+        [f'{prefix}{viterbi}-periodicity.pt' for prefix in output_prefixes],
+        [
+            f'{prefix}{ppgs.representation_file_extension()}'
+            for prefix in output_prefixes],
+        output_files,
+        speakers,
+        checkpoint=checkpoint,
+        gpu=gpu)
@@ -0,0 +1,41 @@
+from pathlib import Path
+
+import yapecs
+
+import promonet
+
+
+###############################################################################
+# Benchmark selective time-stretch grids
+###############################################################################
+
+
+def parse_args():
+    """Parse command-line arguments"""
+    parser = yapecs.ArgumentParser(
+        description='Benchmark selective time-stretch grids')
+    parser.add_argument(
+        '--frames',
+        type=int,
+        nargs='+',
+        default=[100, 1000, 10000],
+        help='The utterance lengths in frames')
+    parser.add_argument(
+        '--ratios',
+        type=float,
+        nargs='+',
+        default=[.5, .8, 1.25],
+        help='The time-stretch ratios')
+    parser.add_argument(
+        '--repeats',
+        type=int,
+        default=5,
+        help='The number of timed repetitions; the fastest is reported')
+    parser.add_argument(
+        '--output_file',
+        type=Path,
+        help='Optional JSON file to save results')
+    return parser.parse_args()
+
+
+promonet.benchmark.grid.from_random(**vars(parse_args()))
@@ -0,0 +1,112 @@
+import json
+import math
+
+import ppgs
+import torch
+
+import promonet
+
+
+###############################################################################
+# Benchmark selective time-stretch grids
+###############################################################################
+
+
+def from_random(
+    frames=[100, 1000, 10000],
+    ratios=[.5, .8, 1.25],
+    repeats=5,
+    output_file=None
+):
+    """Compare selective time-stretch grids to the original per-frame loop
+
+    Both take the same steps. The original loop indexes tensors one element
+    at a time in single precision, so grids agree up to rounding. Parity is
+    reported as the maximum absolute difference in frames.
+    """
+    generator = torch.Generator().manual_seed(promonet.RANDOM_SEED)
+    indices = torch.tensor([
+        ppgs.PHONEME_TO_INDEX_MAPPING[phoneme] for phoneme in ppgs.VOICED])
+
+    results = {}
+    for length in frames:
+
+        # Select voiced frames of a random PPG
+        ppg = promonet.benchmark.random_features(length, generator)[-1]
+        selected = ppg[indices].sum(dim=0)
+
+        for ratio in ratios:
+
+            # Time
+            loop = min(
+                promonet.benchmark.elapsed(
+                    lambda gpu: reference(selected, ratio))
+                for _ in range(repeats))
+            stepped = min(
+                promonet.benchmark.elapsed(
+                    lambda gpu: promonet.edit.grid.from_selection(
+                        selected,
+                        ratio))
+                for _ in range(repeats))
+
+            # Parity
+            error = (
+                reference(selected, ratio) -
+                promonet.edit.grid.from_selection(selected, ratio)
+            ).abs().max().item()
+
+            results[f'frames-{length}-ratio-{ratio}'] = {
+                'loop-ms': 1000. * loop,
+                'max-error-frames': error,
+                'speedup': loop / stepped,
+                'stepped-ms': 1000. * stepped}
+
+    # Print results and maybe save to disk
+    print(json.dumps(results, indent=4, sort_keys=True))
+    if output_file is not None:
+        with open(output_file, 'w') as file:
+            json.dump(results, file, indent=4, sort_keys=True)
+
+    return results
+
+
+###############################################################################
+# Utilities
+###############################################################################
+
+
+def reference(selected, ratio):
+    """Create a selective time-stretch grid with the original per-frame loop"""
+    # Get number of output frames
+    target_frames = round(selected.shape[-1] / ratio)
+
+    # Adjust ratio based on selection probabilities
+    total_selected = selected.sum()
+    total_unselected = selected.shape[-1] - total_selected
+    effective_ratio = (target_frames - total_unselected) / total_selected
+
+    # Create time-stretch grid
+    grid = torch.zeros(round(target_frames))
+    i = 0.
+    for j in range(1, target_frames):
+
+        # Get time-varying interpolation weight
+        left = math.floor(i)
+        if left + 1 < len(selected):
+            offset = i - left
+            probability = (
+                offset * selected[left + 1] +
+                (1 - offset) * selected[left])
+        else:
+            # The loop can overshoot the final frame
+            probability = selected[min(left, len(selected) - 1)]
+
+        # Get time-varying step size
+        ratio = probability * effective_ratio + (1 - probability)
+        step = 1. / ratio
+
+        # Take a step
+        grid[j] = grid[j - 1] + step
+        i += step
+
+    return grid
@@ -0,0 +1,39 @@
+from pathlib import Path
+
+import yapecs
+
+import promonet
+
+
+###############################################################################
+# Benchmark harmonic Viterbi decoding
+###############################################################################
+
+
+def parse_args():
+    """Parse command-line arguments"""
+    parser = yapecs.ArgumentParser(
+        description='Benchmark batched harmonic Viterbi decoding against '
+                    'decoding one harmonic at a time')
+    parser.add_argument(
+        '--seconds',
+        type=float,
+        default=60.,
+        help='The duration of the audio in seconds')
+    parser.add_argument(
+        '--repeats',
+        type=int,
+        default=3,
+        help='The number of timed repetitions; the fastest is reported')
+    parser.add_argument(
+        '--gpu',
+        type=int,
+        help='The GPU index; defaults to CPU')
+    parser.add_argument(
+        '--output_file',
+        type=Path,
+        help='Optional JSON file to save results')
+    return parser.parse_args()
+
+
+promonet.benchmark.harmonics.from_random(**vars(parse_args()))
@@ -0,0 +1,178 @@
+import json
+import math
+
+import torbi
+import torch
+
+import promonet
+
+
+###############################################################################
+# Benchmark harmonic Viterbi decoding
+###############################################################################
+
+
+def from_random(seconds=60., repeats=3, gpu=None, output_file=None):
+    """Compare batched harmonic Viterbi decoding to the per-harmonic loop
+
+    The input is a harmonic signal with vibrato in noise. Decoding is timed
+    with and without a pitch prior.
+    """
+    generator = torch.Generator().manual_seed(promonet.RANDOM_SEED)
+    samples = int(seconds * promonet.SAMPLE_RATE)
+
+    # Pitch contour with vibrato
+    times = torch.arange(samples) / promonet.SAMPLE_RATE
+    pitch = 150. * 2 ** (.1 * torch.sin(2 * math.pi * .5 * times))
+
+    # Harmonic signal in noise
+    phase = 2 * math.pi * torch.cumsum(pitch, dim=0) / promonet.SAMPLE_RATE
+    audio = sum(
+        torch.sin(harmonic * phase) / harmonic
+        for harmonic in range(1, promonet.MAX_HARMONICS + 2))
+    audio = .1 * audio + .01 * torch.randn(samples, generator=generator)
+    audio = audio[None]
+
+    # Features used for harmonic analysis
+    frames, frequencies = promonet.preprocess.harmonics.stft(audio, gpu=gpu)
+    prior = pitch[::promonet.HOPSIZE][None, :len(frames)]
+
+    results = {}
+    for key, prior in [('decoded-f0', None), ('pitch-prior', prior)]:
+
+        # Time
+        loop_time = min(
+            promonet.benchmark.elapsed(
+                reference,
+                frames,
+                frequencies,
+                prior,
+                gpu=gpu)
+            for _ in range(repeats))
+        batched_time = min(
+            promonet.benchmark.elapsed(
+                promonet.preprocess.harmonics.viterbi,
+                frames,
+                frequencies,
+                prior,
+                gpu=gpu)
+            for _ in range(repeats))
+
+        # Parity
+        expected = reference(frames, frequencies, prior, gpu=gpu)
+        actual = promonet.preprocess.harmonics.viterbi(
+            frames,
+            frequencies,
+            prior,
+            gpu=gpu)
+
+        results[key] = {
+            'batched-ms': 1000. * batched_time,
+            'identical': torch.equal(
+                torch.nan_to_num(expected),
+                torch.nan_to_num(actual)),
+            'loop-ms': 1000. * loop_time,
+            'speedup': loop_time / batched_time}
+
+    # Print results and maybe save to disk
+    print(json.dumps(results, indent=4, sort_keys=True))
+    if output_file is not None:
+        with open(output_file, 'w') as file:
+            json.dump(results, file, indent=4, sort_keys=True)
+
+    return results
+
+
+###############################################################################
+# Utilities
+###############################################################################
+
+
+def reference(
+    frames,
+    frequencies,
+    pitch=None,
+    max_harmonics=promonet.MAX_HARMONICS,
+    harmonic_width_ratio=0.8,
+    gpu=None):
+    """Decode harmonics with the original per-harmonic loop"""
+    device = 'cpu' if gpu is None else f'cuda:{gpu}'
+
+    # Normalize
+    frames = frames.to(device)
+    frequencies = frequencies.to(device)
+    x = torch.clone(frames)
+    x = torch.softmax(
+        x + .5 * torch.arange(x.shape[-1], 0, -1, device=device),
+        dim=1)
+
+    # Transition matrix
+    logfreq = torch.log2(frequencies)
+    transition = 1. - 3.5 * torch.cdist(
+        logfreq[None, :, None],
+        logfreq[None, :, None],
+        p=1.0
+    )[0]
+    transition[transition < 0.] = 0.
+    transition /= transition.sum(dim=1)
+
+    # Initial matrix
+    initial = torch.linspace(1., 0., len(logfreq), device=device)
+    initial /= initial.sum()
+
+    # Maybe use more accurate external pitch esitimator for F0
+    i = 0
+    harmonics = torch.full(
+        (max_harmonics, len(x)),
+        float('nan'),
+        device=device)
+    if pitch is not None:
+        harmonics[0] = pitch.squeeze(0)
+        i += 1
+
+        # Mask
+        x = torch.clone(frames)
+        indices = torch.searchsorted(frequencies, harmonics[0])
+        min_harmonic_idxs = torch.searchsorted(
+            frequencies,
+            harmonics[0] * (1. + harmonic_width_ratio))
+        max_harmonic_idxs = torch.searchsorted(
+            frequencies,
+            harmonics[0] * (1. + 1. / harmonic_width_ratio))
+        for j in range(len(indices)):
+            x[j, :min_harmonic_idxs[j]] = -float('inf')
+            x[j, max_harmonic_idxs[j]:] = -float('inf')
+        x = torch.softmax(x, dim=1)
+
+    # Iteratively decode F1, F2, ...
+    while i < max_harmonics:
+
+        # Decode
+        indices = torbi.from_probabilities(
+            x[None],
+            transition=transition,
+            initial=initial,
+            log_probs=False,
+            gpu=gpu
+        )[0].to(torch.long)
+        harmonics[i] = frequencies[indices]
+
+        i += 1
+
+        if i == max_harmonics:
+            break
+
+        # Mask
+        x = torch.clone(frames)
+        min_harmonic_idxs = torch.searchsorted(
+            frequencies,
+            harmonics[0] * (i + harmonic_width_ratio))
+        max_harmonic_idxs = torch.searchsorted(
+            frequencies,
+            harmonics[0] * (i + 1. / harmonic_width_ratio))
+        for j in range(len(indices)):
+            x[j, :min_harmonic_idxs[j]] = -float('inf')
+            x[j, max_harmonic_idxs[j]:] = -float('inf')
+        x = torch.softmax(x, dim=1)
+
+    return harmonics
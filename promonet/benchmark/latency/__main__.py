@@ -0,0 +1,43 @@
+from pathlib import Path
+
+import yapecs
+
+import promonet
+
+
+###############################################################################
+# Benchmark low-latency synthesis
+###############################################################################
+
+
+def parse_args():
+    """Parse command-line arguments"""
+    parser = yapecs.ArgumentParser(
+        description='Benchmark per-block latency of streaming synthesis')
+    parser.add_argument(
+        '--frames',
+        type=int,
+        default=1000,
+        help='The utterance length in frames')
+    parser.add_argument(
+        '--block_frames',
+        type=int,
+        nargs='+',
+        default=[1, 4, 16],
+        help='The numbers of frames synthesized per block')
+    parser.add_argument(
+        '--checkpoint',
+        type=Path,
+        help='The generator checkpoint')
+    parser.add_argument(
+        '--output_file',
+        type=Path,
+        help='Optional JSON file to save results')
+    parser.add_argument(
+        '--gpu',
+        type=int,
+        help='The GPU index; defaults to CPU')
+    return parser.parse_args()
+
+
+promonet.benchmark.latency.from_random(**vars(parse_args()))
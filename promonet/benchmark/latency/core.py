@@ -0,0 +1,71 @@
+import json
+import time
+
+import torch
+
+import promonet
+
+
+###############################################################################
+# Benchmark low-latency synthesis
+###############################################################################
+
+
+def from_random(
+    frames=1000,
+    block_frames=[1, 4, 16],
+    checkpoint=None,
+    output_file=None,
+    gpu=None
+):
+    """Measure per-block latency of streaming synthesis on random features
+
+    Latency is the time to produce each block. A block is produced in real
+    time when its latency is below its duration.
+    """
+    generator = torch.Generator().manual_seed(promonet.RANDOM_SEED)
+    features = promonet.benchmark.random_features(frames, generator)
+    speaker = promonet.benchmark.random_speaker(generator)
+
+    # Warm up model cache so that loading is not benchmarked
+    next(promonet.synthesize.from_features_streaming(
+        *features,
+        speaker=speaker,
+        checkpoint=checkpoint,
+        gpu=gpu,
+        block_frames=1))
+
+    results = {}
+    for block in block_frames:
+
+        # Time each block
+        latencies = []
+        start = time.perf_counter()
+        for _ in promonet.synthesize.from_features_streaming(
+            *features,
+            speaker=speaker,
+            checkpoint=checkpoint,
+            gpu=gpu,
+            block_frames=block
+        ):
+            if gpu is not None:
+                torch.cuda.synchronize(gpu)
+            end = time.perf_counter()
+            latencies.append(1000. * (end - start))
+            start = end
+        latencies = torch.tensor(latencies)
+
+        # Summarize
+        duration = 1000. * promonet.convert.frames_to_seconds(block)
+        results[block] = {
+            'block-duration-ms': duration,
+            'latency-ms': promonet.benchmark.percentiles(latencies),
+            'rtf': duration / latencies.mean().item()}
+
+    # Print results and maybe save to disk
+    print(json.dumps(results, indent=4, sort_keys=True))
+    if output_file is not None:
+        with open(output_file, 'w') as file:
+            json.dump(results, file, indent=4, sort_keys=True)
+
+    return results
@@ -0,0 +1,107 @@
+import json
+
+import torch
+
+import promonet
+
+
+###############################################################################
+# Benchmark look-ahead limiter
+###############################################################################
+
+
+def from_random(
+    batch_sizes=[1, 8],
+    seconds=4.,
+    repeats=3,
+    gpu=None,
+    output_file=None
+):
+    """Compare the vectorized limiter to the per-sample loop
+
+    The loop limits one utterance at a time on CPU. Parity is reported as
+    the maximum absolute difference in amplitude.
+    """
+    generator = torch.Generator().manual_seed(promonet.RANDOM_SEED)
+    device = torch.device('cpu' if gpu is None else f'cuda:{gpu}')
+    samples = int(seconds * promonet.SAMPLE_RATE)
+
+    results = {}
+    for batch_size in batch_sizes:
+
+        # Noise with peaks above the limiter threshold
+        audio = (
+            .5 * torch.randn((batch_size, samples), generator=generator) *
+            torch.rand((batch_size, 1), generator=generator))
+
+        # Time
+        loop_time = min(
+            promonet.benchmark.elapsed(
+                lambda gpu: [reference(item[None]) for item in audio])
+            for _ in range(repeats))
+        vectorized_time = min(
+            promonet.benchmark.elapsed(
+                lambda gpu: promonet.preprocess.loudness.limit(
+                    audio.to(device)),
+                gpu=gpu)
+            for _ in range(repeats))
+
+        # Parity
+        expected = torch.cat([reference(item[None]) for item in audio])
+        actual = promonet.preprocess.loudness.limit(audio.to(device)).cpu()
+        error = (expected - actual).abs().max().item()
+
+        results[f'batch-{batch_size}'] = {
+            'loop-ms': 1000. * loop_time,
+            'max-error': error,
+            'speedup': loop_time / vectorized_time,
+            'vectorized-ms': 1000. * vectorized_time}
+
+    # Print results and maybe save to disk
+    print(json.dumps(results, indent=4, sort_keys=True))
+    if output_file is not None:
+        with open(output_file, 'w') as file:
+            json.dump(results, file, indent=4, sort_keys=True)
+
+    return results
+
+
+###############################################################################
+# Utilities
+###############################################################################
+
+
+def reference(
+    audio,
+    delay=40,
+    attack_coef=.9,
+    release_coef=.9995,
+    threshold=.99
+):
+    """Apply the limiter with the original per-sample loop"""
+    # Delay compensation
+    audio = torch.nn.functional.pad(audio, (0, delay - 1))
+
+    current_gain = 1.
+    delay_index = 0
+    delay_line = torch.zeros(delay)
+    envelope = 0
+
+    for idx, sample in enumerate(audio[0]):
+
+        # Update signal history
+        delay_line[delay_index] = sample
+        delay_index = (delay_index + 1) % delay
+
+        # Calculate envelope
+        envelope = max(abs(sample), envelope * release_coef)
+
+        # Calcuate gain
+        target_gain = threshold / envelope if envelope > threshold else 1.
+        current_gain = \
+            current_gain * attack_coef + target_gain * (1 - attack_coef)
+
+        # Apply gain
+        audio[:, idx] = delay_line[delay_index] * current_gain
+
+    return audio[:, delay - 1:]
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+import yapecs
+
+import promonet
+
+
+###############################################################################
+# Benchmark A-weighted loudness
+###############################################################################
+
+
+def parse_args():
+    """Parse command-line arguments"""
+    parser = yapecs.ArgumentParser(
+        description='Benchmark batched torch loudness against librosa')
+    parser.add_argument(
+        '--batch_sizes',
+        type=int,
+        nargs='+',
+        default=[1, 8, 32],
+        help='The numbers of utterances per batch')
+    parser.add_argument(
+        '--seconds',
+        type=float,
+        default=4.,
+        help='The duration of each utterance in seconds')
+    parser.add_argument(
+        '--repeats',
+        type=int,
+        default=5,
+        help='The number of timed repetitions; the fastest is reported')
+    parser.add_argument(
+        '--gpu',
+        type=int,
+        help='The GPU index; defaults to CPU')
+    parser.add_argument(
+        '--output_file',
+        type=Path,
+        help='Optional JSON file to save results')
+    return parser.parse_args()
+
+
+promonet.benchmark.loudness.from_random(**vars(parse_args()))
@@ -0,0 +1,117 @@
+import json
+import warnings
+
+import librosa
+import numpy as np
+import torch
+
+import promonet
+
+
+###############################################################################
+# Benchmark A-weighted loudness
+###############################################################################
+
+
+def from_random(
+    batch_sizes=[1, 8, 32],
+    seconds=4.,
+    repeats=5,
+    gpu=None,
+    output_file=None
+):
+    """Compare batched torch loudness to the librosa implementation
+
+    The librosa implementation computes one utterance at a time on CPU.
+    Parity is reported as the maximum absolute difference in dB.
+    """
+    generator = torch.Generator().manual_seed(promonet.RANDOM_SEED)
+    device = torch.device('cpu' if gpu is None else f'cuda:{gpu}')
+    samples = int(seconds * promonet.SAMPLE_RATE)
+
+    results = {}
+    for batch_size in batch_sizes:
+
+        # Amplitude-modulated noise
+        audio = (
+            .1 * torch.randn((batch_size, samples), generator=generator) *
+            torch.rand((batch_size, 1), generator=generator))
+
+        # Time
+        librosa_time = min(
+            promonet.benchmark.elapsed(
+                lambda gpu: [reference(item[None]) for item in audio])
+            for _ in range(repeats))
+        torch_time = min(
+            promonet.benchmark.elapsed(
+                lambda gpu: promonet.preprocess.loudness.from_audio(
+                    audio.to(device),
+                    None),
+                gpu=gpu)
+            for _ in range(repeats))
+
+        # Parity
+        expected = torch.stack([reference(item[None]) for item in audio])
+        actual = promonet.preprocess.loudness.from_audio(
+            audio.to(device),
+            None
+        ).to(device='cpu', dtype=torch.float32)
+        if batch_size == 1:
+            actual = actual[None]
+        error = (expected - actual).abs().max().item()
+
+        results[f'batch-{batch_size}'] = {
+            'librosa-ms': 1000. * librosa_time,
+            'max-error-db': error,
+            'speedup': librosa_time / torch_time,
+            'torch-ms': 1000. * torch_time}
+
+    # Print results and maybe save to disk
+    print(json.dumps(results, indent=4, sort_keys=True))
+    if output_file is not None:
+        with open(output_file, 'w') as file:
+            json.dump(results, file, indent=4, sort_keys=True)
+
+    return results
+
+
+###############################################################################
+# Utilities
+###############################################################################
+
+
+def reference(audio):
+    """Compute A-weighted loudness with the original librosa implementation"""
+    # Pad
+    padding = (promonet.WINDOW_SIZE - promonet.HOPSIZE) // 2
+    audio = torch.nn.functional.pad(
+        audio[None],
+        (padding, padding),
+        mode='reflect'
+    ).squeeze(0)
+
+    # Take stft
+    stft = librosa.stft(
+        audio.numpy().squeeze(0),
+        n_fft=promonet.WINDOW_SIZE,
+        hop_length=promonet.HOPSIZE,
+        win_length=promonet.WINDOW_SIZE,
+        center=False)
+
+    # Get A-weighting
+    frequencies = librosa.fft_frequencies(
+        sr=promonet.SAMPLE_RATE,
+        n_fft=promonet.WINDOW_SIZE)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        weights = (
+            librosa.A_weighting(frequencies)[:, None] -
+            float(promonet.REF_DB))
+
+    # Apply A-weighting in units of dB
+    weighted = librosa.amplitude_to_db(np.abs(stft)) + weights
+
+    # Threshold
+    weighted[weighted < promonet.MIN_DB] = promonet.MIN_DB
+
+    return torch.from_numpy(weighted).float()
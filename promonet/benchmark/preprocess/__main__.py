@@ -0,0 +1,45 @@
+from pathlib import Path
+
+import yapecs
+
+import promonet
+
+
+###############################################################################
+# Benchmark concurrent preprocessing
+###############################################################################
+
+
+def parse_args():
+    """Parse command-line arguments"""
+    parser = yapecs.ArgumentParser(
+        description='Benchmark concurrent preprocessing against extracting '
+                    'one feature at a time')
+    parser.add_argument(
+        '--dataset',
+        default=promonet.TRAINING_DATASET,
+        choices=promonet.DATASETS,
+        help='The dataset to preprocess')
+    parser.add_argument(
+        '--num_files',
+        type=int,
+        default=256,
+        help='The number of audio files to preprocess')
+    parser.add_argument(
+        '--features',
+        default=['loudness', 'pitch', 'periodicity', 'ppg'],
+        choices=promonet.ALL_FEATURES,
+        nargs='+',
+        help='The features to preprocess')
+    parser.add_argument(
+        '--gpu',
+        type=int,
+        help='The GPU index; defaults to CPU')
+    parser.add_argument(
+        '--output_file',
+        type=Path,
+        help='Optional JSON file to save results')
+    return parser.parse_args()
+
+
+promonet.benchmark.preprocess.from_dataset(**vars(parse_args()))
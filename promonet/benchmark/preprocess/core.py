@@ -0,0 +1,64 @@
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import promonet
+
+
+###############################################################################
+# Benchmark concurrent preprocessing
+###############################################################################
+
+
+def from_dataset(
+    dataset=promonet.TRAINING_DATASET,
+    num_files=256,
+    features=['loudness', 'pitch', 'periodicity', 'ppg'],
+    gpu=None,
+    output_file=None
+):
+    """Compare concurrent preprocessing to extracting one feature at a time
+
+    Audio files are selected as in promonet.data.preprocess, and features
+    are saved to a temporary directory so that the dataset is unchanged.
+    """
+    directory = promonet.CACHE_DIR / dataset
+    files = sorted(list(directory.rglob('*.wav')))
+    files = [file for file in files if '-' in file.stem][:num_files]
+
+    results = {'files': len(files)}
+    for key, sequential in [('sequential', True), ('concurrent', False)]:
+        with tempfile.TemporaryDirectory() as output_directory:
+            output_directory = Path(output_directory)
+            output_prefixes = [
+                output_directory / f'{i:06d}' for i in range(len(files))]
+
+            # Time each stage and the entire schedule
+            stages = promonet.preprocess.schedule.plan(
+                files,
+                output_prefixes,
+                gpu,
+                features,
+                None)
+            start = time.perf_counter()
+            stages = promonet.preprocess.schedule.run(stages, sequential)
+            seconds = time.perf_counter() - start
+
+            results[key] = {
+                'seconds': seconds,
+                'stages': {
+                    name: {
+                        'files-per-second': len(files) / elapsed,
+                        'seconds': elapsed}
+                    for name, elapsed in stages.items()}}
+    results['speedup'] = (
+        results['sequential']['seconds'] / results['concurrent']['seconds'])
+
+    # Print results and maybe save to disk
+    print(json.dumps(results, indent=4, sort_keys=True))
+    if output_file is not None:
+        with open(output_file, 'w') as file:
+            json.dump(results, file, indent=4, sort_keys=True)
+
+    return results
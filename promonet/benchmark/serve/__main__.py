@@ -0,0 +1,67 @@
+from pathlib import Path
+
+import yapecs
+
+import promonet
+
+
+###############################################################################
+# Benchmark synthesis serving
+###############################################################################
+
+
+def parse_args():
+    """Parse command-line arguments"""
+    parser = yapecs.ArgumentParser(
+        description='Compare unbatched and micro-batched serving throughput')
+    parser.add_argument(
+        '--num_requests',
+        type=int,
+        default=256,
+        help='The number of requests to send')
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=16,
+        help='The number of concurrent clients')
+    parser.add_argument(
+        '--min_frames',
+        type=int,
+        default=100,
+        help='The minimum request length in frames')
+    parser.add_argument(
+        '--max_frames',
+        type=int,
+        default=800,
+        help='The maximum request length in frames')
+    parser.add_argument(
+        '--batch_frames',
+        type=int,
+        default=promonet.SERVE_MAX_FRAMES,
+        help='The maximum number of padded frames in a served batch')
+    parser.add_argument(
+        '--max_wait',
+        type=float,
+        default=promonet.SERVE_MAX_WAIT,
+        help='The maximum time in seconds a request waits for a batch')
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=promonet.SERVE_PORT,
+        help='The port to serve on')
+    parser.add_argument(
+        '--checkpoint',
+        type=Path,
+        help='The generator checkpoint')
+    parser.add_argument(
+        '--output_file',
+        type=Path,
+        help='Optional JSON file to save results')
+    parser.add_argument(
+        '--gpu',
+        type=int,
+        help='The GPU index; defaults to CPU')
+    return parser.parse_args()
+
+
+promonet.benchmark.serve.from_random(**vars(parse_args()))
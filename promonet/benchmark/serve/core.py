@@ -0,0 +1,148 @@
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+import torch
+
+import promonet
+
+
+###############################################################################
+# Benchmark synthesis serving
+###############################################################################
+
+
+def from_random(
+    num_requests=256,
+    concurrency=16,
+    min_frames=100,
+    max_frames=800,
+    batch_frames=promonet.SERVE_MAX_FRAMES,
+    max_wait=promonet.SERVE_MAX_WAIT,
+    port=promonet.SERVE_PORT,
+    checkpoint=None,
+    output_file=None,
+    gpu=None
+):
+    """Compare unbatched and micro-batched serving throughput
+
+    Starts a server for each configuration and sends random features from
+    concurrent clients. Unbatched serving uses a frame budget of one, so that
+    every request is synthesized alone.
+    """
+    generator = torch.Generator().manual_seed(promonet.RANDOM_SEED)
+
+    # Create random requests
+    requests = []
+    for _ in range(num_requests):
+        frames = int(torch.randint(
+            min_frames,
+            max_frames + 1,
+            (1,),
+            generator=generator))
+        loudness, pitch, periodicity, ppg = \
+            promonet.benchmark.random_features(frames, generator)
+        requests.append({
+            'loudness': loudness,
+            'pitch': pitch,
+            'periodicity': periodicity,
+            'ppg': ppg,
+            'speaker': promonet.benchmark.random_speaker(generator)})
+
+    # Total duration of generated audio in seconds
+    seconds = promonet.convert.frames_to_seconds(
+        sum(request['pitch'].shape[-1] for request in requests))
+
+    results = {'seconds': seconds}
+    for name, frames in [('unbatched', 1), ('batched', batch_frames)]:
+
+        # Start server
+        command = [
+            sys.executable,
+            '-m',
+            'promonet.serve',
+            '--port', str(port),
+            '--max_frames', str(frames),
+            '--max_wait', str(max_wait)]
+        if checkpoint is not None:
+            command += ['--checkpoint', str(checkpoint)]
+        if gpu is not None:
+            command += ['--gpu', str(gpu)]
+        process = subprocess.Popen(command)
+
+        try:
+            results[name] = asyncio.run(
+                load(requests, concurrency, port))
+        finally:
+            process.terminate()
+            process.wait()
+        results[name]['rtf'] = seconds / results[name]['elapsed']
+
+    results['speedup'] = (
+        results['unbatched']['elapsed'] / results['batched']['elapsed'])
+
+    # Print results and maybe save to disk
+    print(json.dumps(results, indent=4, sort_keys=True))
+    if output_file is not None:
+        with open(output_file, 'w') as file:
+            json.dump(results, file, indent=4, sort_keys=True)
+
+    return results
+
+
+###############################################################################
+# Utilities
+###############################################################################
+
+
+async def connect(port, timeout=600.):
+    """Connect to a server once it is accepting connections"""
+    start = time.perf_counter()
+    while True:
+        try:
+            return await asyncio.open_connection('localhost', port)
+        except OSError:
+            if time.perf_counter() - start > timeout:
+                raise
+            await asyncio.sleep(.5)
+
+
+async def load(requests, concurrency, port):
+    """Send requests from concurrent clients and measure throughput"""
+    connections = [await connect(port) for _ in range(concurrency)]
+    queue = asyncio.Queue()
+    for request in requests:
+        queue.put_nowait(request)
+
+    async def client(reader, writer):
+        latencies = []
+        while not queue.empty():
+            request = queue.get_nowait()
+            start = time.perf_counter()
+            await promonet.serve.request(reader, writer, request)
+            latencies.append(1000. * (time.perf_counter() - start))
+        return latencies
+
+    # Send requests
+    start = time.perf_counter()
+    latencies = await asyncio.gather(
+        *[client(*connection) for connection in connections])
+    elapsed = time.perf_counter() - start
+
+    # Get server statistics
+    reader, writer = connections[0]
+    stats = await promonet.serve.request(
+        reader,
+        writer,
+        {'command': 'stats'})
+    for _, writer in connections:
+        writer.close()
+
+    return {
+        'elapsed': elapsed,
+        'latency-ms': promonet.benchmark.percentiles(
+            torch.tensor(sum(latencies, []))),
+        'requests-per-second': len(requests) / elapsed,
+        'server': stats}
@@ -0,0 +1,49 @@
+from pathlib import Path
+
+import yapecs
+
+import promonet
+
+
+###############################################################################
+# Benchmark interactive editing
+###############################################################################
+
+
+def parse_args():
+    """Parse command-line arguments"""
+    parser = yapecs.ArgumentParser(
+        description='Benchmark the latency of interactive edits')
+    parser.add_argument(
+        '--frames',
+        type=int,
+        nargs='+',
+        default=[500, 2000, 8000],
+        help='The utterance lengths in frames')
+    parser.add_argument(
+        '--spans',
+        type=int,
+        nargs='+',
+        default=[10, 50, 200],
+        help='The numbers of frames changed by each edit')
+    parser.add_argument(
+        '--repeats',
+        type=int,
+        default=10,
+        help='The number of edits to time for each length and span')
+    parser.add_argument(
+        '--checkpoint',
+        type=Path,
+        help='The generator checkpoint')
+    parser.add_argument(
+        '--output_file',
+        type=Path,
+        help='Optional JSON file to save results')
+    parser.add_argument(
+        '--gpu',
+        type=int,
+        help='The GPU index; defaults to CPU')
+    return parser.parse_args()
+
+
+promonet.benchmark.session.from_random(**vars(parse_args()))
@@ -0,0 +1,78 @@
+import json
+
+import torch
+
+import promonet
+
+
+###############################################################################
+# Benchmark interactive editing
+###############################################################################
+
+
+def from_random(
+    frames=[500, 2000, 8000],
+    spans=[10, 50, 200],
+    repeats=10,
+    checkpoint=None,
+    output_file=None,
+    gpu=None
+):
+    """Measure the latency of interactive edits on random features
+
+    Each edit sets a random pitch shift over a random range of frames and
+    waits for the rendered audio. Latency is compared to synthesizing the
+    entire utterance.
+    """
+    generator = torch.Generator().manual_seed(promonet.RANDOM_SEED)
+
+    results = {}
+    for length in frames:
+        session = promonet.edit.EditSession(
+            *promonet.benchmark.random_features(length, generator),
+            speaker=promonet.benchmark.random_speaker(generator),
+            checkpoint=checkpoint,
+            gpu=gpu)
+        try:
+
+            # Render the entire utterance
+            full = promonet.benchmark.elapsed(
+                lambda gpu: session.render(),
+                gpu=gpu)
+
+            for span in spans:
+                span = min(span, length)
+
+                # Time each edit
+                latencies = []
+                for _ in range(repeats):
+                    start = int(torch.randint(
+                        0,
+                        length - span + 1,
+                        (1,),
+                        generator=generator))
+                    cents = 200. * torch.rand(1, generator=generator) - 100.
+                    latencies.append(1000. * promonet.benchmark.elapsed(
+                        lambda gpu: session.edit(
+                            start,
+                            start + span,
+                            pitch_shift_cents=cents.item()
+                        ).result(),
+                        gpu=gpu))
+                latencies = torch.tensor(latencies)
+
+                # Summarize
+                results[f'frames-{length}-span-{span}'] = {
+                    'full-ms': 1000. * full,
+                    'latency-ms': promonet.benchmark.percentiles(latencies),
+                    'speedup': 1000. * full / latencies.mean().item()}
+        finally:
+            session.close()
+
+    # Print results and maybe save to disk
+    print(json.dumps(results, indent=4, sort_keys=True))
+    if output_file is not None:
+        with open(output_file, 'w') as file:
+            json.dump(results, file, indent=4, sort_keys=True)
+
+    return results
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+import yapecs
+
+import promonet
+
+
+###############################################################################
+# Benchmark batched speaker embedding
+###############################################################################
+
+
+def parse_args():
+    """Parse command-line arguments"""
+    parser = yapecs.ArgumentParser(
+        description='Benchmark batched WavLM x-vectors against embedding '
+                    'one file at a time')
+    parser.add_argument(
+        '--num_files',
+        type=int,
+        default=64,
+        help='The number of random utterances to embed')
+    parser.add_argument(
+        '--min_seconds',
+        type=float,
+        default=1.,
+        help='The minimum utterance duration in seconds')
+    parser.add_argument(
+        '--max_seconds',
+        type=float,
+        default=8.,
+        help='The maximum utterance duration in seconds')
+    parser.add_argument(
+        '--gpu',
+        type=int,
+        help='The GPU index; defaults to CPU')
+    parser.add_argument(
+        '--output_file',
+        type=Path,
+        help='Optional JSON file to save results')
+    return parser.parse_args()
+
+
+promonet.benchmark.speaker.from_random(**vars(parse_args()))
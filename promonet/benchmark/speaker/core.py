@@ -0,0 +1,93 @@
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import torch
+import torchaudio
+
+import promonet
+
+
+###############################################################################
+# Benchmark batched speaker embedding
+###############################################################################
+
+
+def from_random(
+    num_files=64,
+    min_seconds=1.,
+    max_seconds=8.,
+    gpu=None,
+    output_file=None
+):
+    """Compare batched WavLM x-vectors to embedding one file at a time
+
+    Parity is reported as the maximum absolute difference and the minimum
+    cosine similarity between batched and per-file embeddings.
+    """
+    generator = torch.Generator().manual_seed(promonet.RANDOM_SEED)
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+
+        # Save amplitude-modulated noise of random durations
+        files, seconds = [], 0.
+        for i in range(num_files):
+            duration = min_seconds + (max_seconds - min_seconds) * float(
+                torch.rand(1, generator=generator))
+            samples = int(duration * promonet.SAMPLE_RATE)
+            audio = (
+                .1 * torch.randn((1, samples), generator=generator) *
+                torch.rand((1, 1), generator=generator))
+            files.append(directory / f'{i:06d}.wav')
+            torchaudio.save(files[-1], audio, promonet.SAMPLE_RATE)
+            seconds += samples / promonet.SAMPLE_RATE
+        per_file_files = [
+            directory / f'{i:06d}-file.pt' for i in range(num_files)]
+        batched_files = [
+            directory / f'{i:06d}-batch.pt' for i in range(num_files)]
+
+        # Load model so that it is not benchmarked
+        promonet.preprocess.speaker.from_file(files[0], gpu)
+
+        # Embed one file at a time
+        start = time.perf_counter()
+        for file, embedding_file in zip(files, per_file_files):
+            promonet.preprocess.speaker.from_file_to_file(
+                file,
+                embedding_file,
+                gpu)
+        per_file_time = time.perf_counter() - start
+
+        # Embed in batches
+        start = time.perf_counter()
+        promonet.preprocess.speaker.from_files_to_files(
+            files,
+            batched_files,
+            gpu)
+        batched_time = time.perf_counter() - start
+
+        # Parity
+        expected = torch.cat([torch.load(file) for file in per_file_files])
+        actual = torch.cat([torch.load(file) for file in batched_files])
+        similarity = torch.nn.functional.cosine_similarity(
+            expected,
+            actual,
+            dim=-1)
+
+    results = {
+        'batched-ms': 1000. * batched_time,
+        'max-error': (expected - actual).abs().max().item(),
+        'min-cosine-similarity': similarity.min().item(),
+        'per-file-ms': 1000. * per_file_time,
+        'seconds': seconds,
+        'speedup': per_file_time / batched_time}
+
+    # Print results and maybe save to disk
+    print(json.dumps(results, indent=4, sort_keys=True))
+    if output_file is not None:
+        with open(output_file, 'w') as file:
+            json.dump(results, file, indent=4, sort_keys=True)
+
+    return results
@@ -0,0 +1,43 @@
+from pathlib import Path
+
+import yapecs
+
+import promonet
+
+
+###############################################################################
+# Benchmark streaming synthesis
+###############################################################################
+
+
+def parse_args():
+    """Parse command-line arguments"""
+    parser = yapecs.ArgumentParser(
+        description='Benchmark streaming against full-sequence synthesis')
+    parser.add_argument(
+        '--lengths',
+        type=int,
+        nargs='+',
+        default=[1000, 4000, 16000],
+        help='The utterance lengths in frames')
+    parser.add_argument(
+        '--block_frames',
+        type=int,
+        default=512,
+        help='The number of frames synthesized per block')
+    parser.add_argument(
+        '--checkpoint',
+        type=Path,
+        help='The generator checkpoint')
+    parser.add_argument(
+        '--output_file',
+        type=Path,
+        help='Optional JSON file to save results')
+    parser.add_argument(
+        '--gpu',
+        type=int,
+        help='The GPU index; defaults to CPU')
+    return parser.parse_args()
+
+
+promonet.benchmark.streaming.from_random(**vars(parse_args()))
@@ -0,0 +1,91 @@
+import json
+import time
+
+import torch
+
+import promonet
+
+
+###############################################################################
+# Benchmark streaming synthesis
+###############################################################################
+
+
+def from_random(
+    lengths=[1000, 4000, 16000],
+    block_frames=512,
+    checkpoint=None,
+    output_file=None,
+    gpu=None
+):
+    """Compare streaming and full-sequence synthesis on random features
+
+    Reports the maximum absolute difference between streaming and
+    full-sequence synthesis, as well as the wall-clock time and, on GPU,
+    the peak memory of each.
+    """
+    generator = torch.Generator().manual_seed(promonet.RANDOM_SEED)
+    speaker = promonet.benchmark.random_speaker(generator)
+
+    results = {}
+    for frames in lengths:
+        features = promonet.benchmark.random_features(frames, generator)
+
+        # Full-sequence synthesis
+        reset_peak_memory(gpu)
+        start = time.perf_counter()
+        full = promonet.synthesize.from_features(
+            *features,
+            speaker=speaker,
+            checkpoint=checkpoint,
+            gpu=gpu)
+        full_elapsed = time.perf_counter() - start
+        full_memory = peak_memory(gpu)
+
+        # Streaming synthesis
+        reset_peak_memory(gpu)
+        start = time.perf_counter()
+        streamed = torch.cat(
+            list(promonet.synthesize.from_features_streaming(
+                *features,
+                speaker=speaker,
+                checkpoint=checkpoint,
+                gpu=gpu,
+                block_frames=block_frames)),
+            dim=-1)
+        streaming_elapsed = time.perf_counter() - start
+        streaming_memory = peak_memory(gpu)
+
+        results[frames] = {
+            'max-error': (full - streamed).abs().max().item(),
+            'full': {'elapsed': full_elapsed, 'peak-memory': full_memory},
+            'streaming': {
+                'elapsed': streaming_elapsed,
+                'peak-memory': streaming_memory}}
+
+    # Print results and maybe save to disk
+    print(json.dumps(results, indent=4, sort_keys=True))
+    if output_file is not None:
+        with open(output_file, 'w') as file:
+            json.dump(results, file, indent=4, sort_keys=True)
+
+    return results
+
+
+###############################################################################
+# Utilities
+###############################################################################
+
+
+def peak_memory(gpu=None):
+    """Get the peak GPU memory in bytes since the last reset"""
+    if gpu is None:
+        return None
+    return torch.cuda.max_memory_allocated(gpu)
+
+
+def reset_peak_memory(gpu=None):
+    """Reset the peak GPU memory statistic"""
+    if gpu is not None:
+        torch.cuda.synchronize(gpu)
+        torch.cuda.reset_peak_memory_stats(gpu)
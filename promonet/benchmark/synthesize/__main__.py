@@ -0,0 +1,66 @@
+from pathlib import Path
+
+import yapecs
+
+import promonet
+
+
+###############################################################################
+# Benchmark synthesis
+###############################################################################
+
+
+def parse_args():
+    """Parse command-line arguments"""
+    parser = yapecs.ArgumentParser(
+        description='Benchmark synthesis on random features')
+    parser.add_argument(
+        '--models',
+        nargs='+',
+        default=list(promonet.benchmark.synthesize.MODELS),
+        choices=list(promonet.benchmark.synthesize.MODELS),
+        help='The models to benchmark')
+    parser.add_argument(
+        '--current_config',
+        action='store_true',
+        help='Benchmark only the current configuration in this process')
+    parser.add_argument(
+        '--frames',
+        type=int,
+        nargs='+',
+        default=[100, 400, 1600],
+        help='The utterance lengths in frames')
+    parser.add_argument(
+        '--batch_sizes',
+        type=int,
+        nargs='+',
+        default=[1, 4],
+        help='The batch sizes')
+    parser.add_argument(
+        '--threads',
+        type=int,
+        nargs='+',
+        help='The numbers of intra-op threads; '
+             'defaults to one and the number of cores')
+    parser.add_argument(
+        '--repeats',
+        type=int,
+        default=5,
+        help='The number of timed forward passes per condition')
+    parser.add_argument(
+        '--output_file',
+        type=Path,
+        help='Optional JSON file to save results')
+    parser.add_argument(
+        '--gpu',
+        type=int,
+        help='The GPU index; defaults to CPU')
+    return parser.parse_args()
+
+
+args = vars(parse_args())
+models = args.pop('models')
+if args.pop('current_config'):
+    promonet.benchmark.synthesize.from_random_current_config(**args)
+else:
+    promonet.benchmark.synthesize.from_random(models, **args)
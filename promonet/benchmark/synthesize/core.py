@@ -0,0 +1,254 @@
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import torch
+import torchutil
+
+import promonet
+
+
+###############################################################################
+# Constants
+###############################################################################
+
+
+# Configuration overrides of each benchmarked model
+MODELS = {
+    'cargan': {'MODEL': 'cargan', 'SPECTROGRAM_ONLY': True},
+    'fargan': {'MODEL': 'fargan'},
+    'hifigan': {'MODEL': 'hifigan'},
+    'mels': {'MODEL': 'hifigan', 'SPECTROGRAM_ONLY': True},
+    'vocos': {'MODEL': 'vocos', 'SPECTROGRAM_ONLY': True}}
+
+
+###############################################################################
+# Benchmark synthesis
+###############################################################################
+
+
+def from_random(
+    models=list(MODELS),
+    frames=[100, 400, 1600],
+    batch_sizes=[1, 4],
+    threads=None,
+    repeats=5,
+    output_file=None,
+    gpu=None
+):
+    """Benchmark synthesis of each model on random features
+
+    Each model is benchmarked in its own process with a generated
+    configuration, so that peak memory is measured per model. Raises if any
+    model fails to run.
+    """
+    results = {'metadata': metadata(), 'models': {}}
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        for model in models:
+
+            # Write configuration
+            config_file = directory / f'{model}.py'
+            with open(config_file, 'w') as file:
+                file.write("MODULE = 'promonet'\n")
+                file.write(f"CONFIG = 'benchmark-{model}'\n")
+                for key, value in MODELS[model].items():
+                    file.write(f'{key} = {value!r}\n')
+
+            # Benchmark
+            results_file = directory / f'{model}.json'
+            command = [
+                sys.executable,
+                '-m',
+                'promonet.benchmark.synthesize',
+                '--config', str(config_file),
+                '--current_config',
+                '--frames', *[str(length) for length in frames],
+                '--batch_sizes', *[str(size) for size in batch_sizes],
+                '--repeats', str(repeats),
+                '--output_file', str(results_file)]
+            if threads is not None:
+                command += ['--threads', *[str(count) for count in threads]]
+            if gpu is not None:
+                command += ['--gpu', str(gpu)]
+            process = subprocess.run(command, capture_output=True, text=True)
+
+            # Save results
+            if process.returncode != 0:
+                raise RuntimeError(
+                    f'Benchmarking {model} failed:\n{process.stderr}')
+            with open(results_file) as file:
+                results['models'][model] = json.load(file)
+
+    # Print results and maybe save to disk
+    print(json.dumps(results, indent=4, sort_keys=True))
+    if output_file is not None:
+        with open(output_file, 'w') as file:
+            json.dump(results, file, indent=4, sort_keys=True)
+
+    return results
+
+
+def from_random_current_config(
+    frames=[100, 400, 1600],
+    batch_sizes=[1, 4],
+    threads=None,
+    repeats=5,
+    output_file=None,
+    gpu=None
+):
+    """Benchmark synthesis of the configured generator on random features
+
+    The generator has random weights, which does not change its speed.
+    Cold loading is the time to load the generator from a checkpoint on disk
+    through the generator cache used for synthesis. Latency is measured per forward pass after one
+    warm-up pass, and the real-time factor is the duration of the batch
+    divided by the mean latency.
+    """
+    device = torch.device('cpu' if gpu is None else f'cuda:{gpu}')
+    generator = torch.Generator().manual_seed(promonet.RANDOM_SEED)
+    model_type = (
+        promonet.model.MelGenerator if promonet.SPECTROGRAM_ONLY
+        else promonet.model.Generator)
+    if threads is None:
+        threads = sorted({1, os.cpu_count()})
+
+    with tempfile.TemporaryDirectory() as directory:
+
+        # Save random weights
+        file = Path(directory) / 'generator-00000000.pt'
+        model = model_type()
+        torchutil.checkpoint.save(
+            file,
+            model,
+            torch.optim.AdamW(model.parameters()),
+            step=0,
+            epoch=0)
+
+        # Benchmark cold loading
+        synchronize(gpu)
+        start = time.perf_counter()
+        model = promonet.model.cache.generators(
+            file,
+            device,
+            model_type=model_type)
+        synchronize(gpu)
+        cold = time.perf_counter() - start
+
+    results = {
+        'cold-load': cold,
+        'config': promonet.CONFIG,
+        'conditions': {},
+        'generator': model_type.__name__,
+        'model': promonet.MODEL}
+    for num_threads in threads:
+        torch.set_num_threads(num_threads)
+        for length in frames:
+            for batch_size in batch_sizes:
+                inputs = [
+                    value.to(device) for value in
+                    random_inputs(model_type, length, batch_size, generator)]
+
+                with torchutil.inference.context(model):
+
+                    # Warm up
+                    model(*inputs)
+
+                    # Time forward passes
+                    latencies = []
+                    for _ in range(repeats):
+                        synchronize(gpu)
+                        start = time.perf_counter()
+                        model(*inputs)
+                        synchronize(gpu)
+                        latencies.append(
+                            1000. * (time.perf_counter() - start))
+                latencies = torch.tensor(latencies)
+
+                # Summarize
+                seconds = (
+                    batch_size * promonet.convert.frames_to_seconds(length))
+                key = (
+                    f'threads-{num_threads}-'
+                    f'frames-{length}-'
+                    f'batch-{batch_size}')
+                results['conditions'][key] = {
+                    'batch-size': batch_size,
+                    'frames': length,
+                    'latency-ms': promonet.benchmark.percentiles(latencies),
+                    'peak-rss-mb': peak_rss(),
+                    'rtf': 1000. * seconds / latencies.mean().item(),
+                    'threads': num_threads}
+                if gpu is not None:
+                    results['conditions'][key]['peak-gpu-memory-mb'] = \
+                        torch.cuda.max_memory_allocated(gpu) / 2 ** 20
+    results['peak-rss-mb'] = peak_rss()
+
+    # Print results and maybe save to disk
+    print(json.dumps(results, indent=4, sort_keys=True))
+    if output_file is not None:
+        with open(output_file, 'w') as file:
+            json.dump(results, file, indent=4, sort_keys=True)
+
+    return results
+
+
+###############################################################################
+# Utilities
+###############################################################################
+
+
+def metadata():
+    """Get information needed to compare runs across commits and machines"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            capture_output=True,
+            cwd=Path(__file__).parent,
+            text=True
+        ).stdout.strip() or None
+    except FileNotFoundError:
+        commit = None
+    return {
+        'commit': commit,
+        'cpus': os.cpu_count(),
+        'python': sys.version.split()[0],
+        'torch': torch.__version__}
+
+
+def peak_rss():
+    """Get the peak resident set size of this process in megabytes"""
+    # Linux reports kilobytes and macOS reports bytes
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10)
+
+
+def random_inputs(model_type, frames, batch_size, generator):
+    """Create random generator inputs"""
+    (
+        loudness,
+        pitch,
+        periodicity,
+        ppg,
+        *global_features
+    ) = promonet.benchmark.random_inputs(frames, batch_size, generator)
+
+    # Mel generators take a linear magnitude spectrogram
+    if model_type is promonet.model.MelGenerator:
+        spectrogram = torch.rand(
+            (batch_size, promonet.NUM_FFT // 2 + 1, frames),
+            generator=generator) + 1e-3
+        return spectrogram, *global_features
+
+    return loudness, pitch, periodicity, ppg, *global_features
+
+
+def synchronize(gpu=None):
+    """Wait for GPU work to finish"""
+    if gpu is not None:
+        torch.cuda.synchronize(gpu)
@@ -0,0 +1,49 @@
+from pathlib import Path
+
+import yapecs
+
+import promonet
+
+
+###############################################################################
+# Benchmark multiprocess synthesis
+###############################################################################
+
+
+def parse_args():
+    """Parse command-line arguments"""
+    parser = yapecs.ArgumentParser(
+        description='Benchmark CPU synthesis throughput over worker counts')
+    parser.add_argument(
+        '--num_files',
+        type=int,
+        default=64,
+        help='The number of random utterances to synthesize')
+    parser.add_argument(
+        '--min_frames',
+        type=int,
+        default=100,
+        help='The minimum utterance length in frames')
+    parser.add_argument(
+        '--max_frames',
+        type=int,
+        default=800,
+        help='The maximum utterance length in frames')
+    parser.add_argument(
+        '--num_workers',
+        type=int,
+        nargs='+',
+        help='The numbers of worker processes to benchmark; '
+             'defaults to powers of two up to the number of cores')
+    parser.add_argument(
+        '--checkpoint',
+        type=Path,
+        help='The generator checkpoint')
+    parser.add_argument(
+        '--output_file',
+        type=Path,
+        help='Optional JSON file to save results')
+    return parser.parse_args()
+
+
+promonet.benchmark.workers.from_random(**vars(parse_args()))
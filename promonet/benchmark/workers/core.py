@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import torch
+
+import promonet
+
+
+###############################################################################
+# Benchmark multiprocess synthesis
+###############################################################################
+
+
+def from_random(
+    num_files=64,
+    min_frames=100,
+    max_frames=800,
+    num_workers=None,
+    checkpoint=None,
+    output_file=None
+):
+    """Measure CPU synthesis throughput scaling with the number of workers
+
+    Elapsed time includes starting the worker processes and loading one
+    generator per worker, as a render job would.
+    """
+    generator = torch.Generator().manual_seed(promonet.RANDOM_SEED)
+
+    # Default to powers of two up to the number of cores
+    if num_workers is None:
+        num_workers = [
+            2 ** i for i in range(os.cpu_count().bit_length())
+            if 2 ** i <= os.cpu_count()]
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+
+        # Save random features in the layout produced by preprocessing
+        (
+            *files,
+            output_files,
+            speakers,
+            seconds
+        ) = promonet.benchmark.random_files(
+            directory,
+            num_files,
+            min_frames,
+            max_frames,
+            generator)
+
+        # Download default checkpoint so that it is not benchmarked
+        promonet.model.cache.resolve(checkpoint)
+
+        # Benchmark
+        results = {'seconds': seconds}
+        for workers in num_workers:
+            elapsed = promonet.benchmark.elapsed(
+                promonet.synthesize.from_files_to_files,
+                *files,
+                output_files,
+                speakers,
+                checkpoint=checkpoint,
+                num_workers=workers)
+            results[workers] = {'elapsed': elapsed, 'rtf': seconds / elapsed}
+        for workers in num_workers:
+            results[workers]['speedup'] = (
+                results[num_workers[0]]['elapsed'] /
+                results[workers]['elapsed'])
+
+    # Print results and maybe save to disk
+    print(json.dumps(results, indent=4, sort_keys=True))
+    if output_file is not None:
+        with open(output_file, 'w') as file:
+            json.dump(results, file, indent=4, sort_keys=True)
+
+    return results
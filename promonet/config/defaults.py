@@ -105,6 +105,20 @@ PPG_CHANNELS = 40
 # Available method are ['linear', 'nearest']
 PPG_INTERP_METHOD = 'linear'
 
+# Number of files preprocessed between updates of the preprocessing manifest.
+# Also bounds the number of files of decoded audio held in scratch storage.
+PREPROCESS_CHUNK_SIZE = 1024
+
+# Maximum number of model-based feature extractors (e.g., PPGs and pitch)
+# that run at once during preprocessing
+PREPROCESS_MODEL_WORKERS = 1
+
+# Directory of the scratch store of decoded audio shared by feature
+# extractors during preprocessing. Holds one chunk of files (see
+# PREPROCESS_CHUNK_SIZE) at each sample rate used by the extractors, and is
+# deleted after each chunk. None uses the system temporary directory.
+PREPROCESS_SCRATCH_DIR = None
+
 # Whether to shift Mel inputs to have a minimum of zero
 SPARSE_MELS = False
 
@@ -289,6 +303,28 @@ ZERO_SHOT = False
 ZERO_SHOT_SHUFFLE = False
 
 
+###############################################################################
+# Inference parameters
+###############################################################################
+
+
+# Number of samples crossfaded at the boundaries of region-limited
+# re-synthesis during interactive editing
+EDIT_CROSSFADE = 256  # samples
+
+# Maximum number of generators kept in memory for synthesis
+GENERATOR_CACHE_CAPACITY = 4
+
+# Maximum number of padded frames per batch of the synthesis server
+SERVE_MAX_FRAMES = 8192
+
+# Maximum time a request waits for other requests to batch with
+SERVE_MAX_WAIT = .01  # seconds
+
+# Default port of the synthesis server
+SERVE_PORT = 8321
+
+
 ###############################################################################
 # Logging parameters
 ###############################################################################
@@ -26,6 +26,10 @@ def parse_args():
         '--gpu',
         type=int,
         help='The index of the gpu to use')
+    parser.add_argument(
+        '--sequential',
+        action='store_true',
+        help='Extract one feature at a time')
     return parser.parse_args()
 
 
@@ -9,7 +9,12 @@ import promonet
 
 
 @torchutil.notify('preprocess')
-def datasets(datasets, features=promonet.ALL_FEATURES, gpu=None):
+def datasets(
+    datasets,
+    features=promonet.ALL_FEATURES,
+    gpu=None,
+    sequential=False
+):
     """Preprocess a dataset"""
     for dataset in datasets:
 
@@ -20,27 +25,12 @@ def datasets(datasets, features=promonet.ALL_FEATURES, gpu=None):
         audio_files = sorted(list(directory.rglob('*.wav')))
         audio_files = [file for file in audio_files if '-' in file.stem]
 
-        # Preprocess input features
-        if any(feature in features for feature in [
-            'loudness',
-            'pitch',
-            'periodicity',
-            'ppg',
-            'text',
-            'harmonics',
-            'speaker'
-        ]):
-            promonet.preprocess.from_files_to_files(
-                audio_files,
-                gpu=gpu,
-                features=[f for f in features if f != 'spectrogram'],
-                loudness_bands=None)
-
-        # Preprocess spectrograms
-        if 'spectrogram' in features:
-            spectrogram_files = [
-                file.parent / f'{file.stem}-spectrogram.pt'
-                for file in audio_files]
-            promonet.preprocess.spectrogram.from_files_to_files(
-                audio_files,
-                spectrogram_files)
+        # Preprocess input features. Loudness and spectrograms share one STFT.
+        # Features that are up to date in the manifest are skipped.
+        promonet.preprocess.from_files_to_files(
+            audio_files,
+            gpu=gpu,
+            features=features,
+            loudness_bands=None,
+            sequential=sequential,
+            manifest=directory)
@@ -1,2 +1,4 @@
 from .core import *
+from .session import EditSession
 from . import grid
+from . import program
@@ -1,4 +1,3 @@
-import math
 import os
 from typing import List, Optional, Tuple, Union
 
@@ -50,70 +49,20 @@ def from_features(
     if time_stretch_ratio is not None:
 
         # Create time-stretch grid
-        if stretch_unvoiced and stretch_silence:
-            grid = promonet.edit.grid.constant(
-                ppg,
-                time_stretch_ratio)
+        selected = selection(ppg, stretch_unvoiced, stretch_silence)
+        if selected is None:
+            grid = promonet.edit.grid.constant(ppg, time_stretch_ratio)
         else:
-
-            # Get voiced phoneme indices
-            indices = [
-                ppgs.PHONEME_TO_INDEX_MAPPING[phoneme]
-                for phoneme in ppgs.VOICED]
-
-            # Maybe add silence
-            if stretch_silence:
-                indices.append(ppgs.PHONEME_TO_INDEX_MAPPING[pypar.SILENCE])
-
-            # Maybe add unvoiced
-            if stretch_unvoiced:
-                indices.extend(
-                    list(
-                        set(ppgs.PHONEMES) -
-                        set(ppgs.VOICED) -
-                        set([pypar.SILENCE])
-                    )
-                )
-
-            # Get selection probabilities
-            selected = ppg[torch.tensor(indices)].sum(dim=0)
-
-            # Get number of output frames
-            target_frames = round(ppg.shape[-1] / time_stretch_ratio)
-
-            # Adjust ratio based on selection probabilities
-            total_selected = selected.sum()
-            total_unselected = ppg.shape[-1] - total_selected
-            effective_ratio = (target_frames - total_unselected) / total_selected
-
-            # Create time-stretch grid
-            grid = torch.zeros(round(target_frames))
-            i = 0.
-            for j in range(1, target_frames):
-
-                # Get time-varying interpolation weight
-                left = math.floor(i)
-                if left + 1 < len(selected):
-                    offset = i - left
-                    probability = (
-                        offset * selected[left + 1] +
-                        (1 - offset) * selected[left])
-                else:
-                    probability = selected[left]
-
-                # Get time-varying step size
-                ratio = probability * effective_ratio + (1 - probability)
-                step = 1. / ratio
-
-                # Take a step
-                grid[j] = grid[j - 1] + step
-                i += step
+            grid = promonet.edit.grid.from_selection(
+                selected,
+                time_stretch_ratio)
 
         # Time-stretch
-        pitch = 2 ** promonet.edit.grid.sample(torch.log2(pitch), grid)
-        periodicity = promonet.edit.grid.sample(periodicity, grid)
-        loudness = promonet.edit.grid.sample(loudness, grid)
-        ppg = promonet.edit.grid.sample(ppg, grid, promonet.PPG_INTERP_METHOD)
+        sample = promonet.edit.grid.Sampler(grid, ppg.shape[-1])
+        pitch = 2 ** sample(torch.log2(pitch))
+        periodicity = sample(periodicity)
+        loudness = sample(loudness)
+        ppg = sample(ppg, promonet.PPG_INTERP_METHOD)
     elif return_grid:
         grid = None
 
@@ -132,6 +81,103 @@ def from_features(
     return loudness, pitch, periodicity, ppg
 
 
+def sweep(
+    loudness: torch.Tensor,
+    pitch: torch.Tensor,
+    periodicity: torch.Tensor,
+    ppg: torch.Tensor,
+    edits: List[dict],
+    stretch_unvoiced: bool = True,
+    stretch_silence: bool = True
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+    """Edit one speech representation with many edit settings
+
+    The outputs are padded and stacked for one batched synthesis. Work that
+    does not depend on the edit settings (e.g., the log-pitch and the
+    selection probabilities) is computed once, and time-stretching is
+    performed once per unique ratio.
+
+    Arguments
+        loudness: Loudness contour to edit
+        pitch: Pitch contour to edit
+        periodicity: Periodicity contour to edit
+        ppg: PPG to edit
+        edits: Edit settings. Each is a dictionary with optional keys
+            pitch_shift_cents, time_stretch_ratio, and loudness_scale_db.
+        stretch_unvoiced: If true, applies time-stretching to unvoiced frames
+        stretch_silence: If true, applies time-stretching to silent frames
+
+    Returns
+        edited_loudness: shape=(len(edits), loudness channels, frames)
+        edited_pitch: shape=(len(edits), frames)
+        edited_periodicity: shape=(len(edits), frames)
+        edited_ppg: shape=(len(edits), promonet.PPG_CHANNELS, frames)
+        lengths: Number of frames of each edit. shape=(len(edits),)
+    """
+    keys = {'pitch_shift_cents', 'time_stretch_ratio', 'loudness_scale_db'}
+    for edit in edits:
+        if set(edit) - keys:
+            raise ValueError(
+                f'Edit settings {sorted(set(edit) - keys)} are not defined')
+
+    # Shared feature preparation
+    log_pitch = torch.log2(pitch)
+    selected = selection(ppg, stretch_unvoiced, stretch_silence)
+
+    # Time-stretch once per unique ratio
+    stretched = {}
+    ratios = dict.fromkeys(edit.get('time_stretch_ratio') for edit in edits)
+    for ratio in ratios:
+        if ratio is None:
+            stretched[ratio] = (loudness, pitch, periodicity, ppg)
+            continue
+        if selected is None:
+            grid = promonet.edit.grid.constant(ppg, ratio)
+        else:
+            grid = promonet.edit.grid.from_selection(selected, ratio)
+        sample = promonet.edit.grid.Sampler(grid, ppg.shape[-1])
+        stretched[ratio] = (
+            sample(loudness),
+            2 ** sample(log_pitch),
+            sample(periodicity),
+            sample(ppg, promonet.PPG_INTERP_METHOD))
+    length = max(value[1].shape[-1] for value in stretched.values())
+
+    # Apply pitch-shifting and loudness-scaling to each edit
+    results = [[], [], [], []]
+    lengths = []
+    for edit in edits:
+        edited_loudness, edited_pitch, edited_periodicity, edited_ppg = \
+            stretched[edit.get('time_stretch_ratio')]
+        lengths.append(edited_pitch.shape[-1])
+
+        # Maybe pitch-shift
+        if edit.get('pitch_shift_cents') is not None:
+            edited_pitch = torch.clip(
+                edited_pitch * promonet.convert.cents_to_ratio(
+                    edit['pitch_shift_cents']),
+                promonet.FMIN,
+                promonet.FMAX)
+
+        # Maybe loudness-scale
+        if edit.get('loudness_scale_db') is not None:
+            edited_loudness = edited_loudness + edit['loudness_scale_db']
+
+        for result, feature in zip(
+            results,
+            (edited_loudness, edited_pitch, edited_periodicity, edited_ppg)
+        ):
+            result.append(promonet.synthesize.pad(feature, length))
+
+    # Stack
+    return (
+        torch.stack(results[0]),
+        torch.cat(results[1]),
+        torch.cat(results[2]),
+        torch.stack(results[3]),
+        torch.tensor(lengths, dtype=torch.long))
+
+
 def from_file(
     loudness_file: Union[str, bytes, os.PathLike],
     pitch_file: Union[str, bytes, os.PathLike],
@@ -220,13 +266,7 @@ def from_file_to_file(
         save_grid)
 
     # Save
-    viterbi = '-viterbi' if promonet.VITERBI_DECODE_PITCH else ''
-    torch.save(results[0], f'{output_prefix}-loudness.pt')
-    torch.save(results[1], f'{output_prefix}{viterbi}-pitch.pt')
-    torch.save(results[2], f'{output_prefix}{viterbi}-periodicity.pt')
-    torch.save(results[3], f'{output_prefix}{ppgs.representation_file_extension()}')
-    if save_grid:
-        torch.save(results[4], f'{output_prefix}-grid.pt')
+    save(output_prefix, *results)
 
 
 def from_files_to_files(
@@ -276,3 +316,77 @@ def from_files_to_files(
             stretch_unvoiced,
             stretch_silence,
             save_grid)
+
+
+###############################################################################
+# Utilities
+###############################################################################
+
+
+def save(
+    output_prefix: Union[str, bytes, os.PathLike],
+    loudness: torch.Tensor,
+    pitch: torch.Tensor,
+    periodicity: torch.Tensor,
+    ppg: torch.Tensor,
+    grid: Optional[torch.Tensor] = None
+) -> None:
+    """Save edited speech representation in the layout of preprocessing
+
+    Arguments
+        output_prefix: File to save output, minus extension
+        loudness: Edited loudness contour
+        pitch: Edited pitch contour
+        periodicity: Edited periodicity contour
+        ppg: Edited PPG
+        grid: Optional time-stretch grid
+    """
+    viterbi = '-viterbi' if promonet.VITERBI_DECODE_PITCH else ''
+    torch.save(loudness, f'{output_prefix}-loudness.pt')
+    torch.save(pitch, f'{output_prefix}{viterbi}-pitch.pt')
+    torch.save(periodicity, f'{output_prefix}{viterbi}-periodicity.pt')
+    torch.save(ppg, f'{output_prefix}{ppgs.representation_file_extension()}')
+    if grid is not None:
+        torch.save(grid, f'{output_prefix}-grid.pt')
+
+
+def selection(
+    ppg: torch.Tensor,
+    stretch_unvoiced: bool = True,
+    stretch_silence: bool = True
+) -> Optional[torch.Tensor]:
+    """Get the probability that each frame is time-stretched
+
+    Arguments
+        ppg: PPG to edit
+        stretch_unvoiced: If true, applies time-stretching to unvoiced frames
+        stretch_silence: If true, applies time-stretching to silent frames
+
+    Returns
+        selected: shape=(frames,) or None if all frames are selected
+    """
+    if stretch_unvoiced and stretch_silence:
+        return None
+
+    # Get voiced phoneme indices
+    indices = [
+        ppgs.PHONEME_TO_INDEX_MAPPING[phoneme]
+        for phoneme in ppgs.VOICED]
+
+    # Maybe add silence
+    if stretch_silence:
+        indices.append(ppgs.PHONEME_TO_INDEX_MAPPING[pypar.SILENCE])
+
+    # Maybe add unvoiced
+    if stretch_unvoiced:
+        indices.extend(
+            ppgs.PHONEME_TO_INDEX_MAPPING[phoneme]
+            for phoneme in (
+                set(ppgs.PHONEMES) -
+                set(ppgs.VOICED) -
+                set([pypar.SILENCE])
+            )
+        )
+
+    # Get selection probabilities
+    return ppg[torch.tensor(indices)].sum(dim=0)
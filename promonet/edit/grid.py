@@ -1,3 +1,5 @@
+import math
+
 import ppgs
 import torch
 
@@ -9,40 +11,56 @@ import promonet
 ###############################################################################
 
 
-def sample(sequence, grid, method='linear'):
-    """Perform 1D grid-based sampling"""
-    # Linear grid interpolation
-    if method == 'linear':
-        x = grid
-        fp = sequence
-
-        # Input indices
-        xp = torch.arange(fp.shape[-1], device=fp.device)
-
-        # Output indices
-        i = torch.searchsorted(xp, x, side='right')
-
-        # Replicate final frame
-        # "replication_pad1d_cpu" not implemented for 'Half'
-        if fp.dtype == torch.float16:
-            fp = torch.nn.functional.pad(
-                fp.to(torch.float32),
-                (0, 1),
-                mode='replicate'
-            ).to(torch.float16)
-        else:
-            fp = torch.nn.functional.pad(fp, (0, 1), mode='replicate')
-        xp = torch.cat((xp, xp[-1:] + 1))
+class Sampler:
+    """1D grid-based sampling that shares indices across features
+
+    Indices and interpolation weights are computed once per grid and reused
+    for each feature sampled with that grid. Positions past the final frame
+    replicate the final frame.
+
+    Arguments
+        grid: Fractional input frame of each output frame. shape=(frames,)
+        frames: Number of frames of the features to sample
+    """
+
+    def __init__(self, grid, frames):
+        self.grid = grid
+        self.frames = frames
+
+        # Neighboring input frames
+        self.lower = torch.clip(torch.floor(grid).to(torch.long), 0, frames - 1)
+        self.upper = torch.clip(self.lower + 1, max=frames - 1)
+
+        # Interpolation weight of the upper frame
+        self.weight = torch.clip(grid - self.lower, 0., 1.)
+
+        # Nearest input frame
+        self.nearest = None
 
-        # Interpolate
-        return fp[..., i - 1] * (xp[i] - x) + fp[..., i] * (x - xp[i - 1])
+    def __call__(self, sequence, method='linear'):
+        """Sample a feature of shape=(..., frames)"""
+        # Linear grid interpolation
+        if method == 'linear':
+            lower = sequence[..., self.lower]
+            upper = sequence[..., self.upper]
+            return lower + self.weight.to(sequence.dtype) * (upper - lower)
 
-    # Nearest neighbors grid interpolation
-    elif method == 'nearest':
-        return sequence[..., torch.round(grid).to(torch.long)]
+        # Nearest neighbors grid interpolation
+        elif method == 'nearest':
+            if self.nearest is None:
+                self.nearest = torch.clip(
+                    torch.round(self.grid).to(torch.long),
+                    0,
+                    self.frames - 1)
+            return sequence[..., self.nearest]
 
-    else:
-        raise ValueError(f'Grid sampling method {method} is not defined')
+        else:
+            raise ValueError(f'Grid sampling method {method} is not defined')
+
+
+def sample(sequence, grid, method='linear'):
+    """Perform 1D grid-based sampling"""
+    return Sampler(grid, sequence.shape[-1])(sequence, method)
 
 
 ###############################################################################
@@ -64,6 +82,56 @@ def from_alignments(source, target):
         hopsize=promonet.HOPSIZE)
 
 
+def from_selection(selected, ratio):
+    """Create a grid that time-stretches frames by selection probability
+
+    Selected frames are stretched and unselected frames keep their
+    duration. The selected frames use an adjusted ratio, chosen so that the
+    output length matches the requested ratio. Each output frame steps
+    through the input by the inverse of the stretch rate at the current
+    position. Stepping runs on Python floats, which avoids the overhead of
+    indexing tensors one element at a time.
+
+    Arguments
+        selected: Probability that each frame is stretched. shape=(frames,)
+        ratio: Amount of time-stretching. Faster when above one.
+
+    Returns
+        grid: shape=(round(frames / ratio),)
+    """
+    frames = selected.shape[-1]
+    target_frames = round(frames / ratio)
+    probabilities = selected.tolist()
+
+    # Adjust ratio based on selection probabilities
+    total_selected = sum(probabilities)
+    total_unselected = frames - total_selected
+    effective_ratio = (target_frames - total_unselected) / total_selected
+
+    # Create time-stretch grid
+    grid = [0.] * target_frames
+    position = 0.
+    for j in range(1, target_frames):
+
+        # Get time-varying interpolation weight
+        left = math.floor(position)
+        if left + 1 < frames:
+            offset = position - left
+            probability = (
+                offset * probabilities[left + 1] +
+                (1 - offset) * probabilities[left])
+        else:
+            # Stepping can overshoot the final frame
+            probability = probabilities[min(left, frames - 1)]
+
+        # Take a step of time-varying size
+        position += 1. / (
+            probability * effective_ratio + (1 - probability))
+        grid[j] = position
+
+    return torch.tensor(grid, dtype=torch.float32, device=selected.device)
+
+
 def of_length(tensor, length):
     """Create time-stretch grid of a specified length"""
     return ppgs.edit.grid.of_length(tensor, length)
@@ -0,0 +1,178 @@
+from typing import List, Optional, Tuple
+
+import pypar
+import torch
+
+import promonet
+
+
+###############################################################################
+# Edit programs
+###############################################################################
+
+
+def from_features(
+    loudness: torch.Tensor,
+    pitch: torch.Tensor,
+    periodicity: torch.Tensor,
+    ppg: torch.Tensor,
+    operations: List[dict],
+    return_grid: bool = False
+):
+    """Edit speech representation with an edit program
+
+    The program is compiled to one time-stretch grid and per-frame pitch and
+    loudness offsets, so features are resampled once regardless of the
+    number of operations.
+
+    Arguments
+        loudness: Loudness contour to edit
+        pitch: Pitch contour to edit
+        periodicity: Periodicity contour to edit
+        ppg: PPG to edit
+        operations: Ordered edit operations (e.g., from stretch or shift)
+        return_grid: If true, also returns the time-stretch grid
+
+    Returns
+        edited_loudness, edited_pitch, edited_periodicity, edited_ppg
+    """
+    grid, cents, db = compile_program(
+        operations,
+        pitch.shape[-1],
+        pitch.device)
+
+    # Time-stretch
+    sample = promonet.edit.grid.Sampler(grid, pitch.shape[-1])
+    pitch = 2 ** sample(torch.log2(pitch))
+    periodicity = sample(periodicity)
+    loudness = sample(loudness)
+    ppg = sample(ppg, promonet.PPG_INTERP_METHOD)
+
+    # Pitch-shift
+    pitch = torch.where(
+        cents != 0.,
+        torch.clip(
+            pitch * promonet.convert.cents_to_ratio(cents),
+            promonet.FMIN,
+            promonet.FMAX),
+        pitch)
+
+    # Loudness-scale
+    loudness = loudness + db
+
+    if return_grid:
+        return loudness, pitch, periodicity, ppg, grid
+    return loudness, pitch, periodicity, ppg
+
+
+def compile_program(
+    operations: List[dict],
+    frames: int,
+    device: torch.device = torch.device('cpu')
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """Compile an edit program
+
+    Frame ranges of each operation refer to the frames produced by the
+    operations before it.
+
+    Arguments
+        operations: Ordered edit operations
+        frames: Number of frames of the features to edit
+        device: Device of the compiled program
+
+    Returns
+        grid: Time-stretch grid into the unedited frames. shape=(length,)
+        pitch_shift_cents: Pitch shift of each frame. shape=(length,)
+        loudness_scale_db: Loudness offset of each frame. shape=(length,)
+    """
+    grid = torch.arange(frames, dtype=torch.float32, device=device)
+    cents = torch.zeros(frames, device=device)
+    db = torch.zeros(frames, device=device)
+    for operation in operations:
+        kind = operation['operation']
+        start, end = operation.get('start'), operation.get('end')
+        start = 0 if start is None else max(0, start)
+        end = grid.shape[-1] if end is None else min(end, grid.shape[-1])
+
+        # Offsets
+        if kind == 'shift':
+            cents[start:end] += operation['cents']
+        elif kind == 'scale':
+            db[start:end] += operation['db']
+
+        # Retiming
+        else:
+            if kind == 'stretch':
+                step = stretch_grid(grid, operation['ratio'], start, end)
+            elif kind == 'align':
+                step = promonet.edit.grid.from_alignments(
+                    operation['source'],
+                    operation['target']
+                ).to(device=device, dtype=torch.float32)
+            else:
+                raise ValueError(f'Edit operation {kind} is not defined')
+
+            # Compose with previous operations
+            sample = promonet.edit.grid.Sampler(step, grid.shape[-1])
+            grid, cents, db = sample(grid), sample(cents), sample(db)
+
+    return grid, cents, db
+
+
+###############################################################################
+# Edit operations
+###############################################################################
+
+
+def align(source: pypar.Alignment, target: pypar.Alignment) -> dict:
+    """Retime from a source alignment to a target alignment"""
+    return {'operation': 'align', 'source': source, 'target': target}
+
+
+def scale(
+    db: float,
+    start: Optional[int] = None,
+    end: Optional[int] = None
+) -> dict:
+    """Offset loudness in dB over a range of frames"""
+    return {'operation': 'scale', 'db': db, 'start': start, 'end': end}
+
+
+def shift(
+    cents: float,
+    start: Optional[int] = None,
+    end: Optional[int] = None
+) -> dict:
+    """Shift pitch in cents over a range of frames"""
+    return {'operation': 'shift', 'cents': cents, 'start': start, 'end': end}
+
+
+def stretch(
+    ratio: float,
+    start: Optional[int] = None,
+    end: Optional[int] = None
+) -> dict:
+    """Time-stretch a range of frames. Faster when above one."""
+    return {'operation': 'stretch', 'ratio': ratio, 'start': start, 'end': end}
+
+
+###############################################################################
+# Utilities
+###############################################################################
+
+
+def stretch_grid(grid, ratio, start, end):
+    """Create a grid that time-stretches a range of frames"""
+    frames = grid.shape[-1]
+    if start == 0 and end == frames:
+        return promonet.edit.grid.constant(grid, ratio)
+
+    # Stretch the range and keep the duration of the surrounding frames
+    length = max(1, round((end - start) / ratio))
+    return torch.cat((
+        torch.arange(start, dtype=grid.dtype, device=grid.device),
+        start + (end - start) / length * torch.arange(
+            length,
+            dtype=grid.dtype,
+            device=grid.device),
+        torch.arange(end, frames, dtype=grid.dtype, device=grid.device)))
@@ -0,0 +1,237 @@
+import concurrent.futures
+import os
+import threading
+from typing import Optional, Tuple, Union
+
+import torch
+
+import promonet
+
+
+###############################################################################
+# Interactive editing
+###############################################################################
+
+
+class EditSession:
+    """Interactive editing session with region-limited re-synthesis
+
+    The session holds the source features, the generator, and the last
+    rendered audio. Edits set a pitch shift and loudness offset over a range
+    of frames. When the generator is non-autoregressive, only the edited
+    range plus the receptive field of the generator is synthesized again,
+    and the result is crossfaded into the cached audio. Otherwise, the
+    entire utterance is synthesized.
+
+    Renders run on a background thread. A render that has not started when
+    a new edit arrives is superseded and cancelled.
+
+    Arguments
+        loudness: Loudness contour to edit
+        pitch: Pitch contour to edit
+        periodicity: Periodicity contour to edit
+        ppg: PPG to edit
+        speaker: The speaker index or embedding
+        spectral_balance_ratio: > 1 for Alvin and the Chipmunks; < 1 for Patrick Star
+        loudness_ratio: > 1 for louder; < 1 for quieter
+        checkpoint: The generator checkpoint
+        gpu: The GPU index
+        crossfade: The number of samples to crossfade at region boundaries
+    """
+
+    def __init__(
+        self,
+        loudness: torch.Tensor,
+        pitch: torch.Tensor,
+        periodicity: torch.Tensor,
+        ppg: torch.Tensor,
+        speaker: Union[int, torch.Tensor] = 0,
+        spectral_balance_ratio: float = 1.,
+        loudness_ratio: float = 1.,
+        checkpoint: Optional[Union[str, os.PathLike]] = None,
+        gpu: Optional[int] = None,
+        crossfade: int = promonet.EDIT_CROSSFADE
+    ):
+        self.device = torch.device('cpu' if gpu is None else f'cuda:{gpu}')
+        self.speaker = speaker
+        self.spectral_balance_ratio = spectral_balance_ratio
+        self.loudness_ratio = loudness_ratio
+        self.checkpoint = checkpoint
+        self.crossfade = crossfade
+
+        # Source features
+        if loudness.ndim == 2:
+            loudness = loudness[None]
+        if ppg.ndim == 2:
+            ppg = ppg[None]
+        self.loudness = loudness.to(self.device)
+        self.pitch = pitch.to(self.device)
+        self.periodicity = periodicity.to(self.device)
+        self.ppg = ppg.to(self.device)
+        self.frames = self.pitch.shape[-1]
+
+        # Per-frame edits
+        self.pitch_shift_cents = torch.zeros(self.frames, device=self.device)
+        self.loudness_scale_db = torch.zeros(self.frames, device=self.device)
+
+        # Load generator and get the frames of context needed on each side
+        model = promonet.synthesize.cached_model(checkpoint, self.device)
+        if promonet.MODEL == 'hifigan':
+            self.context = model.model.receptive_field()
+        else:
+            self.context = None
+
+        # Last rendered audio and the frame range edited since
+        self.audio = None
+        self.dirty = None
+
+        # Render on a background thread
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.lock = threading.Lock()
+        self.pending = None
+
+    def close(self):
+        """Stop rendering"""
+        self.executor.shutdown(cancel_futures=True)
+
+    def edit(
+        self,
+        start: int = 0,
+        end: Optional[int] = None,
+        pitch_shift_cents: Optional[float] = None,
+        loudness_scale_db: Optional[float] = None
+    ) -> concurrent.futures.Future:
+        """Edit a range of frames and render in the background
+
+        Arguments
+            start: The first frame to edit
+            end: One past the last frame to edit. Defaults to the last frame.
+            pitch_shift_cents: Amount of pitch-shifting in cents
+            loudness_scale_db: Loudness ratio editing in dB
+
+        Returns
+            A future of the rendered audio. shape=(1, samples)
+        """
+        end = self.frames if end is None else min(end, self.frames)
+        start = max(0, start)
+        with self.lock:
+
+            # Update edits
+            if pitch_shift_cents is not None:
+                self.pitch_shift_cents[start:end] = pitch_shift_cents
+            if loudness_scale_db is not None:
+                self.loudness_scale_db[start:end] = loudness_scale_db
+
+            # Extend the range to render
+            if self.dirty is None:
+                self.dirty = (start, end)
+            else:
+                self.dirty = (
+                    min(self.dirty[0], start),
+                    max(self.dirty[1], end))
+
+            # Cancel superseded render
+            if self.pending is not None:
+                self.pending.cancel()
+            self.pending = self.executor.submit(self.render)
+            return self.pending
+
+    def render(self) -> torch.Tensor:
+        """Synthesize the edited frames and update the cached audio"""
+        with self.lock:
+            dirty, self.dirty = self.dirty, None
+            audio = self.audio
+
+        # Nothing edited since the last render
+        if audio is not None and dirty is None:
+            return audio
+
+        # Synthesize the entire utterance
+        if audio is None or self.context is None:
+            generated = self.generate(0, self.frames)
+            with self.lock:
+                self.audio = generated
+            return generated
+
+        # Frames whose audio depends on the edited frames
+        start = max(0, dirty[0] - self.context)
+        end = min(self.frames, dirty[1] + self.context)
+
+        # Synthesize with enough context for those frames to be exact
+        left = max(0, start - self.context)
+        right = min(self.frames, end + self.context)
+        generated = self.generate(left, right)[
+            :,
+            promonet.convert.frames_to_samples(start - left):
+            promonet.convert.frames_to_samples(end - left)]
+
+        # Crossfade into the cached audio
+        start = promonet.convert.frames_to_samples(start)
+        end = promonet.convert.frames_to_samples(end)
+        with self.lock:
+            audio = self.audio.clone()
+            audio[:, start:end] = blend(
+                audio[:, start:end],
+                generated,
+                min(self.crossfade, (end - start) // 2),
+                start > 0,
+                end < audio.shape[-1])
+            self.audio = audio
+        return audio
+
+    def features(
+        self,
+        start: int,
+        end: int
+    ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+        """Get the edited features of a range of frames"""
+        with self.lock:
+            cents = self.pitch_shift_cents[start:end].clone()
+            db = self.loudness_scale_db[start:end].clone()
+
+        # Pitch-shift
+        pitch = self.pitch[..., start:end]
+        pitch = torch.where(
+            cents != 0.,
+            torch.clip(
+                pitch * promonet.convert.cents_to_ratio(cents),
+                promonet.FMIN,
+                promonet.FMAX),
+            pitch)
+
+        # Loudness-scale
+        loudness = self.loudness[..., start:end] + db
+
+        return (
+            loudness,
+            pitch,
+            self.periodicity[..., start:end],
+            self.ppg[..., start:end])
+
+    def generate(self, start: int, end: int) -> torch.Tensor:
+        """Synthesize a range of frames"""
+        return promonet.synthesize.generate(
+            *self.features(start, end),
+            self.speaker,
+            self.spectral_balance_ratio,
+            self.loudness_ratio,
+            self.checkpoint
+        )[0].to(torch.float32)
+
+
+###############################################################################
+# Utilities
+###############################################################################
+
+
+def blend(previous, current, crossfade, fade_in=True, fade_out=True):
+    """Linearly crossfade from previous audio into current and back"""
+    if crossfade <= 0:
+        return current
+    weight = torch.ones(current.shape[-1], device=current.device)
+    ramp = torch.linspace(0., 1., crossfade + 2, device=current.device)[1:-1]
+    if fade_in:
+        weight[:crossfade] = ramp
+    if fade_out:
+        weight[-crossfade:] = ramp.flip(0)
+    return previous + weight * (current - previous)
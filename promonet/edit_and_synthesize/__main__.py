@@ -0,0 +1,106 @@
+import yapecs
+from pathlib import Path
+
+import promonet
+
+
+###############################################################################
+# Entry point
+###############################################################################
+
+
+def parse_args():
+    """Parse command-line arguments"""
+    parser = yapecs.ArgumentParser(
+        description='Edit speech representation and synthesize speech')
+    parser.add_argument(
+        '--loudness_files',
+        type=Path,
+        nargs='+',
+        required=True,
+        help='The loudness files to edit')
+    parser.add_argument(
+        '--pitch_files',
+        type=Path,
+        nargs='+',
+        required=True,
+        help='The pitch files to edit')
+    parser.add_argument(
+        '--periodicity_files',
+        type=Path,
+        nargs='+',
+        required=True,
+        help='The periodicity files to edit')
+    parser.add_argument(
+        '--ppg_files',
+        type=Path,
+        nargs='+',
+        required=True,
+        help='The phonetic posteriorgram files to edit')
+    parser.add_argument(
+        '--output_files',
+        type=Path,
+        nargs='+',
+        required=True,
+        help='The files to save the edited audio')
+    parser.add_argument(
+        '--speakers',
+        type=int,
+        nargs='+',
+        help='The IDs of the speakers for voice conversion')
+    parser.add_argument(
+        '--pitch_shift_cents',
+        type=float,
+        help='Amount of pitch-shifting in cents')
+    parser.add_argument(
+        '--time_stretch_ratio',
+        type=float,
+        help='Amount of time-stretching. Faster when above one.')
+    parser.add_argument(
+        '--loudness_scale_db',
+        type=float,
+        help='Amount of loudness scaling in dB')
+    parser.add_argument(
+        '--stretch_unvoiced',
+        action='store_true',
+        help='If provided, applies time-stretching to unvoiced frames')
+    parser.add_argument(
+        '--stretch_silence',
+        action='store_true',
+        help='If provided, applies time-stretching to silence frames')
+    parser.add_argument(
+        '--spectral_balance_ratio',
+        type=float,
+        default=1.,
+        help='> 1 for Alvin and the Chipmunks; < 1 for Patrick Star')
+    parser.add_argument(
+        '--checkpoint',
+        type=Path,
+        help='The generator checkpoint')
+    parser.add_argument(
+        '--gpu',
+        type=int,
+        help='The GPU index')
+    parser.add_argument(
+        '--quantize',
+        action='store_true',
+        help='Whether to use dynamic int8 quantization on CPU')
+    parser.add_argument(
+        '--backend',
+        default='eager',
+        choices=['eager', 'onnxruntime', 'torchscript'],
+        help='The inference backend')
+    parser.add_argument(
+        '--output_prefixes',
+        type=Path,
+        nargs='+',
+        help='If provided, also saves the edited features here, '
+             'minus extension')
+    parser.add_argument(
+        '--save_grid',
+        action='store_true',
+        help='If provided, also saves the time-stretch grid')
+    return parser.parse_args()
+
+
+promonet.edit_and_synthesize.from_files_to_files(**vars(parse_args()))
@@ -0,0 +1,278 @@
+import os
+from pathlib import Path
+from typing import List, Optional, Union
+
+import torch
+import torchaudio
+import torchutil
+
+import promonet
+
+
+###############################################################################
+# Edit and synthesize
+###############################################################################
+
+
+def from_features(
+    loudness: torch.Tensor,
+    pitch: torch.Tensor,
+    periodicity: torch.Tensor,
+    ppg: torch.Tensor,
+    speaker: Union[int, torch.Tensor] = 0,
+    pitch_shift_cents: Optional[float] = None,
+    time_stretch_ratio: Optional[float] = None,
+    loudness_scale_db: Optional[float] = None,
+    stretch_unvoiced: bool = True,
+    stretch_silence: bool = True,
+    spectral_balance_ratio: float = 1.,
+    loudness_ratio: float = 1.,
+    checkpoint: Optional[Union[str, os.PathLike]] = None,
+    gpu: Optional[int] = None,
+    quantize: bool = False,
+    backend: str = 'eager',
+    output_prefix: Optional[Union[str, os.PathLike]] = None,
+    save_grid: bool = False
+) -> torch.Tensor:
+    """Edit speech representation in memory and synthesize
+
+    Args:
+        loudness: The loudness contour
+        pitch: The pitch contour
+        periodicity: The periodicity contour
+        ppg: The phonetic posteriorgram. shape=(ppg_channels, frames) or
+            shape=(batch, ppg_channels, frames)
+        speaker: The speaker index or embedding
+        pitch_shift_cents: Amount of pitch-shifting in cents
+        time_stretch_ratio: Amount of time-stretching. Faster when above one.
+        loudness_scale_db: Loudness ratio editing in dB (not recommended; use loudness)
+        stretch_unvoiced: If true, applies time-stretching to unvoiced frames
+        stretch_silence: If true, applies time-stretching to silent frames
+        spectral_balance_ratio: > 1 for Alvin and the Chipmunks; < 1 for Patrick Star
+        loudness_ratio: > 1 for louder; < 1 for quieter
+        checkpoint: The generator checkpoint
+        gpu: The GPU index
+        quantize: Whether to use dynamic int8 quantization on CPU
+        backend: One of ['eager', 'onnxruntime', 'torchscript']
+        output_prefix: If provided, also saves the edited features here
+        save_grid: If true, also saves the time-stretch grid
+
+    Returns
+        generated: The generated speech
+    """
+    # Edit and maybe save edited features
+    with torchutil.time.context('edit'):
+        *features, grid = promonet.edit.from_features(
+            loudness,
+            pitch,
+            periodicity,
+            ppg,
+            pitch_shift_cents,
+            time_stretch_ratio,
+            loudness_scale_db,
+            stretch_unvoiced,
+            stretch_silence,
+            return_grid=True)
+        if output_prefix is not None:
+            promonet.edit.save(
+                output_prefix,
+                *features,
+                grid if save_grid else None)
+
+    # Maybe add batch dimension
+    loudness, pitch, periodicity, ppg = features
+    if ppg.ndim == 2:
+        ppg = ppg[None]
+
+    # Synthesize
+    return promonet.synthesize.from_features(
+        loudness,
+        pitch,
+        periodicity,
+        ppg,
+        speaker,
+        spectral_balance_ratio,
+        loudness_ratio,
+        checkpoint,
+        gpu,
+        quantize,
+        backend)
+
+
+def from_file_to_file(
+    loudness_file: Union[str, os.PathLike],
+    pitch_file: Union[str, os.PathLike],
+    periodicity_file: Union[str, os.PathLike],
+    ppg_file: Union[str, os.PathLike],
+    output_file: Union[str, os.PathLike],
+    speaker: Union[int, torch.Tensor, Path, str] = 0,
+    pitch_shift_cents: Optional[float] = None,
+    time_stretch_ratio: Optional[float] = None,
+    loudness_scale_db: Optional[float] = None,
+    stretch_unvoiced: bool = True,
+    stretch_silence: bool = True,
+    spectral_balance_ratio: float = 1.,
+    loudness_ratio: float = 1.,
+    checkpoint: Optional[Union[str, os.PathLike]] = None,
+    gpu: Optional[int] = None,
+    quantize: bool = False,
+    backend: str = 'eager',
+    output_prefix: Optional[Union[str, os.PathLike]] = None,
+    save_grid: bool = False
+) -> None:
+    """Edit speech representation on disk, synthesize, and save audio
+
+    Args:
+        loudness_file: The loudness file
+        pitch_file: The pitch file
+        periodicity_file: The periodicity file
+        ppg_file: The phonetic posteriorgram file
+        output_file: The file to save generated speech audio
+        speaker: The speaker index or embedding
+        pitch_shift_cents: Amount of pitch-shifting in cents
+        time_stretch_ratio: Amount of time-stretching. Faster when above one.
+        loudness_scale_db: Loudness ratio editing in dB (not recommended; use loudness)
+        stretch_unvoiced: If true, applies time-stretching to unvoiced frames
+        stretch_silence: If true, applies time-stretching to silent frames
+        spectral_balance_ratio: > 1 for Alvin and the Chipmunks; < 1 for Patrick Star
+        loudness_ratio: > 1 for louder; < 1 for quieter
+        checkpoint: The generator checkpoint
+        gpu: The GPU index
+        quantize: Whether to use dynamic int8 quantization on CPU
+        backend: One of ['eager', 'onnxruntime', 'torchscript']
+        output_prefix: If provided, also saves the edited features here
+        save_grid: If true, also saves the time-stretch grid
+    """
+    device = torch.device('cpu' if gpu is None else f'cuda:{gpu}')
+
+    # Load features. Loading and saving features is timed as editing, as
+    # when editing features on disk.
+    with torchutil.time.context('edit'):
+        loudness = torch.load(loudness_file)
+        pitch = torch.load(pitch_file)
+        periodicity = torch.load(periodicity_file)
+        ppg = promonet.load.ppg(ppg_file, resample_length=pitch.shape[-1])
+
+        # Maybe load speaker embedding
+        if promonet.ZERO_SHOT:
+            speaker = torch.load(speaker).to(device)
+
+    # Edit and synthesize
+    generated = from_features(
+        loudness.to(device),
+        pitch.to(device),
+        periodicity.to(device),
+        ppg.to(device),
+        speaker,
+        pitch_shift_cents,
+        time_stretch_ratio,
+        loudness_scale_db,
+        stretch_unvoiced,
+        stretch_silence,
+        spectral_balance_ratio,
+        loudness_ratio,
+        checkpoint,
+        gpu,
+        quantize,
+        backend,
+        output_prefix,
+        save_grid
+    ).to('cpu')
+
+    # Save
+    output_file = Path(output_file)
+    output_file.parent.mkdir(exist_ok=True, parents=True)
+    torchaudio.save(output_file, generated, promonet.SAMPLE_RATE)
+
+
+def from_files_to_files(
+    loudness_files: List[Union[str, os.PathLike]],
+    pitch_files: List[Union[str, os.PathLike]],
+    periodicity_files: List[Union[str, os.PathLike]],
+    ppg_files: List[Union[str, os.PathLike]],
+    output_files: List[Union[str, os.PathLike]],
+    speakers: Optional[Union[List[int], torch.Tensor, Path, str]] = None,
+    pitch_shift_cents: Optional[float] = None,
+    time_stretch_ratio: Optional[float] = None,
+    loudness_scale_db: Optional[float] = None,
+    stretch_unvoiced: bool = True,
+    stretch_silence: bool = True,
+    spectral_balance_ratio: float = 1.,
+    loudness_ratio: float = 1.,
+    checkpoint: Optional[Union[str, os.PathLike]] = None,
+    gpu: Optional[int] = None,
+    quantize: bool = False,
+    backend: str = 'eager',
+    output_prefixes: Optional[List[Union[str, os.PathLike]]] = None,
+    save_grid: bool = False
+) -> None:
+    """Edit speech representations on disk, synthesize, and save audio
+
+    Unlike running promonet.edit.from_files_to_files followed by
+    promonet.synthesize.from_files_to_files, features are loaded once and
+    edited in memory. Edited features are only written to disk if
+    output_prefixes is provided.
+
+    Args:
+        loudness_files: The loudness files
+        pitch_files: The pitch files
+        periodicity_files: The periodicity files
+        ppg_files: The phonetic posteriorgram files
+        output_files: The files to save generated speech audio
+        speakers: The speaker indices or embeddings
+        pitch_shift_cents: Amount of pitch-shifting in cents
+        time_stretch_ratio: Amount of time-stretching. Faster when above one.
+        loudness_scale_db: Loudness ratio editing in dB (not recommended; use loudness)
+        stretch_unvoiced: If true, applies time-stretching to unvoiced frames
+        stretch_silence: If true, applies time-stretching to silent frames
+        spectral_balance_ratio: > 1 for Alvin and the Chipmunks; < 1 for Patrick Star
+        loudness_ratio: > 1 for louder; < 1 for quieter
+        checkpoint: The generator checkpoint
+        gpu: The GPU index
+        quantize: Whether to use dynamic int8 quantization on CPU
+        backend: One of ['eager', 'onnxruntime', 'torchscript']
+        output_prefixes: If provided, also saves the edited features here
+        save_grid: If true, also saves the time-stretch grid
+    """
+    if speakers is None:
+        speakers = [0] * len(pitch_files)
+    if output_prefixes is None:
+        output_prefixes = [None] * len(pitch_files)
+
+    iterator = zip(
+        loudness_files,
+        pitch_files,
+        periodicity_files,
+        ppg_files,
+        output_files,
+        speakers,
+        output_prefixes)
+    for (
+        loudness_file,
+        pitch_file,
+        periodicity_file,
+        ppg_file,
+        output_file,
+        speaker,
+        output_prefix
+    ) in iterator:
+        from_file_to_file(
+            loudness_file,
+            pitch_file,
+            periodicity_file,
+            ppg_file,
+            output_file,
+            speaker,
+            pitch_shift_cents,
+            time_stretch_ratio,
+            loudness_scale_db,
+            stretch_unvoiced,
+            stretch_silence,
+            spectral_balance_ratio,
+            loudness_ratio,
+            checkpoint,
+            gpu,
+            quantize,
+            backend,
+            output_prefix,
+            save_grid)
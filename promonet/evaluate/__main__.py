@@ -25,6 +25,10 @@ def parse_args():
         '--gpu',
         type=int,
         help='The index of the gpu to use for evaluation')
+    parser.add_argument(
+        '--quantize',
+        action='store_true',
+        help='Whether to evaluate dynamic int8 quantized inference on CPU')
     return parser.parse_args()
 
 
@@ -39,8 +39,21 @@ import promonet
 
 
 @torchutil.notify('evaluate')
-def datasets(datasets, adapt=promonet.ADAPTATION, gpu=None):
-    """Evaluate the performance of the model on datasets"""
+def datasets(datasets, adapt=promonet.ADAPTATION, gpu=None, quantize=False):
+    """Evaluate the performance of the model on datasets
+
+    If quantize, synthesis uses dynamic int8 quantization on CPU and results
+    are saved as a separate condition, so that the real-time factor and
+    objective metrics can be compared against floating-point inference.
+    Quantization requires a generator that it covers (see
+    promonet.model.quantizable).
+    """
+    # Fail before adaptation if the generator cannot be quantized
+    if quantize and not promonet.model.quantizable():
+        raise ValueError(
+            f'Dynamic int8 quantization does not cover the convolutions of '
+            f'{promonet.MODEL}, so it cannot be evaluated as int8')
+
     aggregate_metrics = default_metrics()
 
     # Evaluate on each dataset
@@ -83,14 +96,14 @@ def datasets(datasets, adapt=promonet.ADAPTATION, gpu=None):
                 objective_directory = (
                     promonet.EVAL_DIR /
                     'objective' /
-                    promonet.CONFIG)
+                    condition(quantize))
                 objective_directory.mkdir(exist_ok=True, parents=True)
 
                 # Output directory for subjective evaluation
                 subjective_directory = (
                     promonet.EVAL_DIR /
                     'subjective' /
-                    promonet.CONFIG)
+                    condition(quantize))
                 subjective_directory.mkdir(exist_ok=True, parents=True)
 
                 # Evaluate a speaker
@@ -105,15 +118,18 @@ def datasets(datasets, adapt=promonet.ADAPTATION, gpu=None):
                     subjective_directory,
                     index,
                     adapt,
-                    gpu)
+                    gpu,
+                    quantize)
 
         # Aggregate results
-        results_directory = promonet.RESULTS_DIR / promonet.CONFIG / dataset
+        results_directory = (
+            promonet.RESULTS_DIR / condition(quantize) / dataset)
         results_directory.mkdir(exist_ok=True, parents=True)
         results = {'num_samples': 0, 'num_frames': 0}
         results |= {key: value() for key, value in dataset_metrics.items()}
 
-        results_directory = promonet.RESULTS_DIR / promonet.CONFIG / dataset
+        results_directory = (
+            promonet.RESULTS_DIR / condition(quantize) / dataset)
         for file in results_directory.glob(f'*.json'):
             if file.stem == 'results':
                 continue
@@ -150,11 +166,15 @@ def speaker(
     subjective_directory,
     index,
     adapt=promonet.ADAPTATION,
-    gpu=None
+    gpu=None,
+    quantize=False
 ):
     """Evaluate one adaptation speaker in a dataset"""
     device = f'cuda:{gpu}' if gpu is not None else 'cpu'
 
+    # Quantized inference runs on CPU
+    synthesis_gpu = None if quantize else gpu
+
     if promonet.MODEL != 'world' and adapt:
         adapt_directory = checkpoint_directory / 'adapt' / dataset / index
         adapt_directory.mkdir(exist_ok=True, parents=True)
@@ -293,7 +313,8 @@ def speaker(
             files['reconstructed-100'],
             checkpoint=checkpoint,
             speakers=speakers,
-            gpu=gpu)
+            gpu=synthesis_gpu,
+            quantize=quantize)
 
     ###################
     # Prosody editing #
@@ -306,27 +327,28 @@ def speaker(
         ##################
 
         if 'pitch' in promonet.INPUT_FEATURES:
-
-            # Edit features
-            with torchutil.time.context('edit'):
-                key = f'shifted-{int(ratio * 100):03d}'
-                output_prefixes = [
-                    original_objective_directory /
-                    prefix.replace('original-100', key)
-                    for prefix in prefixes]
-                promonet.edit.from_files_to_files(
-                    loudness_files,
-                    pitch_files,
-                    periodicity_files,
-                    ppg_files,
-                    output_prefixes,
-                    pitch_shift_cents=promonet.convert.ratio_to_cents(ratio))
-
-            # Generate
+            key = f'shifted-{int(ratio * 100):03d}'
+            output_prefixes = [
+                original_objective_directory /
+                prefix.replace('original-100', key)
+                for prefix in prefixes]
             files[key] = [
                 subjective_directory / f'{prefix.name}.wav'
                 for prefix in output_prefixes]
+            edit = {'pitch_shift_cents': promonet.convert.ratio_to_cents(ratio)}
             if promonet.MODEL == 'world':
+
+                # Edit features
+                with torchutil.time.context('edit'):
+                    promonet.edit.from_files_to_files(
+                        loudness_files,
+                        pitch_files,
+                        periodicity_files,
+                        ppg_files,
+                        output_prefixes,
+                        **edit)
+
+                # Generate
                 synthesis_fn = functools.partial(
                     promonet.baseline.world.from_files_to_files,
                     periodicity_files=[
@@ -337,15 +359,21 @@ def speaker(
                     files[key],
                     pitch_files=[f'{prefix}{viterbi}-pitch.pt' for prefix in output_prefixes])
             else:
-                promonet.synthesize.from_files_to_files(
-                    [f'{prefix}-loudness.pt' for prefix in output_prefixes],
-                    [f'{prefix}{viterbi}-pitch.pt' for prefix in output_prefixes],
-                    [f'{prefix}{viterbi}-periodicity.pt' for prefix in output_prefixes],
-                    [f'{prefix}{ppgs.representation_file_extension()}' for prefix in output_prefixes],
+
+                # Edit features in memory and generate. Edited features are
+                # saved as evaluation targets.
+                promonet.edit_and_synthesize.from_files_to_files(
+                    loudness_files,
+                    pitch_files,
+                    periodicity_files,
+                    ppg_files,
                     files[key],
+                    speakers,
                     checkpoint=checkpoint,
-                    speakers=speakers,
-                    gpu=gpu)
+                    gpu=synthesis_gpu,
+                    quantize=quantize,
+                    output_prefixes=output_prefixes,
+                    **edit)
 
         ###################
         # Time stretching #
@@ -355,29 +383,31 @@ def speaker(
             'ppg' in promonet.INPUT_FEATURES and
             ppgs.REPRESENTATION_KIND == 'ppg'
         ):
-
-            # Edit features
-            with torchutil.time.context('edit'):
-                key = f'stretched-{int(ratio * 100):03d}'
-                output_prefixes = [
-                    original_objective_directory /
-                    prefix.replace('original-100', key)
-                    for prefix in prefixes]
-                promonet.edit.from_files_to_files(
-                    loudness_files,
-                    pitch_files,
-                    periodicity_files,
-                    ppg_files,
-                    output_prefixes,
-                    time_stretch_ratio=ratio,
-                    stretch_unvoiced=False,
-                    save_grid=True)
-
-            # Generate
+            key = f'stretched-{int(ratio * 100):03d}'
+            output_prefixes = [
+                original_objective_directory /
+                prefix.replace('original-100', key)
+                for prefix in prefixes]
             files[key] = [
                 subjective_directory / f'{prefix.name}.wav'
                 for prefix in output_prefixes]
+            edit = {
+                'time_stretch_ratio': ratio,
+                'stretch_unvoiced': False,
+                'save_grid': True}
             if promonet.MODEL == 'world':
+
+                # Edit features
+                with torchutil.time.context('edit'):
+                    promonet.edit.from_files_to_files(
+                        loudness_files,
+                        pitch_files,
+                        periodicity_files,
+                        ppg_files,
+                        output_prefixes,
+                        **edit)
+
+                # Generate
                 synthesis_fn = functools.partial(
                     promonet.baseline.world.from_files_to_files,
                     pitch_files=[
@@ -391,42 +421,49 @@ def speaker(
                     files[key],
                     grid_files=[f'{prefix}-grid.pt' for prefix in output_prefixes])
             else:
-                promonet.synthesize.from_files_to_files(
-                    [f'{prefix}-loudness.pt' for prefix in output_prefixes],
-                    [f'{prefix}{viterbi}-pitch.pt' for prefix in output_prefixes],
-                    [f'{prefix}{viterbi}-periodicity.pt' for prefix in output_prefixes],
-                    [f'{prefix}{ppgs.representation_file_extension()}' for prefix in output_prefixes],
+
+                # Edit features in memory and generate. Edited features are
+                # saved as evaluation targets.
+                promonet.edit_and_synthesize.from_files_to_files(
+                    loudness_files,
+                    pitch_files,
+                    periodicity_files,
+                    ppg_files,
                     files[key],
+                    speakers,
                     checkpoint=checkpoint,
-                    speakers=speakers,
-                    gpu=gpu)
+                    gpu=synthesis_gpu,
+                    quantize=quantize,
+                    output_prefixes=output_prefixes,
+                    **edit)
 
         ####################
         # Loudness scaling #
         ####################
 
         if 'loudness' in promonet.INPUT_FEATURES:
-
-            # Edit features
-            with torchutil.time.context('edit'):
-                key = f'scaled-{int(ratio * 100):03d}'
-                output_prefixes = [
-                    original_objective_directory /
-                    prefix.replace('original-100', key)
-                    for prefix in prefixes]
-                promonet.edit.from_files_to_files(
-                    loudness_files,
-                    pitch_files,
-                    periodicity_files,
-                    ppg_files,
-                    output_prefixes,
-                    loudness_scale_db=promonet.convert.ratio_to_db(ratio))
-
-            # Generate
+            key = f'scaled-{int(ratio * 100):03d}'
+            output_prefixes = [
+                original_objective_directory /
+                prefix.replace('original-100', key)
+                for prefix in prefixes]
             files[key] = [
                 subjective_directory / f'{prefix.name}.wav'
                 for prefix in output_prefixes]
+            edit = {'loudness_scale_db': promonet.convert.ratio_to_db(ratio)}
             if promonet.MODEL == 'world':
+
+                # Edit features
+                with torchutil.time.context('edit'):
+                    promonet.edit.from_files_to_files(
+                        loudness_files,
+                        pitch_files,
+                        periodicity_files,
+                        ppg_files,
+                        output_prefixes,
+                        **edit)
+
+                # Generate
                 synthesis_fn = functools.partial(
                     promonet.baseline.world.from_files_to_files,
                     pitch_files=[
@@ -441,15 +478,21 @@ def speaker(
                     loudness_files=[
                         f'{prefix}-loudness.pt' for prefix in output_prefixes])
             else:
-                promonet.synthesize.from_files_to_files(
-                    [f'{prefix}-loudness.pt' for prefix in output_prefixes],
-                    [f'{prefix}{viterbi}-pitch.pt' for prefix in output_prefixes],
-                    [f'{prefix}{viterbi}-periodicity.pt' for prefix in output_prefixes],
-                    [f'{prefix}{ppgs.representation_file_extension()}' for prefix in output_prefixes],
+
+                # Edit features in memory and generate. Edited features are
+                # saved as evaluation targets.
+                promonet.edit_and_synthesize.from_files_to_files(
+                    loudness_files,
+                    pitch_files,
+                    periodicity_files,
+                    ppg_files,
                     files[key],
+                    speakers,
                     checkpoint=checkpoint,
-                    speakers=speakers,
-                    gpu=gpu)
+                    gpu=synthesis_gpu,
+                    quantize=quantize,
+                    output_prefixes=output_prefixes,
+                    **edit)
 
         ############################
         # Spectral balance editing #
@@ -509,7 +552,8 @@ def speaker(
                     speakers=speakers,
                     spectral_balance_ratio=ratio,
                     checkpoint=checkpoint,
-                    gpu=gpu)
+                    gpu=synthesis_gpu,
+                    quantize=quantize)
 
         ###############################
         # Perceptual loudness editing #
@@ -569,7 +613,8 @@ def speaker(
                     speakers=speakers,
                     loudness_ratio=ratio,
                     checkpoint=checkpoint,
-                    gpu=gpu)
+                    gpu=synthesis_gpu,
+                    quantize=quantize)
 
     ############################
     # Speech -> representation #
@@ -668,7 +713,11 @@ def speaker(
         results['num_samples'])
 
     # Save to disk
-    file = promonet.RESULTS_DIR / promonet.CONFIG / dataset / f'{index}.json'
+    file = (
+        promonet.RESULTS_DIR /
+        condition(quantize) /
+        dataset /
+        f'{index}.json')
     file.parent.mkdir(exist_ok=True, parents=True)
     with open(file, 'w') as file:
         json.dump(results, file, indent=4, sort_keys=True)
@@ -679,6 +728,11 @@ def speaker(
 ###############################################################################
 
 
+def condition(quantize=False):
+    """Get the name of the evaluation condition"""
+    return f'{promonet.CONFIG}-int8' if quantize else promonet.CONFIG
+
+
 def default_metrics():
     """Construct the default metrics dictionary for each condition"""
     # Reconstruction metrics
@@ -176,10 +176,10 @@ def ppg(file, resample_length=None):
 
     # Maybe resample
     if resample_length is not None and result.shape[-1] != resample_length:
-        result = promonet.edit.grid.sample(
-            result,
+        sample = promonet.edit.grid.Sampler(
             promonet.edit.grid.of_length(result, resample_length),
-            promonet.PPG_INTERP_METHOD)
+            result.shape[-1])
+        result = sample(result, promonet.PPG_INTERP_METHOD)
 
         # Preserve distribution
         if ppgs.REPRESENTATION_KIND == 'ppgs':
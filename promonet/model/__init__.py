@@ -1,4 +1,9 @@
+from . import cache
 from . import export
+from . import jit
+from . import onnx
+from .cache import GeneratorCache
+from .cargan import CARGAN
 from .core import *
 from .discriminator import Discriminator
 from .fargan import FARGAN
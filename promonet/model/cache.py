@@ -0,0 +1,170 @@
+import collections
+import threading
+import time
+from pathlib import Path
+
+import huggingface_hub
+import torch
+import torchutil
+
+import promonet
+
+
+###############################################################################
+# Generator cache
+###############################################################################
+
+
+class GeneratorCache:
+    """Thread-safe least-recently-used cache of generators
+
+    Generators are keyed by checkpoint file, device, model type, whether they
+    are quantized, and inference backend, so that
+    alternating between a few checkpoints (e.g., adapted speakers) does not
+    reload from disk on every call.
+    """
+
+    def __init__(self, capacity=promonet.GENERATOR_CACHE_CAPACITY):
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.models = collections.OrderedDict()
+        self.reset()
+
+    def __call__(
+        self,
+        checkpoint=None,
+        device='cpu',
+        model_type=None,
+        quantize=False,
+        backend='eager'
+    ):
+        """Retrieve a generator, loading it on a cache miss
+
+        Arguments
+            checkpoint
+                The generator checkpoint file or directory. If None, uses the
+                pretrained checkpoint.
+            device
+                The device to place the generator on
+            model_type
+                The generator class. Defaults to promonet.model.MelGenerator
+                if promonet.SPECTROGRAM_ONLY, else promonet.model.Generator.
+            quantize
+                Whether to apply dynamic int8 quantization. Requires CPU.
+            backend
+                The inference backend.
+                One of ['eager', 'onnxruntime', 'torchscript'].
+
+        Returns
+            The generator
+        """
+        if model_type is None:
+            model_type = (
+                promonet.model.MelGenerator if promonet.SPECTROGRAM_ONLY
+                else promonet.model.Generator)
+        device = torch.device(device)
+        if quantize and device.type != 'cpu':
+            raise ValueError('Quantized inference is only supported on CPU')
+        if quantize and backend == 'onnxruntime':
+            raise ValueError('Quantized ONNX inference is not supported')
+
+        with self.lock:
+            key = (resolve(checkpoint), device, model_type, quantize, backend)
+
+            # Cache hit
+            if key in self.models:
+                self.hits += 1
+                self.models.move_to_end(key)
+                return self.models[key]
+
+            # Cache miss
+            self.misses += 1
+            start = time.perf_counter()
+            if backend == 'eager':
+                model = model_type().to(device)
+                model, *_ = torchutil.checkpoint.load(key[0], model)
+                if quantize:
+                    model = promonet.model.quantize(model)
+            elif (
+                backend == 'torchscript' and
+                model_type is promonet.model.Generator
+            ):
+                model = promonet.model.jit.load(key[0], device, quantize)
+            elif (
+                backend == 'onnxruntime' and
+                model_type is promonet.model.Generator
+            ):
+                model = promonet.model.onnx.load(key[0], device)
+            else:
+                raise ValueError(
+                    f'Inference backend {backend} is not defined for '
+                    f'{model_type.__name__}')
+            self.load_time += time.perf_counter() - start
+
+            # Evict least-recently-used generators
+            self.models[key] = model
+            while len(self.models) > max(1, self.capacity):
+                self.models.popitem(last=False)
+                self.evictions += 1
+
+            return model
+
+    def __len__(self):
+        return len(self.models)
+
+    def clear(self):
+        """Remove all generators from the cache"""
+        with self.lock:
+            self.models.clear()
+
+    def reset(self):
+        """Reset cache statistics"""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_time = 0.
+
+    def stats(self):
+        """Get cache statistics"""
+        with self.lock:
+            return {
+                'capacity': self.capacity,
+                'evictions': self.evictions,
+                'hits': self.hits,
+                'load-time': self.load_time,
+                'misses': self.misses,
+                'size': len(self.models)}
+
+
+###############################################################################
+# Shared cache
+###############################################################################
+
+
+# Generator cache shared by synthesis entry points
+generators = GeneratorCache()
+
+
+###############################################################################
+# Utilities
+###############################################################################
+
+
+def resolve(checkpoint=None):
+    """Resolve a checkpoint argument to a checkpoint file"""
+    # Download pretrained checkpoint
+    if checkpoint is None:
+        if not hasattr(resolve, 'default'):
+            resolve.default = Path(huggingface_hub.hf_hub_download(
+                'maxrmorrison/promonet',
+                f'generator-00{promonet.STEPS}.pt'))
+        return resolve.default
+
+    # Get latest checkpoint in directory
+    checkpoint = Path(checkpoint)
+    if checkpoint.is_dir():
+        checkpoint = torchutil.checkpoint.latest_path(
+            checkpoint,
+            'generator-*.pt')
+
+    return checkpoint.resolve()
@@ -25,7 +25,7 @@ class CARGAN(torch.nn.Module):
             ar = self.buffer
         ar = self.ar(ar)
         ar = ar.unsqueeze(2).repeat(1, 1, x.shape[2])
-        y = self.model(torch.cat((x, ar), dim=1))
+        y = self.model(torch.cat((x, ar), dim=1), g, None)
         if not self.training:
             self.buffer = y[..., -promonet.CARGAN_INPUT_SIZE:]
         return y
@@ -1,5 +1,9 @@
+import math
+
 import torch
 
+import promonet
+
 
 ###############################################################################
 # Shared model utilities
@@ -11,6 +15,43 @@ def get_padding(kernel_size, dilation=1, stride=1):
     return int((kernel_size * dilation - dilation - stride + 1) / 2)
 
 
+def quantizable():
+    """Whether dynamic int8 quantization covers the configured generator
+
+    PyTorch does not dynamically quantize convolutions, so HiFi-GAN and
+    CARGAN, which are convolution stacks, would run in floating point.
+    """
+    return promonet.MODEL in ['fargan', 'vocos']
+
+
+def quantize(model):
+    """Apply dynamic int8 quantization to a generator for CPU inference
+
+    Weights of linear and recurrent layers are stored as int8 and activations
+    are quantized on the fly. Raises a ValueError if the generator is mostly
+    convolutions, which PyTorch does not dynamically quantize.
+
+    Arguments
+        model: A promonet.model.Generator or promonet.model.MelGenerator
+
+    Returns
+        The quantized model
+    """
+    if not quantizable():
+        raise ValueError(
+            f'Dynamic int8 quantization does not cover the convolutions of '
+            f'{promonet.MODEL}, which would run in floating point')
+
+    # Quantized layers copy the weights, so fold weight normalization first
+    model.remove_weight_norm()
+
+    return torch.ao.quantization.quantize_dynamic(
+        model.to('cpu').eval(),
+        {torch.nn.GRUCell, torch.nn.Linear},
+        dtype=torch.qint8,
+        inplace=True)
+
+
 def random_slice_segments(segments, lengths, segment_size):
     """Randomly slice segments along last dimension"""
     max_start_indices = lengths - segment_size + 1
@@ -20,6 +61,30 @@ def random_slice_segments(segments, lengths, segment_size):
     return segments, start_indices
 
 
+def receptive_field(conv, context=0):
+    """Compute the one-sided input context needed for a given output context
+
+    Arguments
+        conv: A torch.nn.Conv1d or torch.nn.ConvTranspose1d layer
+        context: The number of output samples needed on each side
+
+    Returns
+        The number of input samples needed on each side
+    """
+    kernel_size, = conv.kernel_size
+    dilation, = conv.dilation
+    stride, = conv.stride
+    padding, = conv.padding
+    extent = dilation * (kernel_size - 1)
+
+    # Each output sample of a transposed convolution depends on the
+    # input samples within one kernel extent
+    if isinstance(conv, torch.nn.ConvTranspose1d):
+        return math.ceil((context + extent + 1) / stride) + 1
+
+    return stride * context + max(padding, extent - padding)
+
+
 def slice_segments(segments, start_indices, segment_size, fill_value=0.):
     """Slice segments along last dimension"""
     slices = torch.full_like(segments[..., :segment_size], fill_value)
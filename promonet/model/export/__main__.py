@@ -12,7 +12,8 @@ import promonet
 
 def parse_args():
     """Parse command-line arguments"""
-    parser = yapecs.ArgumentParser(description='Export torchscript model')
+    parser = yapecs.ArgumentParser(
+        description='Export torchscript or ONNX model')
     parser.add_argument(
         '--checkpoint',
         type=Path,
@@ -20,8 +21,17 @@ def parse_args():
     parser.add_argument(
         '--output_file',
         type=Path,
-        default='promonet-export.ts',
-        help='The torch file to write the exported model')
+        help='The file to write the exported model. Defaults to '
+             'promonet-export.ts or promonet-export.onnx.')
+    parser.add_argument(
+        '--quantize',
+        action='store_true',
+        help='Whether to apply dynamic int8 quantization for CPU inference')
+    parser.add_argument(
+        '--format',
+        default='torchscript',
+        choices=['onnx', 'torchscript'],
+        help='The export format')
 
     return parser.parse_args()
 
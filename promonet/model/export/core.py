@@ -8,15 +8,33 @@ import promonet
 ###############################################################################
 
 
-def from_file_to_file(checkpoint=None, output_file='promonet-export.ts'):
-    """Load model from checkpoint and export to torchscript"""
+def from_file_to_file(
+    checkpoint=None,
+    output_file=None,
+    quantize=False,
+    format='torchscript'
+):
+    """Load model from checkpoint and export to torchscript or ONNX"""
+    if output_file is None:
+        output_file = (
+            'promonet-export.onnx' if format == 'onnx'
+            else 'promonet-export.ts')
+
     # Load model
     model = promonet.model.Generator()
     if checkpoint is not None:
         model, *_ = torchutil.checkpoint.load(checkpoint, model)
 
+    # Export to ONNX and check parity
+    if format == 'onnx':
+        if quantize:
+            raise ValueError('Quantized ONNX export is not supported')
+        error = promonet.model.onnx.export(model, output_file)
+        print(f'Maximum absolute error of ONNX export: {error:.6f}')
+        return
+
     # Switch to evaluation mode
     with torchutil.inference.context(model):
 
         # Export
-        model.export(output_file)
+        model.export(output_file, quantize)
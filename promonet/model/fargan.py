@@ -1,5 +1,5 @@
 import torch
-from typing import Tuple
+from typing import List, Optional, Tuple
 
 import promonet
 
@@ -41,22 +41,37 @@ class FARGAN(torch.nn.Module):
         """
         device = features.device
 
-        # Initialize signal
-        signal = torch.zeros((features.shape[0], 0), device=device)
-
         # Initialize recurrent state
         states = initialize_recurrent_state(features.shape[0], device)
 
         # Iterate over frames
+        signal: List[torch.Tensor] = []
         for feature in features.permute(2, 0, 1):
             frame, previous_samples, states = self.step(
                 feature,
                 global_features.squeeze(2),
                 previous_samples,
                 states)
-            signal = torch.cat([signal, frame], 1)
+            signal.append(frame)
 
-        return signal.unsqueeze(1)
+        return torch.cat(signal, 1).unsqueeze(1)
+
+    def init_state(
+        self,
+        batch_size: int = 1,
+        device: torch.device = torch.device('cpu')
+    ):
+        """Initialize the state for streaming inference with step_frames
+
+        Returns
+            state
+                Previous waveform context followed by the recurrent state
+        """
+        return (
+            torch.zeros(
+                (batch_size, 1, promonet.NUM_PREVIOUS_SAMPLES),
+                device=device),
+            *initialize_recurrent_state(batch_size, device))
 
     def remove_weight_norm(self):
         """Remove weight norm for scriptable inference"""
@@ -102,10 +117,8 @@ class FARGAN(torch.nn.Module):
         features = self.conditioning_network(
             torch.cat((features, global_features), dim=1))
 
-        # Initialize signal
-        signal = torch.zeros((features.shape[0], 0), device=features.device)
-
         # Iterate over subframes
+        signal: List[torch.Tensor] = []
         for subframe in features.reshape(
             features.shape[0],
             2 * promonet.FARGAN_SUBFRAME_SIZE,
@@ -118,7 +131,7 @@ class FARGAN(torch.nn.Module):
                 previous_samples,
                 period,
                 states)
-            signal = torch.cat([signal, subframe], dim=1)
+            signal.append(subframe)
 
             # Update previous samples
             previous_samples = torch.cat(
@@ -128,7 +141,88 @@ class FARGAN(torch.nn.Module):
                 ],
                 dim=2)
 
-        return signal, previous_samples, states
+        return torch.cat(signal, dim=1), previous_samples, states
+
+    def step_frames(
+        self,
+        features,
+        global_features,
+        state,
+        buffer: Optional[torch.Tensor] = None
+    ):
+        """Generate frames from a recurrent state for streaming inference
+
+        Writes directly into a single buffer that holds both the previous
+        waveform context and the generated samples, so no intermediate
+        signals are allocated. Use within an inference context.
+
+        Arguments
+            features
+                Framewise input features
+                shape=(batch, promonet.NUM_FEATURES + 1, frames)
+            global_features
+                Global input features
+                shape=(batch, promonet.GLOBAL_CHANNELS, 1)
+            state
+                State returned by init_state or a previous call
+            buffer
+                Optional preallocated buffer to reuse across calls
+                shape=(
+                    batch,
+                    promonet.NUM_PREVIOUS_SAMPLES + promonet.HOPSIZE * frames)
+
+        Returns
+            signal
+                Generated audio signal; a view into buffer
+                shape=(batch, 1, promonet.HOPSIZE * frames)
+            state
+                Updated state to pass to the next call
+        """
+        previous_samples, states = state[0], state[1:]
+        batch_size, _, frames = features.shape
+        history = previous_samples.shape[-1]
+        length = history + promonet.HOPSIZE * frames
+
+        # Maybe allocate buffer
+        if buffer is None or buffer.shape[-1] < length:
+            buffer = features.new_empty((batch_size, length))
+        buffer = buffer[:, :length]
+        buffer[:, :history] = previous_samples[:, 0]
+
+        # Embed all frame features at once, as embedding is not recurrent
+        period = torch.round(features[:, -1]).to(torch.long)
+        conditioning = self.conditioning_network(
+            torch.cat(
+                (features[:, :-1], global_features.expand(-1, -1, frames)),
+                dim=1
+            ).permute(0, 2, 1)
+        ).reshape(
+            batch_size,
+            frames,
+            2 * promonet.FARGAN_SUBFRAME_SIZE,
+            promonet.FARGAN_SUBFRAMES)
+
+        # Iterate over frames and subframes
+        offset = history
+        for i in range(frames):
+            for j in range(promonet.FARGAN_SUBFRAMES):
+
+                # Compute subframe samples
+                subframe, states = self.subframe_network(
+                    conditioning[:, i, :, j],
+                    buffer[:, None, offset - history:offset],
+                    period[:, i],
+                    states)
+
+                # Write to buffer, which also updates the previous samples
+                buffer[:, offset:offset + promonet.FARGAN_SUBFRAME_SIZE] = \
+                    subframe
+                offset += promonet.FARGAN_SUBFRAME_SIZE
+
+        # Save previous samples for the next call
+        state = (buffer[:, None, -history:].clone(), *states)
+
+        return buffer[:, None, history:], state
 
 
 ###############################################################################
@@ -15,7 +15,11 @@ class BaseGenerator(torch.nn.Module):
         super().__init__()
 
         # Model selection
-        if promonet.MODEL == 'fargan':
+        if promonet.MODEL == 'cargan':
+            self.model = promonet.model.CARGAN(
+                promonet.NUM_FEATURES,
+                promonet.GLOBAL_CHANNELS)
+        elif promonet.MODEL == 'fargan':
             self.model = promonet.model.FARGAN(
                 promonet.NUM_FEATURES,
                 promonet.GLOBAL_CHANNELS)
@@ -108,6 +112,14 @@ class Generator(BaseGenerator):
         self.use_loudness = 'loudness' in promonet.INPUT_FEATURES
         self.use_periodicity = 'periodicity' in promonet.INPUT_FEATURES
 
+        # Loudness band averaging matrix. Not saved in checkpoints.
+        self.register_buffer(
+            'loudness_band_weights',
+            promonet.preprocess.loudness.band_weights(
+                promonet.NUM_FFT // 2 + 1,
+                promonet.LOUDNESS_BANDS).clone(),
+            persistent=False)
+
         # Torchscript prohibits try/except or attribute lookup in forward
         if self.use_pitch and promonet.VARIABLE_PITCH_BINS:
             pitch_distribution = promonet.load.pitch_distribution()
@@ -153,7 +165,10 @@ class Generator(BaseGenerator):
             hz = torch.clip(pitch, promonet.FMIN, promonet.FMAX)
             if promonet.PITCH_EMBEDDING:
                 if promonet.VARIABLE_PITCH_BINS:
-                    bins = torch.searchsorted(self.pitch_distribution, hz)
+                    # Equivalent to torch.searchsorted, which ONNX lacks
+                    bins = (
+                        hz[..., None] > self.pitch_distribution
+                    ).sum(dim=-1)
                     bins = torch.clip(bins, 0, promonet.PITCH_BINS - 1)
                 else:
                     normalized = (
@@ -170,14 +185,14 @@ class Generator(BaseGenerator):
 
         # Maybe add loudness features
         if self.use_loudness:
-            bands = promonet.LOUDNESS_BANDS
-            step = loudness.shape[-2] / bands
-            averaged = torch.stack(
-                [
-                    loudness[:, int(band * step):int((band + 1) * step)].mean(dim=-2)
-                    for band in range(bands)
-                ],
-                dim=1)
+
+            # Loudness may already be averaged into bands
+            if loudness.shape[-2] == promonet.LOUDNESS_BANDS:
+                averaged = loudness
+            else:
+                averaged = torch.matmul(
+                    self.loudness_band_weights.to(loudness.dtype),
+                    loudness)
             normalized = promonet.preprocess.loudness.normalize(averaged)
             if normalized.ndim == 2:
                 normalized = normalized[None]
@@ -200,10 +215,13 @@ class Generator(BaseGenerator):
     # Model exporting
     ###########################################################################
 
-    def export(self, output_file):
+    def export(self, output_file, quantize=False):
         """Export model using torchscript"""
-        # Remove weight normalization
-        self.remove_weight_norm()
+        # Remove weight normalization and maybe quantize
+        if quantize:
+            promonet.model.quantize(self)
+        else:
+            self.remove_weight_norm()
 
         # Register packed inference method
         self.register()
@@ -446,9 +464,9 @@ class MelGenerator(BaseGenerator):
             loudness_ratios)
 
         # Synthesize
-        if promonet.MODEL == 'cargan':
-            return self.model(features, global_features, previous_samples)
-        return self.model(features, global_features)
+        if promonet.MODEL == 'vocos':
+            return self.model(features, global_features)
+        return self.model(features, global_features, previous_samples)
 
     def prepare_features(self, spectrograms):
         """Prepare input features for training or inference"""
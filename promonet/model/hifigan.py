@@ -69,6 +69,18 @@ class HiFiGAN(torch.nn.Module):
 
         return self.model(x)
 
+    def receptive_field(self):
+        """One-sided receptive field in input frames"""
+        context = 0
+        for layer in reversed(self.model):
+            if isinstance(layer, MultiReceptiveFieldFusion):
+                context = layer.receptive_field(context)
+            elif isinstance(layer, torch.nn.Conv1d):
+                context = promonet.model.receptive_field(layer, context)
+        return promonet.model.receptive_field(
+            self.input_feature_conv,
+            context)
+
     def remove_weight_norm(self):
         """Remove weight norm for scriptable inference"""
         for layer in self.model:
@@ -114,6 +126,11 @@ class MultiReceptiveFieldFusion(torch.nn.Module):
     def forward(self, x):
         return self.model(x)
 
+    def receptive_field(self, context=0):
+        """One-sided input context needed for a given output context"""
+        context = self.model[2].receptive_field(context)
+        return promonet.model.receptive_field(self.model[1], context)
+
     def remove_weight_norm(self):
         """Remove weight norm for scriptable inference"""
         torch.nn.utils.remove_weight_norm(self.model[1])
@@ -144,6 +161,10 @@ class ResidualBlock(torch.nn.Module):
             xs = layer(x) if xs is None else xs + layer(x)
         return xs / self.num_kernels
 
+    def receptive_field(self, context=0):
+        """One-sided input context needed for a given output context"""
+        return max(layer.receptive_field(context) for layer in self.model)
+
     def remove_weight_norm(self):
         for layer in self.model:
             layer.remove_weight_norm()
@@ -209,6 +230,13 @@ class Block(torch.nn.Module):
             x = xt + x
         return x
 
+    def receptive_field(self, context=0):
+        """One-sided input context needed for a given output context"""
+        for c1, c2 in reversed(list(zip(self.convs1, self.convs2))):
+            context = promonet.model.receptive_field(c2, context)
+            context = promonet.model.receptive_field(c1, context)
+        return context
+
     def remove_weight_norm(self):
         """Remove weight norm for scriptable inference"""
         for layer in self.convs1:
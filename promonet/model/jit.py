@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import ppgs
+import torch
+import torchutil
+
+import promonet
+
+
+###############################################################################
+# Constants
+###############################################################################
+
+
+# Configuration that changes the compiled generator
+CONFIG = [
+    'AUGMENT_LOUDNESS',
+    'AUGMENT_PITCH',
+    'CARGAN_HIDDEN_SIZE',
+    'CARGAN_INPUT_SIZE',
+    'CARGAN_OUTPUT_SIZE',
+    'DYNAMIC_RANGE_COMPRESSION_THRESHOLD',
+    'FARGAN_GAIN_NORMALIZATION',
+    'FARGAN_PREVIOUS_FRAMES',
+    'FARGAN_SUBFRAMES',
+    'FMAX',
+    'FMIN',
+    'HIFIGAN_RESBLOCK_DILATION_SIZES',
+    'HIFIGAN_RESBLOCK_KERNEL_SIZES',
+    'HIFIGAN_UPSAMPLE_INITIAL_SIZE',
+    'HIFIGAN_UPSAMPLE_KERNEL_SIZES',
+    'HIFIGAN_UPSAMPLE_RATES',
+    'HOPSIZE',
+    'INPUT_FEATURES',
+    'LOUDNESS_BANDS',
+    'LRELU_SLOPE',
+    'MIN_DB',
+    'MODEL',
+    'NUM_FFT',
+    'NUM_MELS',
+    'NUM_SPEAKERS',
+    'PITCH_BINS',
+    'PITCH_EMBEDDING',
+    'PITCH_EMBEDDING_SIZE',
+    'PPG_CHANNELS',
+    'REF_DB',
+    'SAMPLE_RATE',
+    'SPARSE_MELS',
+    'SPARSE_PPG_METHOD',
+    'SPARSE_PPG_THRESHOLD',
+    'SPEAKER_CHANNELS',
+    'SPECTROGRAM_ONLY',
+    'VARIABLE_PITCH_BINS',
+    'VOCOS_CHANNELS',
+    'VOCOS_LAYERS',
+    'VOCOS_POINTWISE_CHANNELS',
+    'WAVLM_EMBEDDING_CHANNELS',
+    'ZERO_SHOT']
+
+
+###############################################################################
+# Compiled inference
+###############################################################################
+
+
+def load(checkpoint, device='cpu', quantize=False):
+    """Load a compiled generator, compiling it on first use
+
+    The generator is scripted and frozen with TorchScript. The compiled
+    artifact is saved next to the checkpoint, keyed by the checkpoint
+    contents and the configuration of the generator, and reused by later
+    processes.
+
+    Arguments
+        checkpoint
+            The generator checkpoint file
+        device
+            The device to place the generator on
+        quantize
+            Whether to apply dynamic int8 quantization
+
+    Returns
+        The compiled generator
+    """
+    file = artifact_file(checkpoint, quantize)
+
+    # Compile and save
+    if not file.exists():
+        model = promonet.model.Generator()
+        model, *_ = torchutil.checkpoint.load(checkpoint, model)
+        with torchutil.inference.context(model):
+
+            # Remove weight normalization and maybe quantize
+            if quantize:
+                promonet.model.quantize(model)
+            else:
+                model.remove_weight_norm()
+
+            # Register packed inference method needed for scripting
+            model.register()
+
+            # Compile, keeping the initial previous samples used for
+            # inference
+            compiled = torch.jit.freeze(
+                torch.jit.script(model),
+                preserved_attrs=['default_previous_samples'])
+
+        # Write to a temporary file so concurrent readers never see a
+        # partially written artifact
+        temporary = file.with_suffix(f'.{os.getpid()}.tmp')
+        torch.jit.save(compiled, temporary)
+        os.replace(temporary, file)
+
+    return torch.jit.load(file, map_location=device)
+
+
+###############################################################################
+# Utilities
+###############################################################################
+
+
+def artifact_file(checkpoint, quantize=False, suffix='.ts'):
+    """Get the file of the compiled artifact of a checkpoint"""
+    checkpoint = Path(checkpoint)
+
+    # Hash checkpoint contents
+    hasher = hashlib.sha256()
+    with open(checkpoint, 'rb') as file:
+        for chunk in iter(lambda: file.read(2 ** 20), b''):
+            hasher.update(chunk)
+
+    # Hash configuration of the generator
+    config = {key: getattr(promonet, key) for key in CONFIG}
+    config['PPG_REPRESENTATION_KIND'] = ppgs.REPRESENTATION_KIND
+    hasher.update(
+        json.dumps(config, default=str, sort_keys=True).encode('utf-8'))
+
+    # Hash compilation options
+    hasher.update(f'{torch.__version__}-{quantize}'.encode('utf-8'))
+
+    return (
+        checkpoint.parent /
+        f'{checkpoint.stem}-{hasher.hexdigest()[:16]}{suffix}')
+
@@ -0,0 +1,164 @@
+import os
+
+import torch
+import torchutil
+
+import promonet
+
+
+###############################################################################
+# Constants
+###############################################################################
+
+
+# Names of the inputs of Generator.forward
+INPUT_NAMES = [
+    'loudness',
+    'pitch',
+    'periodicity',
+    'ppg',
+    'speakers',
+    'spectral_balance_ratios',
+    'loudness_ratios',
+    'previous_samples']
+
+
+###############################################################################
+# ONNX export
+###############################################################################
+
+
+def export(model, output_file, frames=100, atol=1e-3):
+    """Export a generator to ONNX and check parity with PyTorch
+
+    Weight normalization is folded into the weights. The batch and frame
+    axes of the inputs and the sample axis of the output are dynamic.
+
+    Arguments
+        model
+            The promonet.model.Generator to export
+        output_file
+            The ONNX file to write
+        frames
+            The number of frames of the example inputs used for export
+        atol
+            The maximum absolute error between ONNX and PyTorch outputs
+
+    Returns
+        The maximum absolute error between ONNX and PyTorch outputs
+    """
+    if promonet.MODEL == 'fargan':
+        raise ValueError(
+            'ONNX export does not support the autoregressive FARGAN, whose '
+            'frame loop would be unrolled to a fixed length')
+
+    # Fold weight normalization
+    model.remove_weight_norm()
+    model.eval()
+
+    with torch.no_grad():
+
+        # Export
+        dynamic_axes = {name: {0: 'batch'} for name in INPUT_NAMES}
+        for name in ['loudness', 'pitch', 'periodicity', 'ppg']:
+            dynamic_axes[name][model_frame_axis(name)] = 'frames'
+        dynamic_axes['audio'] = {0: 'batch', 2: 'samples'}
+        torch.onnx.export(
+            model,
+            example_inputs(frames),
+            output_file,
+            input_names=INPUT_NAMES,
+            output_names=['audio'],
+            dynamic_axes=dynamic_axes,
+            opset_version=17)
+
+        # Check parity on a different batch size and length, so that the
+        # dynamic axes are exercised
+        inputs = example_inputs(2 * frames + 1, batch_size=2)
+        expected = model(*inputs)
+        predicted = Session(output_file)(*inputs)
+        error = (expected - predicted).abs().max().item()
+        if error > atol:
+            raise ValueError(
+                f'ONNX output differs from PyTorch by {error:.6f} > {atol}')
+
+    return error
+
+
+###############################################################################
+# ONNX runtime
+###############################################################################
+
+
+class Session:
+    """Generator inference with onnxruntime
+
+    Called with the same arguments as Generator.forward.
+    """
+
+    def __init__(self, file, device='cpu'):
+        import onnxruntime
+
+        self.device = torch.device(device)
+        if self.device.type == 'cuda':
+            providers = [
+                ('CUDAExecutionProvider', {'device_id': self.device.index}),
+                'CPUExecutionProvider']
+        else:
+            providers = ['CPUExecutionProvider']
+        self.session = onnxruntime.InferenceSession(
+            str(file),
+            providers=providers)
+
+        # Initial previous samples, as in promonet.model.Generator
+        self.default_previous_samples = torch.zeros(
+            (1, 1, promonet.NUM_PREVIOUS_SAMPLES),
+            device=self.device)
+
+    def __call__(self, *inputs):
+        generated, = self.session.run(
+            None,
+            {
+                name: value.detach().cpu().numpy()
+                for name, value in zip(INPUT_NAMES, inputs)})
+        return torch.from_numpy(generated).to(self.device)
+
+
+def load(checkpoint, device='cpu'):
+    """Load an onnxruntime generator, exporting it on first use
+
+    The ONNX file is saved next to the checkpoint, keyed by the checkpoint
+    contents and the configuration, and reused by later processes.
+    """
+    file = promonet.model.jit.artifact_file(checkpoint, suffix='.onnx')
+
+    # Export and save
+    if not file.exists():
+        model = promonet.model.Generator()
+        model, *_ = torchutil.checkpoint.load(checkpoint, model)
+
+        # Write to a temporary file so concurrent readers never see a
+        # partially written artifact
+        temporary = file.with_suffix(f'.{os.getpid()}.tmp')
+        export(model, temporary)
+        os.replace(temporary, file)
+
+    return Session(file, device)
+
+
+###############################################################################
+# Utilities
+###############################################################################
+
+
+def example_inputs(frames, batch_size=1):
+    """Create random inputs to Generator.forward"""
+    return promonet.benchmark.random_inputs(
+        frames,
+        batch_size,
+        torch.Generator().manual_seed(promonet.RANDOM_SEED))
+
+
+def model_frame_axis(name):
+    """Get the frame axis of a Generator.forward input"""
+    return 1 if name in ['pitch', 'periodicity'] else 2
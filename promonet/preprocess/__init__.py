@@ -1,6 +1,10 @@
 from .core import *
 from . import harmonics
 from . import loudness
+from . import manifest
+from . import schedule
 from . import speaker
 from . import spectrogram
+from . import stft
+from . import store
 from . import text
@@ -36,7 +36,8 @@ def from_audio(
                 'ppg',
                 'text',
                 'harmonics',
-                'speaker']
+                'speaker',
+                'spectrogram']
         loudness_bands: The number of A-weighted loudness bands
         max_harmonics: The maximum number of speech harmonics
 
@@ -48,17 +49,19 @@ def from_audio(
         text: The text transcript
         harmonics: The speech harmonic contours
         speaker: The WavLM x-vector embeddings
+        spectrogram: The linear spectrogram
     """
     result = []
+    device = f'cuda:{gpu}' if gpu is not None else 'cpu'
+
+    # Compute one STFT for loudness and spectrogram
+    if 'loudness' in features or 'spectrogram' in features:
+        power = promonet.preprocess.stft.from_audio(audio.to(device))
 
     # Compute loudness
     if 'loudness' in features:
-        device = f'cuda:{gpu}' if gpu is not None else 'cpu'
         result.append(
-            promonet.preprocess.loudness.from_audio(
-                audio,
-                loudness_bands
-            ).to(device))
+            promonet.preprocess.loudness.from_power(power, loudness_bands))
 
     # Estimate pitch and periodicity
     if 'pitch' in features or 'periodicity' in features:
@@ -94,10 +97,10 @@ def from_audio(
                 audio.shape[-1],
                 sample_rate,
                 promonet.SAMPLE_RATE))
-        ppg = promonet.edit.grid.sample(
-            ppg,
+        sample = promonet.edit.grid.Sampler(
             promonet.edit.grid.of_length(ppg, length),
-            promonet.PPG_INTERP_METHOD)
+            ppg.shape[-1])
+        ppg = sample(ppg, promonet.PPG_INTERP_METHOD)
 
         # Preserve distribution
         result.append(torch.softmax(torch.log(ppg + 1e-8), -2))
@@ -123,6 +126,10 @@ def from_audio(
             gpu=gpu)
         result.append(speaker)
 
+    # Compute spectrogram
+    if 'spectrogram' in features:
+        result.append(promonet.preprocess.spectrogram.from_power(power))
+
     return (*result,)
 
 
@@ -146,7 +153,8 @@ def from_file(
                 'ppg',
                 'text',
                 'harmonics',
-                'speaker']
+                'speaker',
+                'spectrogram']
         loudness_bands: The number of A-weighted loudness bands
         max_harmonics: The maximum number of speech harmonics
 
@@ -157,6 +165,8 @@ def from_file(
         ppg: The phonetic posteriorgram
         text: The text transcript
         harmonics: The speech harmonic contours
+        speaker: The WavLM x-vector embeddings
+        spectrogram: The linear spectrogram
     """
     return from_audio(
         promonet.load.audio(file),
@@ -188,7 +198,8 @@ def from_file_to_file(
                 'ppg',
                 'text',
                 'harmonics',
-                'speaker']
+                'speaker',
+                'spectrogram']
         loudness_bands: The number of A-weighted loudness bands
         max_harmonics: The maximum number of speech harmonics
     """
@@ -222,6 +233,9 @@ def from_file_to_file(
     if 'speaker' in features:
         torch.save(inferred_features[0], f'{output_prefix}-speaker.pt')
         del inferred_features[0]
+    if 'spectrogram' in features:
+        torch.save(inferred_features[0], f'{output_prefix}-spectrogram.pt')
+        del inferred_features[0]
 
 
 def from_files_to_files(
@@ -230,10 +244,19 @@ def from_files_to_files(
     gpu: Optional[int] = None,
     features: list = ['loudness', 'pitch', 'periodicity', 'ppg'],
     loudness_bands: int = promonet.LOUDNESS_BANDS,
-    max_harmonics=promonet.MAX_HARMONICS
+    max_harmonics=promonet.MAX_HARMONICS,
+    sequential: bool = False,
+    manifest: Optional[Union[str, os.PathLike]] = None
 ) -> None:
     """Preprocess multiple audio files on disk and save
 
+    Independent features are extracted concurrently. Harmonics wait for
+    pitch. Loudness and spectrograms are computed in CPU processes while
+    models run, unless a GPU is given. Files are preprocessed in chunks. Each
+    file is decoded once into a memory-mapped store of audio at the sample
+    rate of each extractor, which is deleted after each chunk. PPGs are the
+    exception: ppgs decodes files itself to batch inference across files.
+
     Arguments
         files: Audio files to preprocess
         output_prefixes: Files to save features, minus extension
@@ -246,74 +269,26 @@ def from_files_to_files(
                 'ppg',
                 'text',
                 'harmonics',
-                'speaker']
+                'speaker',
+                'spectrogram']
         loudness_bands: The number of A-weighted loudness bands
         max_harmonics: The maximum number of speech harmonics
+        sequential: If true, extract one feature at a time
+        manifest: Optional directory in which to keep a manifest of the
+            source audio and configuration of each output. If given,
+            outputs that are up to date are not recomputed.
     """
     if output_prefixes is None:
         output_prefixes = [file.parent / file.stem for file in files]
-
-    # Preprocess phonetic posteriorgrams
-    extension = ppgs.representation_file_extension()
-    if 'ppg' in features:
-        ppgs.from_files_to_files(
-            files,
-            [f'{prefix}{extension}' for prefix in output_prefixes],
-            num_workers=promonet.NUM_WORKERS,
-            max_frames=5000,
-            gpu=gpu)
-
-    # Preprocess pitch and periodicity
-    if 'pitch' in features or 'periodicity' in features:
-        if promonet.VITERBI_DECODE_PITCH:
-            decoder = 'viterbi'
-            voicing_threshold = None
-            pitch_prefixes = [
-                f'{prefix}-viterbi' for prefix in output_prefixes]
-        else:
-            decoder = 'argmax'
-            voicing_threshold = promonet.VOICING_THRESHOLD
-            pitch_prefixes = output_prefixes
-        penn.from_files_to_files(
+    if manifest is not None:
+        manifest = promonet.preprocess.manifest.Manifest(manifest)
+    promonet.preprocess.schedule.run(
+        promonet.preprocess.schedule.plan(
             files,
-            pitch_prefixes,
-            hopsize=promonet.convert.samples_to_seconds(promonet.HOPSIZE),
-            fmin=promonet.FMIN,
-            fmax=promonet.FMAX,
-            batch_size=2048,
-            center='half-hop',
-            decoder=decoder,
-            interp_unvoiced_at=voicing_threshold,
-            gpu=gpu)
-
-    # Preprocess loudness
-    if 'loudness' in features:
-        promonet.preprocess.loudness.from_files_to_files(
-            files,
-            [f'{prefix}-loudness.pt' for prefix in output_prefixes],
-            bands=loudness_bands)
-
-    # Infer transcript
-    if 'text' in features:
-        promonet.preprocess.text.from_files_to_files(
-            files,
-            [f'{prefix}.txt' for prefix in output_prefixes],
-            gpu)
-
-    # Compute harmonics
-    if 'harmonics' in features:
-        promonet.preprocess.harmonics.from_files_to_files(
-            files,
-            [f'{prefix}-harmonics.pt' for prefix in output_prefixes],
-            pitch_files=[f'{prefix}-pitch.pt' for prefix in pitch_prefixes],
-            output_feature_files=[
-                f'{prefix}-harmonicfeatures.pt' for prefix in output_prefixes],
-            gpu=gpu,
-            max_harmonics=max_harmonics)
-
-    # Compute speaker embeddings
-    if 'speaker' in features:
-        promonet.preprocess.speaker.from_files_to_files(
-            files,
-            [f'{prefix}-speaker.pt' for prefix in output_prefixes],
-            gpu=gpu)
+            output_prefixes,
+            gpu,
+            features,
+            loudness_bands,
+            max_harmonics),
+        sequential,
+        manifest=manifest)
@@ -82,7 +82,8 @@ def from_file(
     pitch_file: Optional[Union[str, bytes, os.PathLike]] = None,
     max_harmonics: int = promonet.MAX_HARMONICS,
     return_features: bool = False,
-    gpu=None
+    gpu=None,
+    store=None
 ) -> torch.Tensor:
     """Compute speech harmonic contours from audio file
 
@@ -98,6 +99,8 @@ def from_file(
             Whether to return the features used for analysis
         gpu
             The GPU index; defaults to CPU
+        store
+            Optional promonet.preprocess.store.AudioStore of decoded audio
 
     Returns
         Speech harmonics; NaNs indicate number of harmonics < max_harmonics
@@ -105,7 +108,7 @@ def from_file(
     """
     pitch = None if pitch_file is None else torch.load(pitch_file)
     return from_audio(
-        promonet.load.audio(file),
+        promonet.load.audio(file) if store is None else store.load(file),
         pitch=pitch,
         max_harmonics=max_harmonics,
         return_features=return_features,
@@ -118,7 +121,8 @@ def from_file_to_file(
     pitch_file: Optional[Union[str, bytes, os.PathLike]] = None,
     output_feature_file: Optional[Union[str, bytes, os.PathLike]] = None,
     max_harmonics: int = promonet.MAX_HARMONICS,
-    gpu=None
+    gpu=None,
+    store=None
 ) -> None:
     """Compute speech harmonic contours from audio file and save
 
@@ -136,13 +140,16 @@ def from_file_to_file(
             The number of harmonics to compute
         gpu
             The GPU index; defaults to CPU
+        store
+            Optional promonet.preprocess.store.AudioStore of decoded audio
     """
     result = from_file(
         file,
         pitch_file=pitch_file,
         max_harmonics=max_harmonics,
         return_features=output_feature_file is not None,
-        gpu=gpu)
+        gpu=gpu,
+        store=store)
     if output_feature_file is not None:
         torch.save(result[-1].cpu(), output_feature_file)
     torch.save(result[0].cpu(), output_file)
@@ -154,7 +161,8 @@ def from_files_to_files(
     pitch_files: Optional[List[Union[str, bytes, os.PathLike]]] = None,
     output_feature_files: Optional[List[Union[str, bytes, os.PathLike]]] = None,
     max_harmonics: int = promonet.MAX_HARMONICS,
-    gpu=None
+    gpu=None,
+    store=None
 ) -> None:
     """Compute speech harmonic contours from audio files and save
 
@@ -171,6 +179,8 @@ def from_files_to_files(
             The number of harmonics to compute
         gpu
             The GPU index; defaults to CPU
+        store
+            Optional promonet.preprocess.store.AudioStore of decoded audio
     """
     if pitch_files is None:
         pitch_files = [None] * len(files)
@@ -188,7 +198,8 @@ def from_files_to_files(
             pitch_file,
             output_feature_file,
             max_harmonics,
-            gpu=gpu)
+            gpu=gpu,
+            store=store)
 
 
 ###############################################################################
@@ -219,54 +230,29 @@ def viterbi(
     max_harmonics=promonet.MAX_HARMONICS,
     harmonic_width_ratio=0.8,
     gpu=None):
-    """Decode harmonics via Viterbi decoding"""
-    device = 'cpu' if gpu is None else f'cuda:{gpu}'
+    """Decode harmonics via Viterbi decoding
 
-    # Normalize
+    The band of each harmonic depends only on F0, so all harmonics above F0
+    are masked and decoded together in one batch.
+    """
+    device = 'cpu' if gpu is None else f'cuda:{gpu}'
     frames = frames.to(device)
     frequencies = frequencies.to(device)
-    x = torch.clone(frames)
-    x = torch.softmax(x + .5 * torch.arange(x.shape[-1], 0, -1, device=device), dim=1)
-
-    # Transition matrix
-    logfreq = torch.log2(frequencies)
-    transition = 1. - 3.5 * torch.cdist(
-        logfreq[None, :, None],
-        logfreq[None, :, None],
-        p=1.0
-    )[0]
-    transition[transition < 0.] = 0.
-    transition /= transition.sum(dim=1)
-
-    # Initial matrix
-    initial = torch.linspace(1., 0., len(logfreq), device=device)
-    initial /= initial.sum()
+    transition, initial = transition_matrix(frequencies)
+    harmonics = torch.full(
+        (max_harmonics, len(frames)),
+        float('nan'),
+        device=device)
 
     # Maybe use more accurate external pitch esitimator for F0
-    i = 0
-    harmonics = torch.full((max_harmonics, len(x)), float('nan'), device=device)
     if pitch is not None:
         harmonics[0] = pitch.squeeze(0)
-        i += 1
 
-        # Mask
-        x = torch.clone(frames)
-        indices = torch.searchsorted(frequencies, harmonics[0])
-        min_harmonic_idxs = torch.searchsorted(
-            frequencies,
-            harmonics[0] * (1. + harmonic_width_ratio))
-        max_harmonic_idxs = torch.searchsorted(
-            frequencies,
-            harmonics[0] * (1. + 1. / harmonic_width_ratio))
-        for j in range(len(indices)):
-            x[j, :min_harmonic_idxs[j]] = -float('inf')
-            x[j, max_harmonic_idxs[j]:] = -float('inf')
-        x = torch.softmax(x, dim=1)
-
-    # Iteratively decode F1, F2, ...
-    while i < max_harmonics:
-
-        # Decode
+    # Decode F0
+    else:
+        x = torch.softmax(
+            frames + .5 * torch.arange(frames.shape[-1], 0, -1, device=device),
+            dim=1)
         indices = torbi.from_probabilities(
             x[None],
             transition=transition,
@@ -274,27 +260,64 @@ def viterbi(
             log_probs=False,
             gpu=gpu
         )[0].to(torch.long)
-        harmonics[i] = frequencies[indices]
+        harmonics[0] = frequencies[indices]
+
+    if max_harmonics == 1:
+        return harmonics
+
+    # Mask frequencies outside the band of each harmonic
+    f0 = harmonics[0][None, :, None]
+    lower = torch.tensor(
+        [i + harmonic_width_ratio for i in range(1, max_harmonics)],
+        device=device)[:, None, None]
+    upper = torch.tensor(
+        [i + 1. / harmonic_width_ratio for i in range(1, max_harmonics)],
+        device=device)[:, None, None]
+    min_harmonic_idxs = torch.searchsorted(frequencies, f0 * lower)
+    max_harmonic_idxs = torch.searchsorted(frequencies, f0 * upper)
+    bins = torch.arange(len(frequencies), device=device)
+    mask = (bins < min_harmonic_idxs) | (bins >= max_harmonic_idxs)
+    x = torch.softmax(frames.masked_fill(mask, -float('inf')), dim=-1)
+
+    # Decode F1, F2, ...
+    indices = torbi.from_probabilities(
+        x,
+        transition=transition,
+        initial=initial,
+        log_probs=False,
+        gpu=gpu
+    ).to(torch.long)
+    harmonics[1:] = frequencies[indices]
 
-        i += 1
+    return harmonics
 
-        if i == max_harmonics:
-            break
 
-        # Mask
-        x = torch.clone(frames)
-        min_harmonic_idxs = torch.searchsorted(
-            frequencies,
-            harmonics[0] * (i + harmonic_width_ratio))
-        max_harmonic_idxs = torch.searchsorted(
-            frequencies,
-            harmonics[0] * (i + 1. / harmonic_width_ratio))
-        for j in range(len(indices)):
-            x[j, :min_harmonic_idxs[j]] = -float('inf')
-            x[j, max_harmonic_idxs[j]:] = -float('inf')
-        x = torch.softmax(x, dim=1)
+def transition_matrix(frequencies):
+    """Transition and initial distributions of harmonic Viterbi decoding
 
-    return harmonics
+    Distributions are cached for each frequency grid and device.
+    """
+    if not hasattr(transition_matrix, 'cache'):
+        transition_matrix.cache = {}
+    key = (frequencies.device, tuple(frequencies.tolist()))
+    if key not in transition_matrix.cache:
+
+        # Transition matrix
+        logfreq = torch.log2(frequencies)
+        transition = 1. - 3.5 * torch.cdist(
+            logfreq[None, :, None],
+            logfreq[None, :, None],
+            p=1.0
+        )[0]
+        transition[transition < 0.] = 0.
+        transition /= transition.sum(dim=1)
+
+        # Initial matrix
+        initial = torch.linspace(1., 0., len(logfreq), device=logfreq.device)
+        initial /= initial.sum()
+
+        transition_matrix.cache[key] = (transition, initial)
+    return transition_matrix.cache[key]
 
 
 ###############################################################################
@@ -1,10 +1,7 @@
-import functools
-import multiprocessing as mp
-import warnings
+import math
 
-import librosa
-import numpy as np
 import torch
+import torchaudio
 
 import promonet
 
@@ -15,44 +12,36 @@ import promonet
 
 
 def from_audio(audio, bands=1):
-    """Compute A-weighted loudness"""
-    # Pad
-    padding = (promonet.WINDOW_SIZE - promonet.HOPSIZE) // 2
-    audio = torch.nn.functional.pad(
-        audio[None],
-        (padding, padding),
-        mode='reflect'
-    ).squeeze(0)
-
-    # Save device
-    device = audio.device
-
-    # Convert to numpy
-    audio = audio.detach().cpu().numpy().squeeze(0)
-
-    # Cache weights
-    if not hasattr(from_audio, 'weights'):
-        from_audio.weights = perceptual_weights()
-
-    # Take stft
-    stft = librosa.stft(
-        audio,
-        n_fft=promonet.WINDOW_SIZE,
-        hop_length=promonet.HOPSIZE,
-        win_length=promonet.WINDOW_SIZE,
-        center=False)
+    """Compute A-weighted loudness
+
+    Arguments
+        audio: Audio of shape=(1, samples), shape=(batch, samples), or
+            shape=(batch, 1, samples)
+        bands: Number of frequency bands to average, or None
+
+    Returns
+        loudness: shape=(bands, frames) or shape=(batch, bands, frames)
+    """
+    return from_power(promonet.preprocess.stft.from_audio(audio), bands)
+
+
+def from_power(power, bands=1):
+    """Compute A-weighted loudness from a power spectrogram"""
+    # Convert to dB with the floor and dynamic range of
+    # librosa.amplitude_to_db
+    loudness = 10. * torch.log10(torch.clamp(power, min=1e-10))
+    loudness = torch.maximum(
+        loudness,
+        loudness.amax(dim=(-2, -1), keepdim=True) - 80.)
 
     # Apply A-weighting in units of dB
-    weighted = librosa.amplitude_to_db(np.abs(stft)) + from_audio.weights
+    weighted = loudness + perceptual_weights(loudness.device, loudness.dtype)
 
     # Threshold
-    weighted[weighted < promonet.MIN_DB] = promonet.MIN_DB
-
-    # Multiband loudness
-    loudness = torch.from_numpy(weighted).float().to(device)
+    weighted = torch.clamp(weighted, min=promonet.MIN_DB)
 
     # Maybe average
-    return band_average(loudness, bands) if bands is not None else loudness
+    return band_average(weighted, bands) if bands is not None else weighted
 
 
 def from_file(audio_file, bands=promonet.LOUDNESS_BANDS):
@@ -68,12 +57,15 @@ def from_file_to_file(audio_file, output_file, bands=promonet.LOUDNESS_BANDS):
 def from_files_to_files(
     audio_files,
     output_files,
-    bands=promonet.LOUDNESS_BANDS
+    bands=promonet.LOUDNESS_BANDS,
+    gpu=None
 ):
     """Compute A-weighted loudness from audio files and save"""
-    loudness_fn = functools.partial(from_file_to_file, bands=bands)
-    with mp.get_context('spawn').Pool(promonet.NUM_WORKERS) as pool:
-        pool.starmap(loudness_fn, zip(audio_files, output_files))
+    promonet.preprocess.stft.from_files_to_files(
+        audio_files,
+        output_files,
+        bands=bands,
+        gpu=gpu)
 
 
 ###############################################################################
@@ -82,63 +74,103 @@ def from_files_to_files(
 
 
 def band_average(loudness, bands=promonet.LOUDNESS_BANDS):
-    """Average over frequency bands"""
-    if bands is not None:
-
-        if bands == 1:
-
-            # Average over all weighted frequencies
-            loudness = loudness.mean(dim=-2, keepdim=True)
-
-        else:
-
-            # Average over loudness frequency bands
-            step = loudness.shape[-2] / bands
-            if loudness.ndim == 2:
-                loudness = torch.stack(
-                    [
-                        loudness[int(band * step):int((band + 1) * step)].mean(dim=-2)
-                        for band in range(int(bands))
-                    ])
-            else:
-                loudness = torch.stack(
-                    [
-                        loudness[:, int(band * step):int((band + 1) * step)].mean(dim=-2)
-                        for band in range(bands)
-                    ],
-                    dim=1)
-
-    return loudness
+    """Average over frequency bands
+
+    Arguments
+        loudness: shape=(bins, frames) or shape=(batch, bins, frames)
+        bands: Number of frequency bands to average, or None
+
+    Returns
+        averaged: shape=(bands, frames) or shape=(batch, bands, frames)
+    """
+    if bands is None:
+        return loudness
+    weights = band_weights(
+        loudness.shape[-2],
+        int(bands),
+        loudness.device,
+        loudness.dtype)
+    return torch.matmul(weights, loudness)
+
+
+def band_weights(bins, bands, device='cpu', dtype=torch.float32):
+    """Matrix that averages frequency bins within each band
+
+    Weights are cached for each number of bins and bands, device, and data
+    type.
+
+    Arguments
+        bins: Number of frequency bins
+        bands: Number of frequency bands
+
+    Returns
+        weights: shape=(bands, bins)
+    """
+    if not hasattr(band_weights, 'cache'):
+        band_weights.cache = {}
+    key = (bins, bands, torch.device(device), dtype)
+    if key not in band_weights.cache:
+        step = bins / bands
+        weights = torch.zeros((bands, bins), dtype=torch.float64)
+        for band in range(bands):
+            start, end = int(band * step), int((band + 1) * step)
+            weights[band, start:end] = 1. / (end - start)
+        band_weights.cache[key] = weights.to(device=device, dtype=dtype)
+    return band_weights.cache[key]
 
 
 def limit(audio, delay=40, attack_coef=.9, release_coef=.9995, threshold=.99):
-    """Apply a limiter to prevent clipping"""
+    """Apply a look-ahead limiter to prevent clipping
+
+    The envelope has instantaneous attack and exponential release, and the
+    gain follows the envelope with a one-pole filter. Both are computed over
+    the entire signal at once.
+
+    Arguments
+        audio: Audio of shape=(..., samples)
+        delay: Look-ahead in samples
+        attack_coef: Gain smoothing coefficient
+        release_coef: Envelope decay per sample
+        threshold: Maximum absolute amplitude
+
+    Returns
+        limited: shape=(..., samples)
+    """
     # Delay compensation
-    audio = torch.nn.functional.pad(audio, (0, delay - 1))
-
-    current_gain = 1.
-    delay_index = 0
-    delay_line = torch.zeros(delay)
-    envelope = 0
-
-    for idx, sample in enumerate(audio[0]):
-
-        # Update signal history
-        delay_line[delay_index] = sample
-        delay_index = (delay_index + 1) % delay
-
-        # Calculate envelope
-        envelope = max(abs(sample), envelope * release_coef)
-
-        # Calcuate gain
-        target_gain = threshold / envelope if envelope > threshold else 1.
-        current_gain = \
-            current_gain * attack_coef + target_gain * (1 - attack_coef)
-
-        # Apply gain
-        audio[:, idx] = delay_line[delay_index] * current_gain
-
-    return audio[:, delay - 1:]
+    padded = torch.nn.functional.pad(
+        audio.to(torch.float64),
+        (0, delay - 1))
+
+    # Calculate envelope. With release r, the envelope is
+    # max_k |x[k]| r^(n - k), which is a cumulative max in log space.
+    decay = math.log(release_coef) * torch.arange(
+        padded.shape[-1],
+        dtype=padded.dtype,
+        device=padded.device)
+    envelope = torch.exp(
+        torch.cummax(torch.log(padded.abs()) - decay, dim=-1).values + decay)
+
+    # Calculate gain, starting from unity
+    target_gain = torch.where(
+        envelope > threshold,
+        threshold / envelope,
+        torch.ones_like(envelope))
+    current_gain = 1. + torchaudio.functional.lfilter(
+        target_gain - 1.,
+        torch.tensor(
+            [1., -attack_coef],
+            dtype=padded.dtype,
+            device=padded.device),
+        torch.tensor(
+            [1. - attack_coef, 0.],
+            dtype=padded.dtype,
+            device=padded.device),
+        clamp=False)
+
+    # Apply gain
+    return (
+        audio.to(torch.float64) * current_gain[..., delay - 1:]
+    ).to(audio.dtype)
 
 
 def normalize(loudness):
@@ -146,18 +178,40 @@ def normalize(loudness):
     return (loudness - promonet.MIN_DB) / (promonet.REF_DB - promonet.MIN_DB)
 
 
-def perceptual_weights():
-    """A-weighted frequency-dependent perceptual loudness weights"""
-    frequencies = librosa.fft_frequencies(
-        sr=promonet.SAMPLE_RATE,
-        n_fft=promonet.WINDOW_SIZE)
-
-    # A warning is raised for nearly inaudible frequencies, but it ends up
-    # defaulting to -100 db. That default is fine for our purposes.
-    with warnings.catch_warnings():
-        warnings.simplefilter('ignore', RuntimeWarning)
-        return (
-            librosa.A_weighting(frequencies)[:, None] - float(promonet.REF_DB))
+def perceptual_weights(device='cpu', dtype=torch.float32):
+    """A-weighted frequency-dependent perceptual loudness weights
+
+    Weights are cached for each device and data type.
+    """
+    if not hasattr(perceptual_weights, 'cache'):
+        perceptual_weights.cache = {}
+    key = (torch.device(device), dtype)
+    if key not in perceptual_weights.cache:
+        frequencies = torch.linspace(
+            0.,
+            promonet.SAMPLE_RATE / 2,
+            promonet.NUM_FFT // 2 + 1,
+            dtype=torch.float64)
+
+        # A-weighting of librosa.A_weighting. Nearly inaudible frequencies
+        # are floored at -80 dB, which is fine for our purposes.
+        squared = frequencies ** 2
+        constants = torch.tensor(
+            [12194.217, 20.598997, 107.65265, 737.86223],
+            dtype=torch.float64) ** 2
+        weights = 2. + 20. * (
+            torch.log10(constants[0]) +
+            2 * torch.log10(squared) -
+            torch.log10(squared + constants[0]) -
+            torch.log10(squared + constants[1]) -
+            .5 * torch.log10(squared + constants[2]) -
+            .5 * torch.log10(squared + constants[3]))
+        weights = torch.clamp(weights, min=-80.)
+
+        perceptual_weights.cache[key] = (
+            weights[:, None] - float(promonet.REF_DB)
+        ).to(device=device, dtype=dtype)
+    return perceptual_weights.cache[key]
 
 
 def scale(audio, target_loudness):
@@ -167,7 +221,7 @@ def scale(audio, target_loudness):
         target_loudness = target_loudness.mean(dim=-2, keepdim=True)
 
     # Get current loudness
-    loudness = from_audio(audio.to(torch.float64))
+    loudness = from_audio(audio.to(torch.float64)).to(audio.dtype)
 
     # Take difference and convert from dB to ratio
     gain = promonet.convert.db_to_ratio(target_loudness - loudness)
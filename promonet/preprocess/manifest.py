@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+import promonet
+
+
+###############################################################################
+# Preprocessing manifest
+###############################################################################
+
+
+class Manifest:
+    """Record of the audio and configuration used to preprocess each feature
+
+    The manifest is saved as manifest.json in a cache directory. For each
+    output file, it records the hash of the source audio and the hash of the
+    configuration that affects that feature. Outputs are valid if they exist
+    and both hashes match.
+
+    Arguments
+        directory: The cache directory
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.file = self.directory / 'manifest.json'
+        self.lock = threading.Lock()
+
+        # Load
+        if self.file.exists():
+            with open(self.file) as file:
+                manifest = json.load(file)
+            self.audio = manifest['audio']
+            self.outputs = manifest['outputs']
+        else:
+            self.audio = {}
+            self.outputs = {}
+
+    def audio_hash(self, file):
+        """Hash audio file contents, reusing the hash of unchanged files"""
+        key = self.key(file)
+        status = os.stat(file)
+        with self.lock:
+            entry = self.audio.get(key)
+        if (
+            entry is not None and
+            entry['size'] == status.st_size and
+            entry['mtime'] == status.st_mtime_ns
+        ):
+            return entry['hash']
+
+        # Hash contents
+        hasher = hashlib.sha256()
+        with open(file, 'rb') as contents:
+            for chunk in iter(lambda: contents.read(2 ** 20), b''):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+
+        with self.lock:
+            self.audio[key] = {
+                'hash': digest,
+                'mtime': status.st_mtime_ns,
+                'size': status.st_size}
+        return digest
+
+    def key(self, file):
+        """Get the manifest key of a file"""
+        return Path(os.path.relpath(file, self.directory)).as_posix()
+
+    def save(self):
+        """Save manifest to disk"""
+        with self.lock:
+            manifest = {'audio': self.audio, 'outputs': self.outputs}
+
+            # Write to a temporary file so that an interrupted save never
+            # corrupts the manifest
+            temporary = self.file.with_suffix(
+                f'.{os.getpid()}.{threading.get_ident()}.tmp')
+            with open(temporary, 'w') as file:
+                json.dump(manifest, file, indent=4, sort_keys=True)
+            os.replace(temporary, self.file)
+
+    def stale(self, files, outputs, config):
+        """Get the indices of files with missing or outdated outputs
+
+        Arguments
+            files: Source audio files
+            outputs: Output files of each source audio file
+            config: Hash of the configuration of the feature (see fingerprint)
+
+        Returns
+            indices: The indices of files to preprocess
+        """
+        indices = []
+        for i, (file, output_files) in enumerate(zip(files, outputs)):
+            expected = {'audio': self.audio_hash(file), 'config': config}
+            with self.lock:
+                valid = all(
+                    Path(output_file).exists() and
+                    self.outputs.get(self.key(output_file)) == expected
+                    for output_file in output_files)
+            if not valid:
+                indices.append(i)
+        return indices
+
+    def update(self, files, outputs, config):
+        """Record outputs as valid and save
+
+        Arguments
+            files: Source audio files
+            outputs: Output files of each source audio file
+            config: Hash of the configuration of the feature (see fingerprint)
+        """
+        for file, output_files in zip(files, outputs):
+            expected = {'audio': self.audio_hash(file), 'config': config}
+            with self.lock:
+                for output_file in output_files:
+                    self.outputs[self.key(output_file)] = expected
+        self.save()
+
+
+###############################################################################
+# Utilities
+###############################################################################
+
+
+def fingerprint(config):
+    """Hash the configuration of a feature
+
+    Arguments
+        config: JSON-serializable dict of the values that affect the feature
+
+    Returns
+        digest: The hash
+    """
+    config = {'sample_rate': promonet.SAMPLE_RATE, **config}
+    return hashlib.sha256(
+        json.dumps(config, default=str, sort_keys=True).encode('utf-8')
+    ).hexdigest()[:16]
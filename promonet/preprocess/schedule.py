@@ -0,0 +1,494 @@
+import concurrent.futures
+import functools
+import math
+import multiprocessing as mp
+import tempfile
+import threading
+import time
+
+import penn
+import ppgs
+import torch
+import torchutil
+
+import promonet
+
+
+###############################################################################
+# Preprocessing schedule
+###############################################################################
+
+
+def plan(
+    files,
+    output_prefixes,
+    gpu=None,
+    features=['loudness', 'pitch', 'periodicity', 'ppg'],
+    loudness_bands=promonet.LOUDNESS_BANDS,
+    max_harmonics=promonet.MAX_HARMONICS
+):
+    """Create the feature extraction stages of preprocess.from_files_to_files
+
+    Harmonics wait for pitch. Loudness and spectrograms are computed in CPU
+    processes, unless a GPU is given.
+
+    Returns
+        stages: Map from stage name to stage
+    """
+    stages = {}
+
+    # Preprocess phonetic posteriorgrams
+    extension = ppgs.representation_file_extension()
+    if 'ppg' in features:
+        ppg_files = [f'{prefix}{extension}' for prefix in output_prefixes]
+
+        # PPGs are not fed from the audio store. ppgs decodes each file itself
+        # so that it can batch inference across files up to max_frames, which
+        # is faster than inferring one stored file at a time.
+        stages['ppg'] = stage(
+            ppgs.from_files_to_files,
+            files,
+            ppg_files,
+            outputs=[[file] for file in ppg_files],
+            config={
+                'hopsize': promonet.HOPSIZE,
+                'interp_method': promonet.PPG_INTERP_METHOD,
+                'representation': ppgs.REPRESENTATION_KIND},
+            num_workers=promonet.NUM_WORKERS,
+            max_frames=5000,
+            gpu=gpu)
+
+    # Preprocess pitch and periodicity
+    if promonet.VITERBI_DECODE_PITCH:
+        decoder = 'viterbi'
+        voicing_threshold = None
+        pitch_prefixes = [f'{prefix}-viterbi' for prefix in output_prefixes]
+    else:
+        decoder = 'argmax'
+        voicing_threshold = promonet.VOICING_THRESHOLD
+        pitch_prefixes = output_prefixes
+    pitch_config = {
+        'decoder': decoder,
+        'fmax': promonet.FMAX,
+        'fmin': promonet.FMIN,
+        'hopsize': promonet.HOPSIZE,
+        'voicing_threshold': voicing_threshold}
+    if 'pitch' in features or 'periodicity' in features:
+        stages['pitch'] = stage(
+            pitch,
+            files,
+            pitch_prefixes,
+            outputs=[
+                [f'{prefix}-pitch.pt', f'{prefix}-periodicity.pt']
+                for prefix in pitch_prefixes],
+            config=pitch_config,
+            sample_rate=penn.SAMPLE_RATE,
+            hopsize=promonet.convert.samples_to_seconds(promonet.HOPSIZE),
+            fmin=promonet.FMIN,
+            fmax=promonet.FMAX,
+            batch_size=2048,
+            center='half-hop',
+            decoder=decoder,
+            interp_unvoiced_at=voicing_threshold,
+            gpu=gpu)
+
+    # Preprocess loudness and spectrograms from one STFT
+    if 'loudness' in features or 'spectrogram' in features:
+        loudness_files = (
+            [f'{prefix}-loudness.pt' for prefix in output_prefixes]
+            if 'loudness' in features else None)
+        spectrogram_files = (
+            [f'{prefix}-spectrogram.pt' for prefix in output_prefixes]
+            if 'spectrogram' in features else None)
+        stages['stft'] = stage(
+            promonet.preprocess.stft.from_files_to_files
+            if gpu is not None else functools.partial(
+                processes,
+                promonet.preprocess.stft.from_files_to_files),
+            files,
+            loudness_files,
+            spectrogram_files,
+            outputs=[
+                [file for file in output_files if file is not None]
+                for output_files in zip(
+                    loudness_files or [None] * len(files),
+                    spectrogram_files or [None] * len(files))],
+            config={
+                'bands': loudness_bands,
+                'hopsize': promonet.HOPSIZE,
+                'min_db': promonet.MIN_DB,
+                'num_fft': promonet.NUM_FFT,
+                'ref_db': promonet.REF_DB,
+                'window_size': promonet.WINDOW_SIZE},
+            bands=loudness_bands,
+            model=False,
+            sample_rate=promonet.SAMPLE_RATE,
+            gpu=gpu)
+
+    # Infer transcript
+    if 'text' in features:
+        text_files = [f'{prefix}.txt' for prefix in output_prefixes]
+        stages['text'] = stage(
+            promonet.preprocess.text.from_files_to_files,
+            files,
+            text_files,
+            outputs=[[file] for file in text_files],
+            config={'model': promonet.preprocess.text.MODEL_ID},
+            sample_rate=promonet.preprocess.text.WHISPER_SAMPLE_RATE,
+            gpu=gpu)
+
+    # Compute harmonics
+    if 'harmonics' in features:
+        harmonics_files = [
+            f'{prefix}-harmonics.pt' for prefix in output_prefixes]
+        harmonic_feature_files = [
+            f'{prefix}-harmonicfeatures.pt' for prefix in output_prefixes]
+        stages['harmonics'] = stage(
+            promonet.preprocess.harmonics.from_files_to_files,
+            files,
+            harmonics_files,
+            [f'{prefix}-pitch.pt' for prefix in pitch_prefixes],
+            harmonic_feature_files,
+            outputs=[
+                list(output_files) for output_files in zip(
+                    harmonics_files,
+                    harmonic_feature_files)],
+            config={'max_harmonics': max_harmonics, 'pitch': pitch_config},
+            after=['pitch'] if 'pitch' in stages else [],
+            sample_rate=promonet.SAMPLE_RATE,
+            max_harmonics=max_harmonics,
+            gpu=gpu)
+
+    # Compute speaker embeddings
+    if 'speaker' in features:
+        speaker_files = [f'{prefix}-speaker.pt' for prefix in output_prefixes]
+        stages['speaker'] = stage(
+            promonet.preprocess.speaker.from_files_to_files,
+            files,
+            speaker_files,
+            outputs=[[file] for file in speaker_files],
+            config={
+                'model': promonet.preprocess.speaker.WAVLM_MODEL,
+                'sample_rate': promonet.preprocess.speaker.WAVLM_SAMPLE_RATE},
+            sample_rate=promonet.preprocess.speaker.WAVLM_SAMPLE_RATE,
+            gpu=gpu)
+
+    return stages
+
+
+def run(
+    stages,
+    sequential=False,
+    model_workers=promonet.PREPROCESS_MODEL_WORKERS,
+    manifest=None
+):
+    """Run feature extraction stages, concurrently when dependencies allow
+
+    Each stage starts once the stages it depends on have finished. Stages
+    that run a neural network share a limited number of slots, so that
+    models do not compete for GPU memory. Other stages run alongside them.
+    Files are preprocessed in chunks of PREPROCESS_CHUNK_SIZE. The audio of
+    each chunk is decoded once into a shared, memory-mapped store in
+    PREPROCESS_SCRATCH_DIR, which is deleted before the next chunk starts.
+    Only stages with a sample rate read from the store. Other stages, such as
+    PPG inference, decode their own audio.
+    With a manifest, progress is saved after each chunk, so that interrupted
+    preprocessing resumes from the last chunk.
+
+    Arguments
+        stages: Map from stage name to stage (see stage)
+        sequential: If true, run stages one at a time in order
+        model_workers: Maximum number of model-based stages that run at once
+        manifest: Optional promonet.preprocess.manifest.Manifest. If given,
+            only files with missing or outdated outputs are preprocessed.
+
+    Returns
+        seconds: Map from stage name to wall-clock time in seconds
+    """
+    # Find files with missing or outdated outputs
+    indices = {}
+    for name, stage in stages.items():
+        if manifest is None:
+            indices[name] = list(range(len(stage['files'])))
+        else:
+            indices[name] = manifest.stale(
+                stage['files'],
+                stage['outputs'],
+                stage['config'])
+
+    # Stages that read from the store
+    readers = [
+        name for name, stage in stages.items()
+        if stage['sample_rate'] is not None]
+
+    # Preprocess in chunks, so that decoded audio in scratch storage never
+    # exceeds one chunk and progress is saved after each chunk
+    length = max((len(stage['files']) for stage in stages.values()), default=0)
+    size = max(1, promonet.PREPROCESS_CHUNK_SIZE)
+    seconds, computed = {}, {}
+    for start in range(0, length, size):
+        chunk = {
+            name: [i for i in indices[name] if start <= i < start + size]
+            for name in stages}
+
+        # Find audio to decode
+        files = list(dict.fromkeys(
+            stages[name]['files'][i]
+            for name in readers for i in chunk[name]))
+        sample_rates = sorted({
+            stages[name]['sample_rate'] for name in readers if chunk[name]})
+
+        with tempfile.TemporaryDirectory(
+            dir=promonet.PREPROCESS_SCRATCH_DIR
+        ) as directory:
+            store = promonet.preprocess.store.AudioStore(directory)
+
+            # Jobs and their dependencies, starting with decoding
+            jobs = {}
+            if files:
+                jobs['decode'] = (
+                    functools.partial(decode, store, files, sample_rates),
+                    [],
+                    False)
+            for name, stage in stages.items():
+                jobs[name] = (
+                    functools.partial(
+                        execute,
+                        stage,
+                        chunk[name],
+                        manifest,
+                        store if name in readers else None),
+                    stage['after'] + (
+                        ['decode'] if files and name in readers else []),
+                    stage['model'])
+
+            chunk_seconds, chunk_computed = dispatch(
+                jobs,
+                sequential,
+                model_workers)
+
+            # Release the decoded audio before the next chunk
+            del store
+
+        for name in chunk_seconds:
+            seconds[name] = seconds.get(name, 0.) + chunk_seconds[name]
+            computed[name] = computed.get(name, 0) + chunk_computed[name]
+
+    # Report work and throughput
+    totals = {name: len(stage['files']) for name, stage in stages.items()}
+    totals['decode'] = computed.get('decode', 0)
+    for name, elapsed in seconds.items():
+        throughput = computed[name] / elapsed if elapsed else 0.
+        print(
+            f'{name}: {computed[name]} computed, '
+            f'{totals[name] - computed[name]} skipped, '
+            f'{throughput:.2f} files/second '
+            f'({elapsed:.2f} seconds)')
+
+    return seconds
+
+
+def dispatch(jobs, sequential=False, model_workers=1):
+    """Run jobs once their dependencies finish
+
+    Arguments
+        jobs: Map from job name to tuple of the function to run, the names
+            of the jobs that must finish first, and whether the job runs a
+            neural network
+        sequential: If true, run jobs one at a time in order
+        model_workers: Maximum number of model-based jobs that run at once
+
+    Returns
+        seconds: Map from job name to wall-clock time in seconds
+        results: Map from job name to the return value of its function
+    """
+    seconds, results = {}, {}
+
+    def call(name):
+        start = time.perf_counter()
+        results[name] = jobs[name][0]()
+        seconds[name] = time.perf_counter() - start
+
+    if sequential:
+        for name in jobs:
+            call(name)
+
+    else:
+        slots = threading.Semaphore(model_workers)
+
+        def worker(name, dependencies):
+            # Wait for dependencies and propagate their failures
+            for dependency in dependencies:
+                dependency.result()
+
+            # Run
+            if jobs[name][2]:
+                with slots:
+                    call(name)
+            else:
+                call(name)
+
+        # One thread per job, so that threads blocked on dependencies never
+        # prevent other jobs from starting
+        futures = {}
+        with concurrent.futures.ThreadPoolExecutor(len(jobs) or 1) as pool:
+            for name, (_, after, _) in jobs.items():
+                futures[name] = pool.submit(
+                    worker,
+                    name,
+                    [futures[dependency] for dependency in after])
+            for future in futures.values():
+                future.result()
+
+    return seconds, results
+
+
+def stage(
+    fn,
+    files,
+    *file_lists,
+    outputs,
+    config,
+    after=(),
+    model=True,
+    sample_rate=None,
+    **kwargs
+):
+    """Create a preprocessing stage
+
+    Arguments
+        fn: Function of files, file lists, and keyword arguments that
+            extracts features
+        files: Source audio files
+        file_lists: Lists of files corresponding to each source file, or None
+        outputs: Output files of each source file
+        config: Values of the configuration that affect the outputs
+        after: Names of stages that must finish first
+        model: Whether the stage runs a neural network
+        sample_rate: Sample rate of the decoded audio that fn reads from a
+            promonet.preprocess.store.AudioStore passed as store, or None if
+            fn decodes audio files itself
+        kwargs: Keyword arguments of fn
+
+    Returns
+        stage: dict
+    """
+    return {
+        'fn': fn,
+        'files': files,
+        'file_lists': file_lists,
+        'outputs': outputs,
+        'config': promonet.preprocess.manifest.fingerprint(config),
+        'after': list(after),
+        'model': model,
+        'sample_rate': sample_rate,
+        'kwargs': kwargs}
+
+
+###############################################################################
+# Utilities
+###############################################################################
+
+
+def decode(store, files, sample_rates):
+    """Decode audio into the store"""
+    store.decode(files, sample_rates)
+    return len(files)
+
+
+def execute(stage, indices, manifest=None, store=None):
+    """Run a stage on files with missing or outdated outputs
+
+    Arguments
+        stage: The stage to run
+        indices: The indices of the files to preprocess
+        manifest: Optional promonet.preprocess.manifest.Manifest to update
+        store: Optional promonet.preprocess.store.AudioStore of decoded audio
+
+    Returns
+        computed: The number of files preprocessed
+    """
+    if not indices:
+        return 0
+
+    kwargs = stage['kwargs']
+    if store is not None:
+        kwargs = {**kwargs, 'store': store}
+
+    stage['fn'](
+        subset(stage['files'], indices),
+        *[subset(file_list, indices) for file_list in stage['file_lists']],
+        **kwargs)
+    if manifest is not None:
+        manifest.update(
+            subset(stage['files'], indices),
+            subset(stage['outputs'], indices),
+            stage['config'])
+    return len(indices)
+
+
+def processes(fn, files, *file_lists, workers=promonet.NUM_WORKERS, **kwargs):
+    """Split files into chunks and process each chunk in its own process
+
+    Each process uses one thread to avoid oversubscribing the CPU.
+
+    Arguments
+        fn: Function of files and lists of corresponding files (or None)
+        files: Files to process
+        file_lists: Lists of files corresponding to each file, or None
+        workers: Number of processes
+        kwargs: Keyword arguments of fn
+    """
+    if workers <= 1 or len(files) <= 1:
+        return fn(files, *file_lists, **kwargs)
+
+    size = math.ceil(len(files) / workers)
+    # Spawn, because forking a process that runs models on other threads
+    # can deadlock and does not preserve CUDA state
+    with concurrent.futures.ProcessPoolExecutor(
+        workers,
+        mp_context=mp.get_context('spawn'),
+        initializer=torch.set_num_threads,
+        initargs=(1,)
+    ) as pool:
+        futures = [
+            pool.submit(
+                fn,
+                files[i:i + size],
+                *[
+                    None if file_list is None else file_list[i:i + size]
+                    for file_list in file_lists],
+                **kwargs)
+            for i in range(0, len(files), size)]
+        for future in futures:
+            future.result()
+
+
+def subset(items, indices):
+    """Select items by index, propagating None"""
+    if items is None:
+        return None
+    return [items[i] for i in indices]
+
+
+def pitch(files, output_prefixes, gpu=None, store=None, **kwargs):
+    """Estimate pitch and periodicity with penn and save"""
+    if store is None:
+        return penn.from_files_to_files(
+            files,
+            output_prefixes,
+            gpu=gpu,
+            **kwargs)
+
+    for file, prefix in torchutil.iterator(
+        zip(files, output_prefixes),
+        'penn',
+        total=len(files)
+    ):
+        pitch, periodicity = penn.from_audio(
+            store.load(file, penn.SAMPLE_RATE),
+            sample_rate=penn.SAMPLE_RATE,
+            gpu=gpu,
+            **kwargs)
+        torch.save(pitch.cpu(), f'{prefix}-pitch.pt')
+        torch.save(periodicity.cpu(), f'{prefix}-periodicity.pt')
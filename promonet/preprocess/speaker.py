@@ -1,3 +1,5 @@
+import math
+
 import torch
 import torchaudio
 import torchutil
@@ -14,6 +16,12 @@ import promonet
 # Maximum batch size for batched WavLM inference
 WAVLM_MAX_BATCH_SIZE = 16
 
+# Maximum number of padded samples in a batch of WavLM inference (160 seconds)
+WAVLM_MAX_BATCH_SAMPLES = 2560000
+
+# Pretrained WavLM x-vector model
+WAVLM_MODEL = 'microsoft/wavlm-base-plus-sv'
+
 # Sample rate of the WavLM model audio input
 WAVLM_SAMPLE_RATE = 16000
 
@@ -26,34 +34,81 @@ WAVLM_SAMPLE_RATE = 16000
 def from_audio(audio, sample_rate=promonet.SAMPLE_RATE, gpu=None):
     """Compute speaker embedding from audio"""
     # Resample
-    torchaudio.functional.resample(audio, sample_rate, WAVLM_SAMPLE_RATE)
+    audio = torchaudio.functional.resample(
+        audio,
+        sample_rate,
+        WAVLM_SAMPLE_RATE)
 
     # Embed
     return infer(audio[0], gpu)
 
 
-def from_file(file, gpu=None):
+def from_file(file, gpu=None, store=None):
     """Compute speaker embedding from file"""
-    return from_audio(promonet.load.audio(file), gpu=gpu)
+    if store is None:
+        audio = load(file)
+    else:
+        audio = store.load(file, WAVLM_SAMPLE_RATE)
+    return infer(audio[0], gpu)
 
 
-def from_file_to_file(file, output_file, gpu=None):
+def from_file_to_file(file, output_file, gpu=None, store=None):
     """Compute speaker embedding from file and save"""
     # Embed
-    embedding = from_file(file, gpu).cpu()
+    embedding = from_file(file, gpu, store).cpu()
 
     # Save
     torch.save(embedding, output_file)
 
 
-def from_files_to_files(files, output_files, gpu=None):
-    """Compute speaker embedding from files and save"""
-    for file, output_file in torchutil.iterator(
-        zip(files, output_files),
+def from_files_to_files(files, output_files, gpu=None, store=None):
+    """Compute speaker embeddings from files and save
+
+    Files are sorted by duration and embedded in batches of at most
+    WAVLM_MAX_BATCH_SIZE files and WAVLM_MAX_BATCH_SAMPLES padded samples.
+    """
+    # Get length of each file at the WavLM sample rate
+    lengths = []
+    for file in files:
+        if store is None:
+            info = torchaudio.info(file)
+            lengths.append(math.ceil(
+                info.num_frames * WAVLM_SAMPLE_RATE / info.sample_rate))
+        else:
+            lengths.append(store.load(file, WAVLM_SAMPLE_RATE).shape[-1])
+
+    # Group files of similar duration. Files are sorted by increasing
+    # length, so the last file of a batch determines its padded size.
+    batches, batch = [], []
+    for i in sorted(range(len(files)), key=lengths.__getitem__):
+        if batch and (
+            len(batch) == WAVLM_MAX_BATCH_SIZE or
+            (len(batch) + 1) * lengths[i] > WAVLM_MAX_BATCH_SAMPLES
+        ):
+            batches.append(batch)
+            batch = []
+        batch.append(i)
+    if batch:
+        batches.append(batch)
+
+    for indices in torchutil.iterator(
+        batches,
         'WavLM x-vectors',
-        total=len(files)
+        total=len(batches)
     ):
-        from_file_to_file(file, output_file, gpu)
+
+        # Load audio
+        audio = [
+            load(files[i]) if store is None
+            else store.load(files[i], WAVLM_SAMPLE_RATE)
+            for i in indices]
+
+        # Embed
+        embeddings = infer([item[0] for item in audio], gpu).cpu()
+
+        # Save
+        for i, embedding in zip(indices, embeddings):
+            torch.save(embedding[None].clone(), output_files[i])
 
 
 ###############################################################################
@@ -62,30 +117,59 @@ def from_files_to_files(files, output_files, gpu=None):
 
 
 def infer(audio, gpu=None):
-    """Infer speaker embedding from audio"""
+    """Infer speaker embeddings from audio
+
+    Arguments
+        audio: Audio at the WavLM sample rate of shape=(samples,), or a list
+            of such audio of varying lengths
+        gpu: The GPU index
+
+    Returns
+        embeddings: shape=(batch, 512)
+    """
     # Cache networks
     if not hasattr(infer, 'feature_extractor'):
         infer.feature_extractor = Wav2Vec2FeatureExtractor.from_pretrained(
-            'microsoft/wavlm-base-plus-sv')
+            WAVLM_MODEL)
     if not hasattr(infer, 'model'):
-        infer.model = WavLMForXVector.from_pretrained(
-            'microsoft/wavlm-base-plus-sv')
+        infer.model = WavLMForXVector.from_pretrained(WAVLM_MODEL)
 
     # Place on device (no-op if devices match)
     device = torch.device('cpu' if gpu is None else f'cuda:{gpu}')
     infer.model.to(device)
 
-    # Preprocess
+    # Preprocess. Each item is normalized over its own samples, and padding
+    # is excluded from attention and pooling by the attention mask.
+    if isinstance(audio, torch.Tensor):
+        audio = [audio]
     features = infer.feature_extractor(
-        audio,
+        [item.to(torch.float32).cpu().numpy() for item in audio],
+        sampling_rate=WAVLM_SAMPLE_RATE,
         padding=True,
+        return_attention_mask=True,
         return_tensors="pt")
 
     # Embed
-    embeddings = infer.model(
-        features['input_values'].to(device),
-        features['attention_mask'].to(device)
-    ).embeddings.detach()
+    with torch.no_grad():
+        embeddings = infer.model(
+            features['input_values'].to(device),
+            features['attention_mask'].to(device)
+        ).embeddings.detach()
 
     # Normalize
     return torch.nn.functional.normalize(embeddings, dim=-1)
+
+
+def load(file):
+    """Load audio from disk at the WavLM sample rate"""
+    # Load
+    audio, sample_rate = torchaudio.load(file)
+
+    # Ensure mono
+    audio = audio.mean(dim=0, keepdims=True)
+
+    # Resample
+    return torchaudio.functional.resample(
+        audio,
+        sample_rate,
+        WAVLM_SAMPLE_RATE)
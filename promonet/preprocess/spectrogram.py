@@ -19,37 +19,21 @@ def from_audio(
         promonet.LOG_DYNAMIC_RANGE_COMPRESSION_THRESHOLD
 ):
     """Compute spectrogram from audio"""
-    # Cache hann window
-    if (
-        not hasattr(from_audio, 'window') or
-        from_audio.dtype != audio.dtype or
-        from_audio.device != audio.device
-    ):
-        from_audio.window = torch.hann_window(
-            promonet.WINDOW_SIZE,
-            dtype=audio.dtype,
-            device=audio.device)
-        from_audio.dtype = audio.dtype
-        from_audio.device = audio.device
-
-    # Pad audio
-    size = (promonet.NUM_FFT - promonet.HOPSIZE) // 2
-    audio = torch.nn.functional.pad(audio, (size, size), mode='reflect')
-
-    # Compute stft
-    stft = torch.stft(
-        audio.squeeze(1),
-        promonet.NUM_FFT,
-        hop_length=promonet.HOPSIZE,
-        window=from_audio.window,
-        center=False,
-        normalized=False,
-        onesided=True,
-        return_complex=True)
-    stft = torch.view_as_real(stft)
+    return from_power(
+        promonet.preprocess.stft.from_audio(audio),
+        mels,
+        log_dynamic_range_compression_threshold)
+
 
+def from_power(
+    power,
+    mels=False,
+    log_dynamic_range_compression_threshold=\
+        promonet.LOG_DYNAMIC_RANGE_COMPRESSION_THRESHOLD
+):
+    """Compute spectrogram from a power spectrogram"""
     # Compute magnitude
-    spectrogram = torch.sqrt(stft.pow(2).sum(-1) + 1e-6)
+    spectrogram = torch.sqrt(power + 1e-6)
 
     # Maybe convert to mels
     if mels:
@@ -57,7 +41,7 @@ def from_audio(
             spectrogram,
             log_dynamic_range_compression_threshold)
 
-    return spectrogram.squeeze(0)
+    return spectrogram
 
 
 def from_file(
@@ -113,8 +97,12 @@ def linear_to_mel(
     log_dynamic_range_compression_threshold=\
         promonet.LOG_DYNAMIC_RANGE_COMPRESSION_THRESHOLD
 ):
-    # Create mel basis
-    if not hasattr(linear_to_mel, 'mel_basis'):
+    # Cache mel basis
+    if (
+        not hasattr(linear_to_mel, 'basis') or
+        linear_to_mel.basis.dtype != spectrogram.dtype or
+        linear_to_mel.basis.device != spectrogram.device
+    ):
         basis = librosa.filters.mel(
             sr=promonet.SAMPLE_RATE,
             n_fft=promonet.NUM_FFT,
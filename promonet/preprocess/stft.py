@@ -0,0 +1,137 @@
+import torch
+import torchaudio
+import torchutil
+
+import promonet
+
+
+###############################################################################
+# Short-time Fourier transform
+###############################################################################
+
+
+def from_audio(audio):
+    """Compute the power spectrogram shared by loudness and spectrograms
+
+    Arguments
+        audio: Audio of shape=(1, samples), shape=(batch, samples), or
+            shape=(batch, 1, samples)
+
+    Returns
+        power: shape=(promonet.NUM_FFT // 2 + 1, frames) or
+            shape=(batch, promonet.NUM_FFT // 2 + 1, frames)
+    """
+    return from_padded_audio(pad(audio)).squeeze(0)
+
+
+def from_padded_audio(audio):
+    """Compute the power spectrogram of audio padded with pad"""
+    # Cache hann window
+    if (
+        not hasattr(from_padded_audio, 'window') or
+        from_padded_audio.dtype != audio.dtype or
+        from_padded_audio.device != audio.device
+    ):
+        from_padded_audio.window = torch.hann_window(
+            promonet.WINDOW_SIZE,
+            dtype=audio.dtype,
+            device=audio.device)
+        from_padded_audio.dtype = audio.dtype
+        from_padded_audio.device = audio.device
+
+    # Compute stft
+    stft = torch.stft(
+        audio.squeeze(1) if audio.ndim == 3 else audio,
+        promonet.NUM_FFT,
+        hop_length=promonet.HOPSIZE,
+        window=from_padded_audio.window,
+        center=False,
+        normalized=False,
+        onesided=True,
+        return_complex=True)
+
+    # Compute power
+    return stft.real ** 2 + stft.imag ** 2
+
+
+def from_file(audio_file):
+    """Compute the power spectrogram from audio file"""
+    return from_audio(promonet.load.audio(audio_file))
+
+
+def from_files_to_files(
+    audio_files,
+    loudness_files=None,
+    spectrogram_files=None,
+    bands=promonet.LOUDNESS_BANDS,
+    gpu=None,
+    batch_size=64,
+    store=None
+):
+    """Compute loudness and spectrograms from one STFT of each audio file
+
+    Files of similar duration are transformed in batches. Audio is read
+    from the promonet.preprocess.store.AudioStore, if given.
+    """
+    device = torch.device('cpu' if gpu is None else f'cuda:{gpu}')
+
+    # Group files of similar duration
+    durations = []
+    for file in audio_files:
+        if store is None:
+            info = torchaudio.info(file)
+            durations.append(info.num_frames / info.sample_rate)
+        else:
+            durations.append(store.load(file).shape[-1])
+    order = sorted(range(len(audio_files)), key=durations.__getitem__)
+    batches = [
+        order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+    for indices in torchutil.iterator(
+        batches,
+        'promonet.preprocess.stft',
+        total=len(batches)
+    ):
+
+        # Load audio
+        audio = [
+            promonet.load.audio(audio_files[i]) if store is None
+            else store.load(audio_files[i])
+            for i in indices]
+        frames = [
+            promonet.convert.samples_to_frames(item.shape[-1])
+            for item in audio]
+
+        # Pad each file before batching, so that frames match the STFT of
+        # the file on its own
+        audio = [pad(item) for item in audio]
+        length = max(item.shape[-1] for item in audio)
+        audio = torch.cat([
+            torch.nn.functional.pad(item, (0, length - item.shape[-1]))
+            for item in audio]).to(device)
+
+        # Compute stft
+        power = from_padded_audio(audio)
+
+        # Save
+        for i, item, item_frames in zip(indices, power, frames):
+            item = item[:, :item_frames]
+            if loudness_files is not None:
+                torch.save(
+                    promonet.preprocess.loudness.from_power(item, bands).cpu(),
+                    loudness_files[i])
+            if spectrogram_files is not None:
+                torch.save(
+                    promonet.preprocess.spectrogram.from_power(item).cpu(),
+                    spectrogram_files[i])
+
+
+###############################################################################
+# Utilities
+###############################################################################
+
+
+def pad(audio):
+    """Reflection-pad audio so that frames are centered between hops"""
+    size = (promonet.NUM_FFT - promonet.HOPSIZE) // 2
+    return torch.nn.functional.pad(audio, (size, size), mode='reflect')
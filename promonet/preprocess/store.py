@@ -0,0 +1,110 @@
+from pathlib import Path
+
+import torch
+import torchaudio
+import torchutil
+
+import promonet
+
+
+###############################################################################
+# Decoded audio store
+###############################################################################
+
+
+class AudioStore:
+    """Scratch store of decoded audio shared by feature extractors
+
+    Each audio file is decoded and downmixed once, resampled to each
+    requested sample rate, and appended to one float32 file per sample rate.
+    The files are memory-mapped, so loading returns a view without copying.
+    Stores passed to worker processes map the same files.
+
+    Arguments
+        directory: Scratch directory to save decoded audio
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.index = {}
+        self.offsets = {}
+        self.sizes = {}
+        self.data = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['data']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.map()
+
+    def decode(self, files, sample_rates=[promonet.SAMPLE_RATE]):
+        """Decode audio files and save at each sample rate
+
+        Arguments
+            files: Audio files to decode
+            sample_rates: Sample rates needed by the feature extractors
+        """
+        handles = {
+            rate: open(self.directory / f'{rate}.f32', 'wb')
+            for rate in sample_rates}
+        self.offsets = {rate: [] for rate in sample_rates}
+        self.sizes = {rate: 0 for rate in sample_rates}
+        try:
+            for i, file in torchutil.iterator(
+                enumerate(files),
+                'promonet.preprocess.store',
+                total=len(files)
+            ):
+
+                # Load and ensure mono
+                audio, sample_rate = torchaudio.load(file)
+                audio = audio.mean(dim=0)
+
+                # Resample and save
+                for rate, handle in handles.items():
+                    resampled = torchaudio.functional.resample(
+                        audio,
+                        sample_rate,
+                        rate
+                    ).to(torch.float32)
+                    resampled.numpy().tofile(handle)
+                    self.offsets[rate].append(
+                        (self.sizes[rate], resampled.numel()))
+                    self.sizes[rate] += resampled.numel()
+
+                self.index[str(file)] = i
+
+        finally:
+            for handle in handles.values():
+                handle.close()
+
+        self.map()
+
+    def load(self, file, sample_rate=promonet.SAMPLE_RATE):
+        """Load decoded audio
+
+        Arguments
+            file: The audio file
+            sample_rate: The sample rate
+
+        Returns
+            audio: View of the decoded audio. shape=(1, samples)
+        """
+        start, length = self.offsets[sample_rate][self.index[str(file)]]
+        return self.data[sample_rate][start:start + length][None]
+
+    def map(self):
+        """Memory-map decoded audio"""
+        self.data = {}
+        for rate, size in self.sizes.items():
+            if size == 0:
+                self.data[rate] = torch.zeros(0)
+            else:
+                self.data[rate] = torch.from_file(
+                    str(self.directory / f'{rate}.f32'),
+                    shared=False,
+                    size=size,
+                    dtype=torch.float32)
@@ -15,6 +15,9 @@ import promonet
 # Whisper model identifier
 MODEL_ID = "openai/whisper-large-v3"
 
+# Sample rate of the Whisper model audio input
+WHISPER_SAMPLE_RATE = 16000
+
 
 ###############################################################################
 # Whisper ASR
@@ -51,10 +54,21 @@ def from_file_to_file(audio_file, output_file, gpu=None):
     from_files_to_files([audio_file], [output_file], gpu)
 
 
-def from_files_to_files(audio_files, output_files, gpu=None):
+def from_files_to_files(audio_files, output_files, gpu=None, store=None):
     """Perform batched Whisper ASR from files and save"""
+    # Maybe read decoded audio from the store
+    if store is None:
+        audio = [str(audio_file) for audio_file in audio_files]
+    else:
+        audio = [
+            {
+                'sampling_rate': WHISPER_SAMPLE_RATE,
+                'raw': store.load(audio_file, WHISPER_SAMPLE_RATE)[0].numpy()
+            }
+            for audio_file in audio_files]
+
     # Infer text
-    results = infer([str(audio_file) for audio_file in audio_files], gpu)
+    results = infer(audio, gpu)
 
     # Lint
     results = [lint(result['text']) for result in results]
@@ -0,0 +1,47 @@
+from pathlib import Path
+
+import yapecs
+
+import promonet
+
+
+###############################################################################
+# Entry point
+###############################################################################
+
+
+def parse_args():
+    """Parse command-line arguments"""
+    parser = yapecs.ArgumentParser(
+        description='Serve speech synthesis with dynamic micro-batching')
+    parser.add_argument(
+        '--host',
+        default='localhost',
+        help='The host to serve on')
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=promonet.SERVE_PORT,
+        help='The port to serve on')
+    parser.add_argument(
+        '--max_frames',
+        type=int,
+        default=promonet.SERVE_MAX_FRAMES,
+        help='The maximum number of padded frames in a batch')
+    parser.add_argument(
+        '--max_wait',
+        type=float,
+        default=promonet.SERVE_MAX_WAIT,
+        help='The maximum time in seconds a request waits for a batch')
+    parser.add_argument(
+        '--checkpoint',
+        type=Path,
+        help='The generator checkpoint')
+    parser.add_argument(
+        '--gpu',
+        type=int,
+        help='The GPU index')
+    return parser.parse_args()
+
+
+promonet.serve.run(**vars(parse_args()))
@@ -0,0 +1,363 @@
+"""Local synthesis server with dynamic micro-batching
+
+Clients send feature payloads over TCP. Each message is an 8-byte big-endian
+length followed by a dictionary serialized with torch.save. A synthesis
+request contains the features saved by preprocessing, as well as optional
+speaker and ratios.
+
+{
+    'loudness': shape=(promonet.NUM_FFT // 2 + 1, frames),
+    'pitch': shape=(1, frames),
+    'periodicity': shape=(1, frames),
+    'ppg': shape=(promonet.PPG_CHANNELS, frames),
+    'speaker': int or WavLM embedding of shape=(1, channels),
+    'spectral_balance_ratio': float,
+    'loudness_ratio': float
+}
+
+The reply is {'audio': shape=(1, samples)} or {'error': message}. Sending
+{'command': 'stats'} replies with server statistics.
+"""
+import asyncio
+import collections
+import concurrent.futures
+import io
+import json
+import struct
+import time
+
+import torch
+
+import promonet
+
+
+###############################################################################
+# Synthesis server
+###############################################################################
+
+
+class Server:
+    """Synthesis server that batches concurrent requests
+
+    Requests are grouped into a batch until either the oldest request has
+    waited max_wait seconds or adding another request would exceed
+    max_frames padded frames. Each batch is synthesized with one generator
+    forward pass.
+    """
+
+    def __init__(
+        self,
+        max_frames=promonet.SERVE_MAX_FRAMES,
+        max_wait=promonet.SERVE_MAX_WAIT,
+        checkpoint=None,
+        gpu=None
+    ):
+        self.max_frames = max_frames
+        self.max_wait = max_wait
+        self.checkpoint = checkpoint
+        self.device = torch.device('cpu' if gpu is None else f'cuda:{gpu}')
+
+        # Run one forward pass at a time off of the event loop
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+        # Statistics
+        self.batch_sizes = collections.Counter()
+        self.latencies = collections.deque(maxlen=10000)
+        self.requests = 0
+
+    async def batch(self):
+        """Form batches from the queue and synthesize them"""
+        loop = asyncio.get_running_loop()
+        pending = None
+        while True:
+
+            # Wait for the first request of the batch
+            if pending is None:
+                pending = await self.queue.get()
+            batch, pending = [pending], None
+            longest = batch[0][0]['pitch'].shape[-1]
+            deadline = batch[0][2] + self.max_wait
+
+            # Add requests until the deadline or the frame budget
+            while 2 * longest <= self.max_frames:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0.:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                length = max(longest, item[0]['pitch'].shape[-1])
+                if length * (len(batch) + 1) > self.max_frames:
+                    pending = item
+                    break
+                batch.append(item)
+                longest = length
+
+            # Synthesize
+            self.batch_sizes[len(batch)] += 1
+            try:
+                results = await loop.run_in_executor(
+                    self.executor,
+                    self.synthesize,
+                    [item[0] for item in batch])
+            except Exception as error:
+
+                # Synthesize requests one at a time, so that a request that
+                # fails does not fail the rest of the batch
+                if len(batch) == 1:
+                    results = [error]
+                else:
+                    results = []
+                    for item in batch:
+                        try:
+                            results.extend(await loop.run_in_executor(
+                                self.executor,
+                                self.synthesize,
+                                [item[0]]))
+                        except Exception as failure:
+                            results.append(failure)
+
+            # Reply to clients that are still waiting
+            for (_, future, start), result in zip(batch, results):
+                self.latencies.append(time.perf_counter() - start)
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    async def handle(self, reader, writer):
+        """Handle requests from one client connection"""
+        try:
+            while True:
+                try:
+                    payload = await receive(reader)
+                except asyncio.IncompleteReadError:
+                    break
+                except Exception as error:
+                    await send(writer, {'error': repr(error)})
+                    continue
+
+                # Report statistics
+                if (
+                    isinstance(payload, dict) and
+                    payload.get('command') == 'stats'
+                ):
+                    await send(writer, self.stats())
+                    continue
+
+                # Reject malformed requests before they reach the batcher
+                try:
+                    validate(payload)
+                except ValueError as error:
+                    await send(writer, {'error': repr(error)})
+                    continue
+
+                # Wait for synthesis
+                self.requests += 1
+                future = asyncio.get_running_loop().create_future()
+                await self.queue.put((payload, future, time.perf_counter()))
+                try:
+                    await send(writer, {'audio': await future})
+                except Exception as error:
+                    await send(writer, {'error': repr(error)})
+        finally:
+            writer.close()
+
+    async def run(self, host='localhost', port=promonet.SERVE_PORT):
+        """Serve until cancelled"""
+        self.queue = asyncio.Queue()
+
+        # Load the generator before accepting requests
+        promonet.synthesize.cached_model(self.checkpoint, self.device)
+
+        batcher = asyncio.create_task(self.batch())
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f'Serving on {host}:{port}', flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            self.executor.shutdown()
+
+    def stats(self):
+        """Get server statistics"""
+        stats = {
+            'batch-sizes': dict(sorted(self.batch_sizes.items())),
+            'queue-depth': self.queue.qsize(),
+            'requests': self.requests}
+        if self.latencies:
+            stats['latency-ms'] = promonet.benchmark.percentiles(
+                1000. * torch.tensor(self.latencies))
+        return stats
+
+    def synthesize(self, requests):
+        """Synthesize a batch of requests"""
+        lengths = [request['pitch'].shape[-1] for request in requests]
+        length = max(lengths)
+
+        # Pad features
+        features = []
+        for key in ['loudness', 'pitch', 'periodicity', 'ppg']:
+            values = [request[key] for request in requests]
+            if key in ['loudness', 'ppg']:
+                values = [
+                    value[None] if value.ndim == 2 else value
+                    for value in values]
+            features.append(torch.cat([
+                promonet.synthesize.pad(value, length).to(self.device)
+                for value in values]))
+
+        # Per-request speakers and ratios
+        if promonet.ZERO_SHOT:
+            speakers = torch.cat([request['speaker'] for request in requests])
+        else:
+            speakers = [request.get('speaker', 0) for request in requests]
+        spectral_balance_ratios = [
+            request.get('spectral_balance_ratio', 1.) for request in requests]
+        loudness_ratios = [
+            request.get('loudness_ratio', 1.) for request in requests]
+
+        # Synthesize
+        generated = promonet.synthesize.generate(
+            *features,
+            speakers,
+            spectral_balance_ratios,
+            loudness_ratios,
+            self.checkpoint
+        ).to(device='cpu', dtype=torch.float32)
+
+        # Trim
+        return [
+            item[:, :promonet.convert.frames_to_samples(frames)].clone()
+            for item, frames in zip(generated, lengths)]
+
+
+def run(
+    host='localhost',
+    port=promonet.SERVE_PORT,
+    max_frames=promonet.SERVE_MAX_FRAMES,
+    max_wait=promonet.SERVE_MAX_WAIT,
+    checkpoint=None,
+    gpu=None
+):
+    """Run the synthesis server"""
+    server = Server(max_frames, max_wait, checkpoint, gpu)
+    try:
+        asyncio.run(server.run(host, port))
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(server.stats(), indent=4))
+
+
+###############################################################################
+# Client
+###############################################################################
+
+
+async def request(reader, writer, payload):
+    """Send one request over an open connection and wait for the reply"""
+    await send(writer, payload)
+    reply = await receive(reader)
+    if 'error' in reply:
+        raise RuntimeError(reply['error'])
+    return reply
+
+
+def from_features(
+    loudness,
+    pitch,
+    periodicity,
+    ppg,
+    speaker=0,
+    spectral_balance_ratio=1.,
+    loudness_ratio=1.,
+    host='localhost',
+    port=promonet.SERVE_PORT
+):
+    """Perform speech synthesis using a running server"""
+    async def main():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            return await request(
+                reader,
+                writer,
+                {
+                    'loudness': loudness,
+                    'pitch': pitch,
+                    'periodicity': periodicity,
+                    'ppg': ppg,
+                    'speaker': speaker,
+                    'spectral_balance_ratio': spectral_balance_ratio,
+                    'loudness_ratio': loudness_ratio})
+        finally:
+            writer.close()
+    return asyncio.run(main())['audio']
+
+
+###############################################################################
+# Utilities
+###############################################################################
+
+
+async def receive(reader):
+    """Receive one length-prefixed message"""
+    size, = struct.unpack('!Q', await reader.readexactly(8))
+    return torch.load(
+        io.BytesIO(await reader.readexactly(size)),
+        weights_only=True)
+
+
+def validate(payload):
+    """Raise a ValueError if a synthesis request is malformed"""
+    if not isinstance(payload, dict):
+        raise ValueError('Request must be a dictionary')
+
+    # Features
+    frames = None
+    for key, ndims in [
+        ('loudness', (2, 3)),
+        ('pitch', (2,)),
+        ('periodicity', (2,)),
+        ('ppg', (2, 3))
+    ]:
+        value = payload.get(key)
+        if not isinstance(value, torch.Tensor):
+            raise ValueError(f'Request is missing tensor {key}')
+        if value.ndim not in ndims or value.ndim == 3 and value.shape[0] != 1:
+            raise ValueError(
+                f'Request {key} has invalid shape {tuple(value.shape)}')
+        if key in ['pitch', 'periodicity'] and value.shape[0] != 1:
+            raise ValueError(
+                f'Request {key} has invalid shape {tuple(value.shape)}')
+        if frames is None:
+            frames = value.shape[-1]
+        elif value.shape[-1] != frames:
+            raise ValueError(f'Request {key} has {value.shape[-1]} frames, '
+                             f'but loudness has {frames}')
+    if frames == 0:
+        raise ValueError('Request has no frames')
+
+    # Speaker
+    speaker = payload.get('speaker', 0)
+    if promonet.ZERO_SHOT:
+        if not isinstance(speaker, torch.Tensor) or speaker.ndim != 2:
+            raise ValueError('Request speaker must be an embedding')
+    elif not isinstance(speaker, int):
+        raise ValueError('Request speaker must be an integer')
+
+    # Ratios
+    for key in ['spectral_balance_ratio', 'loudness_ratio']:
+        if not isinstance(payload.get(key, 1.), (float, int)):
+            raise ValueError(f'Request {key} must be a number')
+
+
+async def send(writer, payload):
+    """Send one length-prefixed message"""
+    buffer = io.BytesIO()
+    torch.save(payload, buffer)
+    writer.write(struct.pack('!Q', buffer.tell()) + buffer.getvalue())
+    await writer.drain()
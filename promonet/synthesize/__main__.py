@@ -61,6 +61,24 @@ def parse_args():
         '--gpu',
         type=int,
         help='The GPU index')
+    parser.add_argument(
+        '--max_frames',
+        type=int,
+        help='If provided, synthesizes length-bucketed batches of at most '
+             'this many padded frames')
+    parser.add_argument(
+        '--num_workers',
+        type=int,
+        help='If provided, synthesizes with this many CPU worker processes')
+    parser.add_argument(
+        '--quantize',
+        action='store_true',
+        help='Whether to use dynamic int8 quantization on CPU')
+    parser.add_argument(
+        '--backend',
+        default='eager',
+        choices=['eager', 'onnxruntime', 'torchscript'],
+        help='The inference backend')
     return parser.parse_args()
 
 
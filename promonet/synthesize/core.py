@@ -1,8 +1,9 @@
+import functools
+import multiprocessing as mp
 import os
-from typing import List, Optional, Union
+from typing import Iterator, List, Optional, Tuple, Union
 from pathlib import Path
 
-import huggingface_hub
 import torch
 import torchaudio
 import torchutil
@@ -24,7 +25,9 @@ def from_features(
     spectral_balance_ratio: float = 1.,
     loudness_ratio: float = 1.,
     checkpoint: Optional[Union[str, os.PathLike]] = None,
-    gpu: Optional[int] = None
+    gpu: Optional[int] = None,
+    quantize: bool = False,
+    backend: str = 'eager'
 ) -> torch.Tensor:
     """Perform speech synthesis
 
@@ -38,14 +41,19 @@ def from_features(
         loudness_ratio: > 1 for louder; < 1 for quieter
         checkpoint: The generator checkpoint
         gpu: The GPU index
+        quantize: Whether to use dynamic int8 quantization on CPU
+        backend: One of ['eager', 'onnxruntime', 'torchscript']
 
     Returns
         generated: The generated speech
     """
     device = torch.device('cpu' if gpu is None else f'cuda:{gpu}')
 
+    # Maybe add batch dimension
     if loudness.ndim == 2:
         loudness = loudness[None]
+    if ppg.ndim == 2:
+        ppg = ppg[None]
 
     return generate(
         loudness.to(device),
@@ -55,8 +63,113 @@ def from_features(
         speaker,
         spectral_balance_ratio,
         loudness_ratio,
-        checkpoint
-    ).to(torch.float32)
+        checkpoint,
+        quantize,
+        backend
+    )[0].to(torch.float32)
+
+
+def from_features_streaming(
+    loudness: torch.Tensor,
+    pitch: torch.Tensor,
+    periodicity: torch.Tensor,
+    ppg: torch.Tensor,
+    speaker: Union[int, torch.Tensor] = 0,
+    spectral_balance_ratio: float = 1.,
+    loudness_ratio: float = 1.,
+    checkpoint: Optional[Union[str, os.PathLike]] = None,
+    gpu: Optional[int] = None,
+    block_frames: int = 512,
+    quantize: bool = False
+) -> Iterator[torch.Tensor]:
+    """Perform speech synthesis in blocks of frames with bounded memory
+
+    HiFi-GAN blocks are synthesized with enough surrounding frames to cover
+    the receptive field of the generator, so the concatenated blocks match
+    synthesis of the entire sequence. FARGAN carries its recurrent state
+    between blocks, and block_frames=1 performs low-latency frame-by-frame
+    synthesis.
+
+    Args:
+        loudness: The loudness contour
+        pitch: The pitch contour
+        periodicity: The periodicity contour
+        ppg: The phonetic posteriorgram
+        speaker: The speaker index or embedding
+        spectral_balance_ratio: > 1 for Alvin and the Chipmunks; < 1 for Patrick Star
+        loudness_ratio: > 1 for louder; < 1 for quieter
+        checkpoint: The generator checkpoint
+        gpu: The GPU index
+        block_frames: The number of frames synthesized per block
+        quantize: Whether to use dynamic int8 quantization on CPU
+
+    Yields
+        generated: The generated speech of one block
+    """
+    if promonet.MODEL not in ['fargan', 'hifigan']:
+        raise ValueError(
+            f'Streaming synthesis is not implemented for {promonet.MODEL}')
+
+    device = torch.device('cpu' if gpu is None else f'cuda:{gpu}')
+
+    # Maybe add batch dimension
+    if loudness.ndim == 2:
+        loudness = loudness[None]
+    if ppg.ndim == 2:
+        ppg = ppg[None]
+    loudness = loudness.to(device)
+    pitch = pitch.to(device)
+    periodicity = periodicity.to(device)
+    ppg = ppg.to(device)
+
+    # Autoregressive synthesis carries state between blocks
+    if promonet.MODEL == 'fargan':
+        yield from generate_stateful(
+            loudness,
+            pitch,
+            periodicity,
+            ppg,
+            speaker,
+            spectral_balance_ratio,
+            loudness_ratio,
+            checkpoint,
+            block_frames,
+            quantize)
+        return
+
+    # Get number of frames of context needed on each side of a block
+    context = cached_model(
+        checkpoint,
+        device,
+        quantize
+    ).model.receptive_field()
+
+    frames = pitch.shape[-1]
+    for start in range(0, frames, block_frames):
+        end = min(start + block_frames, frames)
+
+        # Add context
+        left, right = max(0, start - context), min(frames, end + context)
+
+        # Generate
+        generated = generate(
+            loudness[..., left:right],
+            pitch[..., left:right],
+            periodicity[..., left:right],
+            ppg[..., left:right],
+            speaker,
+            spectral_balance_ratio,
+            loudness_ratio,
+            checkpoint,
+            quantize)
+
+        # Remove context
+        yield generated[
+            0,
+            :,
+            promonet.convert.frames_to_samples(start - left):
+            promonet.convert.frames_to_samples(end - left)
+        ].to(torch.float32)
 
 
 def from_file(
@@ -68,7 +181,9 @@ def from_file(
     spectral_balance_ratio: float = 1.,
     loudness_ratio: float = 1.,
     checkpoint: Optional[Union[str, os.PathLike]] = None,
-    gpu: Optional[int] = None
+    gpu: Optional[int] = None,
+    quantize: bool = False,
+    backend: str = 'eager'
 ) -> torch.Tensor:
     """Perform speech synthesis from features on disk
 
@@ -82,6 +197,8 @@ def from_file(
         loudness_ratio: > 1 for louder; < 1 for quieter
         checkpoint: The generator checkpoint
         gpu: The GPU index
+        quantize: Whether to use dynamic int8 quantization on CPU
+        backend: One of ['eager', 'onnxruntime', 'torchscript']
 
     Returns
         generated: The generated speech
@@ -108,7 +225,9 @@ def from_file(
         spectral_balance_ratio,
         loudness_ratio,
         checkpoint,
-        gpu)
+        gpu,
+        quantize,
+        backend)
 
 
 def from_file_to_file(
@@ -121,7 +240,9 @@ def from_file_to_file(
     spectral_balance_ratio: float = 1.,
     loudness_ratio: float = 1.,
     checkpoint: Optional[Union[str, os.PathLike]] = None,
-    gpu: Optional[int] = None
+    gpu: Optional[int] = None,
+    quantize: bool = False,
+    backend: str = 'eager'
 ) -> None:
     """Perform speech synthesis from features on disk and save
 
@@ -136,6 +257,8 @@ def from_file_to_file(
         loudness_ratio: > 1 for louder; < 1 for quieter
         checkpoint: The generator checkpoint
         gpu: The GPU index
+        quantize: Whether to use dynamic int8 quantization on CPU
+        backend: One of ['eager', 'onnxruntime', 'torchscript']
     """
     # Generate
     generated = from_file(
@@ -147,7 +270,9 @@ def from_file_to_file(
         spectral_balance_ratio,
         loudness_ratio,
         checkpoint,
-        gpu
+        gpu,
+        quantize,
+        backend
     ).to('cpu')
 
     # Save
@@ -162,10 +287,14 @@ def from_files_to_files(
     ppg_files: List[Union[str, os.PathLike]],
     output_files: List[Union[str, os.PathLike]],
     speakers: Optional[Union[List[int], torch.Tensor, Path, str]] = None,
-    spectral_balance_ratio: float = 1.,
-    loudness_ratio: float = 1.,
+    spectral_balance_ratio: Union[float, List[float]] = 1.,
+    loudness_ratio: Union[float, List[float]] = 1.,
     checkpoint: Optional[Union[str, os.PathLike]] = None,
-    gpu: Optional[int] = None
+    gpu: Optional[int] = None,
+    max_frames: Optional[int] = None,
+    num_workers: Optional[int] = None,
+    quantize: bool = False,
+    backend: str = 'eager'
 ) -> None:
     """Perform batched speech synthesis from features on disk and save
 
@@ -176,13 +305,61 @@ def from_files_to_files(
         ppg_files: The phonetic posteriorgram files
         output_files: The files to save generated speech audio
         speakers: The speaker indices or embeddings
-        spectral_balance_ratio: > 1 for Alvin and the Chipmunks; < 1 for Patrick Star
-        loudness_ratio: > 1 for louder; < 1 for quieter
+        spectral_balance_ratio: > 1 for Alvin and the Chipmunks; < 1 for Patrick Star.
+            One value for all files, or one value per file.
+        loudness_ratio: > 1 for louder; < 1 for quieter.
+            One value for all files, or one value per file.
         checkpoint: The generator checkpoint
         gpu: The GPU index
+        max_frames: The maximum number of padded frames per batch.
+            If None, files are synthesized one at a time.
+        num_workers: The number of CPU worker processes.
+            If None, files are synthesized in this process.
+        quantize: Whether to use dynamic int8 quantization on CPU
+        backend: One of ['eager', 'onnxruntime', 'torchscript']
     """
     if speakers is None:
         speakers = [0] * len(pitch_files)
+    spectral_balance_ratio = per_file(spectral_balance_ratio, len(pitch_files))
+    loudness_ratio = per_file(loudness_ratio, len(pitch_files))
+
+    # Maybe synthesize with a pool of CPU worker processes
+    if num_workers is not None:
+        if gpu is not None or max_frames is not None:
+            raise ValueError(
+                'num_workers requires CPU synthesis without max_frames')
+        from_files_to_files_pool(
+            loudness_files,
+            pitch_files,
+            periodicity_files,
+            ppg_files,
+            output_files,
+            speakers,
+            spectral_balance_ratio,
+            loudness_ratio,
+            checkpoint,
+            num_workers,
+            quantize,
+            backend)
+        return
+
+    # Maybe synthesize in length-bucketed batches
+    if max_frames is not None:
+        from_files_to_files_batched(
+            loudness_files,
+            pitch_files,
+            periodicity_files,
+            ppg_files,
+            output_files,
+            speakers,
+            spectral_balance_ratio,
+            loudness_ratio,
+            checkpoint,
+            gpu,
+            max_frames,
+            quantize,
+            backend)
+        return
 
     # Generate
     iterator = zip(
@@ -191,14 +368,221 @@ def from_files_to_files(
         periodicity_files,
         ppg_files,
         output_files,
-        speakers)
+        speakers,
+        spectral_balance_ratio,
+        loudness_ratio)
     for item in iterator:
         from_file_to_file(
             *item,
-            spectral_balance_ratio=spectral_balance_ratio,
-            loudness_ratio=loudness_ratio,
             checkpoint=checkpoint,
-            gpu=gpu)
+            gpu=gpu,
+            quantize=quantize,
+            backend=backend)
+
+
+def from_files_to_files_batched(
+    loudness_files: List[Union[str, os.PathLike]],
+    pitch_files: List[Union[str, os.PathLike]],
+    periodicity_files: List[Union[str, os.PathLike]],
+    ppg_files: List[Union[str, os.PathLike]],
+    output_files: List[Union[str, os.PathLike]],
+    speakers: Union[List[int], List[Path], List[str]],
+    spectral_balance_ratio: Union[float, List[float]] = 1.,
+    loudness_ratio: Union[float, List[float]] = 1.,
+    checkpoint: Optional[Union[str, os.PathLike]] = None,
+    gpu: Optional[int] = None,
+    max_frames: int = 8192,
+    quantize: bool = False,
+    backend: str = 'eager'
+) -> None:
+    """Perform length-bucketed batched speech synthesis from files and save
+
+    Features are right-padded to the longest item in each batch. The HiFi-GAN
+    output near the end of a shorter item depends on that padding, so those
+    frames are synthesized again from the item alone. Batched output matches
+    synthesizing each file separately.
+
+    Args:
+        loudness_files: The loudness files
+        pitch_files: The pitch files
+        periodicity_files: The periodicity files
+        ppg_files: The phonetic posteriorgram files
+        output_files: The files to save generated speech audio
+        speakers: The speaker indices or embedding files
+        spectral_balance_ratio: > 1 for Alvin and the Chipmunks; < 1 for Patrick Star.
+            One value for all files, or one value per file.
+        loudness_ratio: > 1 for louder; < 1 for quieter.
+            One value for all files, or one value per file.
+        checkpoint: The generator checkpoint
+        gpu: The GPU index
+        max_frames: The maximum number of padded frames per batch
+        quantize: Whether to use dynamic int8 quantization on CPU
+        backend: One of ['eager', 'onnxruntime', 'torchscript']
+    """
+    device = torch.device('cpu' if gpu is None else f'cuda:{gpu}')
+    spectral_balance_ratio = per_file(spectral_balance_ratio, len(pitch_files))
+    loudness_ratio = per_file(loudness_ratio, len(pitch_files))
+
+    # Load pitch, which is the smallest feature on disk, to get lengths
+    pitches = [torch.load(file) for file in pitch_files]
+    lengths = [pitch.shape[-1] for pitch in pitches]
+
+    # Frames on each side that affect the output of a frame. Output of
+    # autoregressive models does not depend on future frames.
+    context = 0
+    if promonet.MODEL == 'hifigan':
+        context = cached_model(checkpoint, device).model.receptive_field()
+
+    # Group files of similar length
+    batches = batch_indices(lengths, max_frames)
+
+    # Generate
+    for indices in torchutil.iterator(
+        batches,
+        'promonet.synthesize',
+        total=len(batches)
+    ):
+        max_length = lengths[indices[-1]]
+
+        # Load and pad features
+        loudness, pitch, periodicity, ppg = [], [], [], []
+        for i in indices:
+            item_loudness = torch.load(loudness_files[i])
+            if item_loudness.ndim == 2:
+                item_loudness = item_loudness[None]
+            loudness.append(pad(item_loudness, max_length).to(device))
+            pitch.append(pad(pitches[i], max_length).to(device))
+            periodicity.append(
+                pad(torch.load(periodicity_files[i]), max_length).to(device))
+            ppg.append(pad(
+                promonet.load.ppg(
+                    ppg_files[i],
+                    resample_length=lengths[i])[None],
+                max_length).to(device))
+
+        # Speaker indices or embeddings
+        if promonet.ZERO_SHOT:
+            batch_speakers = torch.cat(
+                [torch.load(speakers[i]) for i in indices]).to(device)
+        else:
+            batch_speakers = [speakers[i] for i in indices]
+
+        # Synthesize batch
+        generated = generate(
+            torch.cat(loudness),
+            torch.cat(pitch),
+            torch.cat(periodicity),
+            torch.cat(ppg),
+            batch_speakers,
+            [spectral_balance_ratio[i] for i in indices],
+            [loudness_ratio[i] for i in indices],
+            checkpoint,
+            quantize,
+            backend
+        ).to(device='cpu', dtype=torch.float32)
+
+        for j, i in enumerate(indices):
+            length = lengths[i]
+
+            # Synthesize the end of shorter items again without padding
+            if context and length < max_length:
+                start = max(0, length - 2 * context)
+                end = generate(
+                    loudness[j][..., start:length],
+                    pitch[j][..., start:length],
+                    periodicity[j][..., start:length],
+                    ppg[j][..., start:length],
+                    batch_speakers[j:j + 1] if promonet.ZERO_SHOT
+                    else batch_speakers[j],
+                    spectral_balance_ratio[i],
+                    loudness_ratio[i],
+                    checkpoint,
+                    quantize,
+                    backend
+                ).to(device='cpu', dtype=torch.float32)
+                replace = max(0, length - context)
+                generated[
+                    j,
+                    :,
+                    promonet.convert.frames_to_samples(replace):
+                    promonet.convert.frames_to_samples(length)
+                ] = end[
+                    0,
+                    :,
+                    promonet.convert.frames_to_samples(replace - start):
+                ]
+
+            # Trim and save
+            output_file = Path(output_files[i])
+            output_file.parent.mkdir(exist_ok=True, parents=True)
+            torchaudio.save(
+                output_file,
+                generated[j, :, :promonet.convert.frames_to_samples(length)],
+                promonet.SAMPLE_RATE)
+
+
+def from_files_to_files_pool(
+    loudness_files: List[Union[str, os.PathLike]],
+    pitch_files: List[Union[str, os.PathLike]],
+    periodicity_files: List[Union[str, os.PathLike]],
+    ppg_files: List[Union[str, os.PathLike]],
+    output_files: List[Union[str, os.PathLike]],
+    speakers: Union[List[int], List[Path], List[str]],
+    spectral_balance_ratio: Union[float, List[float]] = 1.,
+    loudness_ratio: Union[float, List[float]] = 1.,
+    checkpoint: Optional[Union[str, os.PathLike]] = None,
+    num_workers: int = 1,
+    quantize: bool = False,
+    backend: str = 'eager'
+) -> None:
+    """Perform speech synthesis from files with CPU worker processes
+
+    Each worker loads the generator once and uses an equal share of the CPU
+    cores for intra-op parallelism. Workers pull files from a shared queue
+    one at a time, so long files do not hold up the remaining work.
+
+    Args:
+        loudness_files: The loudness files
+        pitch_files: The pitch files
+        periodicity_files: The periodicity files
+        ppg_files: The phonetic posteriorgram files
+        output_files: The files to save generated speech audio
+        speakers: The speaker indices or embedding files
+        spectral_balance_ratio: > 1 for Alvin and the Chipmunks; < 1 for Patrick Star.
+            One value for all files, or one value per file.
+        loudness_ratio: > 1 for louder; < 1 for quieter.
+            One value for all files, or one value per file.
+        checkpoint: The generator checkpoint
+        num_workers: The number of worker processes
+        quantize: Whether to use dynamic int8 quantization on CPU
+        backend: One of ['eager', 'onnxruntime', 'torchscript']
+    """
+    threads = max(1, os.cpu_count() // num_workers)
+    synthesize_fn = functools.partial(
+        worker_synthesize,
+        checkpoint=checkpoint,
+        quantize=quantize,
+        backend=backend)
+    iterator = zip(
+        loudness_files,
+        pitch_files,
+        periodicity_files,
+        ppg_files,
+        [Path(file) for file in output_files],
+        speakers,
+        per_file(spectral_balance_ratio, len(pitch_files)),
+        per_file(loudness_ratio, len(pitch_files)))
+    with mp.get_context('spawn').Pool(
+        num_workers,
+        initializer=worker_initialize,
+        initargs=(checkpoint, threads, quantize, backend)
+    ) as pool:
+        for _ in torchutil.iterator(
+            pool.imap_unordered(synthesize_fn, iterator),
+            'promonet.synthesize',
+            total=len(pitch_files)
+        ):
+            pass
 
 
 ###############################################################################
@@ -214,62 +598,51 @@ def generate(
     speaker=0,
     spectral_balance_ratio: float = 1.,
     loudness_ratio: float = 1.,
-    checkpoint=None
+    checkpoint=None,
+    quantize: bool = False,
+    backend: str = 'eager'
 ) -> torch.Tensor:
-    """Generate speech from phoneme and prosody features"""
+    """Generate speech from phoneme and prosody features
+
+    Speaker and ratios can be given per batch item or as a single value
+    shared by all items. Returns generated speech of shape
+    (batch, 1, samples).
+    """
     device = pitch.device
+    batch_size = pitch.shape[0]
 
     with torchutil.time.context('load'):
-
-        # Cache model
-        if (
-            not hasattr(generate, 'model') or
-            generate.checkpoint != checkpoint or
-            generate.device != device
-        ):
-            if promonet.SPECTROGRAM_ONLY:
-                model = promonet.model.MelGenerator().to(device)
-            else:
-                model = promonet.model.Generator().to(device)
-            if checkpoint is None:
-                checkpoint = huggingface_hub.hf_hub_download(
-                    'maxrmorrison/promonet',
-                    f'generator-00{promonet.STEPS}.pt')
-            else:
-                if type(checkpoint) is str:
-                    checkpoint = Path(checkpoint)
-                if checkpoint.is_dir():
-                    checkpoint = torchutil.checkpoint.latest_path(
-                        checkpoint,
-                        'generator-*.pt')
-            model, *_ = torchutil.checkpoint.load(checkpoint, model)
-            generate.model = model
-            generate.checkpoint = checkpoint
-            generate.device = device
+        model = cached_model(checkpoint, device, quantize, backend)
 
     with torchutil.time.context('generate'):
 
-        # Specify speaker
-        if promonet.ZERO_SHOT:
-            speakers = speaker.to(device)
-        else:
-            speakers = torch.full((1,), speaker, dtype=torch.long, device=device)
-
-        # Format ratio
-        spectral_balance_ratio = torch.tensor(
-            [spectral_balance_ratio],
-            dtype=torch.float,
-            device=device)
-
-        # Loudness ratio
-        loudness_ratio = torch.tensor(
-            [loudness_ratio],
-            dtype=torch.float,
-            device=device)
+        # Format speaker and ratios
+        (
+            speakers,
+            spectral_balance_ratio,
+            loudness_ratio
+        ) = format_global_features(
+            speaker,
+            spectral_balance_ratio,
+            loudness_ratio,
+            batch_size,
+            device)
+
+        # Generate with a compiled generator
+        if backend != 'eager':
+            return generate_compiled(
+                model,
+                loudness,
+                pitch,
+                periodicity,
+                ppg,
+                speakers,
+                spectral_balance_ratio,
+                loudness_ratio)
 
         # Generate
-        with torchutil.inference.context(generate.model):
-            return generate.model(
+        with torchutil.inference.context(model):
+            return model(
                 loudness,
                 pitch,
                 periodicity,
@@ -277,5 +650,203 @@ def generate(
                 speakers,
                 spectral_balance_ratio,
                 loudness_ratio,
-                generate.model.default_previous_samples
-            )[0]
+                model.default_previous_samples.expand(
+                    batch_size,
+                    -1,
+                    -1))
+
+
+def generate_compiled(
+    model,
+    loudness,
+    pitch,
+    periodicity,
+    ppg,
+    speakers,
+    spectral_balance_ratios,
+    loudness_ratios
+) -> torch.Tensor:
+    """Generate speech with a compiled generator
+
+    Compiled generators accept any number of frames, so features are not
+    padded and the output matches eager inference.
+    """
+    with torch.inference_mode():
+        return model(
+            loudness,
+            pitch,
+            periodicity,
+            ppg,
+            speakers,
+            spectral_balance_ratios,
+            loudness_ratios,
+            model.default_previous_samples.expand(pitch.shape[0], -1, -1))
+
+
+def generate_stateful(
+    loudness,
+    pitch,
+    periodicity,
+    ppg,
+    speaker=0,
+    spectral_balance_ratio: float = 1.,
+    loudness_ratio: float = 1.,
+    checkpoint=None,
+    block_frames: int = 1,
+    quantize: bool = False
+) -> Iterator[torch.Tensor]:
+    """Generate speech block-by-block with an autoregressive generator"""
+    device = pitch.device
+
+    with torchutil.time.context('load'):
+        model = cached_model(checkpoint, device, quantize)
+
+    # Preallocate the buffer holding previous and generated samples
+    buffer = torch.empty(
+        (
+            1,
+            promonet.NUM_PREVIOUS_SAMPLES +
+            promonet.convert.frames_to_samples(block_frames)
+        ),
+        device=device)
+
+    state = None
+    for start in range(0, pitch.shape[-1], block_frames):
+        end = min(start + block_frames, pitch.shape[-1])
+
+        with torchutil.time.context('generate'):
+            with torchutil.inference.context(model):
+
+                # Initialize
+                if state is None:
+                    global_features = model.prepare_global_features(
+                        *format_global_features(
+                            speaker,
+                            spectral_balance_ratio,
+                            loudness_ratio,
+                            1,
+                            device))
+                    state = model.model.init_state(1, device)
+
+                # Generate
+                features = model.prepare_features(
+                    loudness[..., start:end],
+                    pitch[..., start:end],
+                    periodicity[..., start:end],
+                    ppg[..., start:end])
+                generated, state = model.model.step_frames(
+                    features,
+                    global_features,
+                    state,
+                    buffer)
+
+                # Copy out of the reused buffer
+                generated = generated[0].to(torch.float32, copy=True)
+
+        yield generated
+
+
+###############################################################################
+# Utilities
+###############################################################################
+
+
+def batch_indices(lengths: List[int], max_frames: int) -> List[List[int]]:
+    """Group indices into length-sorted batches under a padded frame budget
+
+    Each batch contains at least one item, so items longer than max_frames
+    are synthesized alone.
+    """
+    batches, batch = [], []
+    for index in sorted(range(len(lengths)), key=lambda i: lengths[i]):
+
+        # Indices are sorted, so the current item is the longest in the batch
+        if batch and lengths[index] * (len(batch) + 1) > max_frames:
+            batches.append(batch)
+            batch = []
+        batch.append(index)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def cached_model(
+    checkpoint: Optional[Union[str, os.PathLike]] = None,
+    device: torch.device = torch.device('cpu'),
+    quantize: bool = False,
+    backend: str = 'eager'
+) -> torch.nn.Module:
+    """Load the generator from the shared generator cache"""
+    return promonet.model.cache.generators(
+        checkpoint,
+        device,
+        quantize=quantize,
+        backend=backend)
+
+
+def format_global_features(
+    speaker,
+    spectral_balance_ratio,
+    loudness_ratio,
+    batch_size: int,
+    device: torch.device
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """Format per-item or shared speakers and ratios as batched tensors"""
+    # Specify speaker
+    if promonet.ZERO_SHOT:
+        speakers = speaker.to(device)
+    else:
+        speakers = torch.as_tensor(
+            speaker,
+            dtype=torch.long,
+            device=device
+        ).expand(batch_size)
+
+    # Format ratio
+    spectral_balance_ratio = torch.as_tensor(
+        spectral_balance_ratio,
+        dtype=torch.float,
+        device=device
+    ).expand(batch_size)
+
+    # Loudness ratio
+    loudness_ratio = torch.as_tensor(
+        loudness_ratio,
+        dtype=torch.float,
+        device=device
+    ).expand(batch_size)
+
+    return speakers, spectral_balance_ratio, loudness_ratio
+
+
+def pad(features: torch.Tensor, length: int) -> torch.Tensor:
+    """Right-pad features to length by replicating the final frame"""
+    if features.shape[-1] == length:
+        return features
+    return torch.nn.functional.pad(
+        features,
+        (0, length - features.shape[-1]),
+        mode='replicate')
+
+
+def per_file(value, count: int) -> list:
+    """Expand a value shared by all files to one value per file"""
+    if isinstance(value, (int, float)):
+        return [value] * count
+    return list(value)
+
+
+def worker_initialize(
+    checkpoint: Optional[Union[str, os.PathLike]],
+    threads: int,
+    quantize: bool = False,
+    backend: str = 'eager'
+) -> None:
+    """Set intra-op threads and load the generator in a worker process"""
+    torch.set_num_threads(threads)
+    cached_model(checkpoint, quantize=quantize, backend=backend)
+
+
+def worker_synthesize(item, **kwargs) -> None:
+    """Synthesize one file in a worker process"""
+    from_file_to_file(*item, **kwargs)
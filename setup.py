@@ -35,6 +35,7 @@ setup(
         'vocos[train]',
         'yapecs',
     ],
+    extras_require={'onnx': ['onnx', 'onnxruntime']},
     packages=find_packages(),
     package_data={'promonet': ['assets/*', 'assets/*/*', 'assets/*/*/*']},
     long_description=long_description,
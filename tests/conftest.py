@@ -0,0 +1,25 @@
+import pytest
+import torch
+import torchutil
+
+import promonet
+
+
+###############################################################################
+# Test fixtures
+###############################################################################
+
+
+@pytest.fixture(scope='session')
+def checkpoint(tmp_path_factory):
+    """Save a randomly initialized generator checkpoint"""
+    torch.manual_seed(promonet.RANDOM_SEED)
+    model = promonet.model.Generator()
+    file = tmp_path_factory.mktemp('checkpoints') / 'generator-00000000.pt'
+    torchutil.checkpoint.save(
+        file,
+        model,
+        torch.optim.AdamW(model.parameters()),
+        step=0,
+        epoch=0)
+    return file
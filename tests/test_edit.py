@@ -0,0 +1,27 @@
+import ppgs
+import pytest
+import torch
+
+import promonet
+
+
+###############################################################################
+# Test editing
+###############################################################################
+
+
+@pytest.mark.parametrize('ratio', [.5, .8, 1.25])
+def test_from_selection(ratio):
+    """Selective time-stretch grids match the original per-frame loop"""
+    generator = torch.Generator().manual_seed(promonet.RANDOM_SEED)
+    ppg = promonet.benchmark.random_features(200, generator)[-1]
+    indices = torch.tensor([
+        ppgs.PHONEME_TO_INDEX_MAPPING[phoneme] for phoneme in ppgs.VOICED])
+    selected = ppg[indices].sum(dim=0)
+
+    expected = promonet.benchmark.grid.reference(selected, ratio)
+    actual = promonet.edit.grid.from_selection(selected, ratio)
+
+    # The original loop accumulates steps in single precision
+    assert actual.shape == expected.shape
+    assert torch.allclose(actual, expected, rtol=0., atol=1e-2)
@@ -0,0 +1,50 @@
+import torch
+
+import promonet
+
+
+###############################################################################
+# Test FARGAN
+###############################################################################
+
+
+def test_step_frames(monkeypatch):
+    """Frame-by-frame streaming matches generating all frames at once"""
+    monkeypatch.setattr(
+        promonet,
+        'NUM_PREVIOUS_SAMPLES',
+        promonet.HOPSIZE * promonet.FARGAN_PREVIOUS_FRAMES)
+    generator = torch.Generator().manual_seed(promonet.RANDOM_SEED)
+    torch.manual_seed(promonet.RANDOM_SEED)
+    num_features, global_channels, frames = 32, 16, 20
+    model = promonet.model.FARGAN(num_features, global_channels).eval()
+
+    # Random features followed by pitch periods
+    features = torch.randn((1, num_features, frames), generator=generator)
+    pitch = (
+        (promonet.FMAX - promonet.FMIN) *
+        torch.rand((1, 1, frames), generator=generator) +
+        promonet.FMIN)
+    features = torch.cat((features, promonet.SAMPLE_RATE / pitch), dim=1)
+    global_features = torch.randn(
+        (1, global_channels, 1),
+        generator=generator)
+
+    with torch.inference_mode():
+
+        # Generate all frames at once
+        expected = model(features, global_features, model.init_state()[0])
+
+        # Generate frame by frame
+        state, blocks = model.init_state(), []
+        for i in range(frames):
+            generated, state = model.step_frames(
+                features[..., i:i + 1],
+                global_features,
+                state)
+            blocks.append(generated.clone())
+        actual = torch.cat(blocks, dim=-1)
+
+    # Frames differ only by floating-point error
+    assert actual.shape == expected.shape
+    assert torch.allclose(actual, expected, atol=1e-5)
@@ -0,0 +1,27 @@
+import torch
+
+import promonet
+
+
+###############################################################################
+# Test generator
+###############################################################################
+
+
+def test_prepare_features_band_averaged_loudness():
+    """Band-averaged and full-resolution loudness prepare identically"""
+    generator = torch.Generator().manual_seed(promonet.RANDOM_SEED)
+    loudness, pitch, periodicity, ppg = promonet.benchmark.random_inputs(
+        100,
+        generator=generator)[:4]
+    model = promonet.model.Generator()
+
+    # Full-resolution loudness
+    expected = model.prepare_features(loudness, pitch, periodicity, ppg)
+
+    # Loudness averaged into promonet.LOUDNESS_BANDS bands
+    averaged = promonet.preprocess.loudness.band_average(loudness)
+    assert averaged.shape[-2] == promonet.LOUDNESS_BANDS
+    actual = model.prepare_features(averaged, pitch, periodicity, ppg)
+
+    assert torch.allclose(expected, actual)
@@ -0,0 +1,28 @@
+import torch
+
+import promonet
+
+
+###############################################################################
+# Test speaker embedding
+###############################################################################
+
+
+def test_infer_batched():
+    """Length-batched speaker embeddings match per-file embeddings"""
+    generator = torch.Generator().manual_seed(promonet.RANDOM_SEED)
+    sample_rate = promonet.preprocess.speaker.WAVLM_SAMPLE_RATE
+
+    # Files of similar duration, as grouped by from_files_to_files
+    audio = [
+        .1 * torch.randn(int(seconds * sample_rate), generator=generator)
+        for seconds in [1., 1.1, 1.25]]
+
+    expected = torch.cat([
+        promonet.preprocess.speaker.infer(item) for item in audio])
+    actual = promonet.preprocess.speaker.infer(audio)
+
+    # Padding is masked from attention and pooling, but the group-normalized
+    # convolutional feature encoder still sees it
+    assert actual.shape == expected.shape
+    assert torch.allclose(actual, expected, rtol=0., atol=1e-2)
@@ -0,0 +1,73 @@
+import torch
+import torchaudio
+
+import promonet
+
+
+###############################################################################
+# Test synthesis
+###############################################################################
+
+
+def test_from_features_streaming(checkpoint):
+    """Concatenated streaming blocks match full-sequence synthesis"""
+    generator = torch.Generator().manual_seed(promonet.RANDOM_SEED)
+    features = promonet.benchmark.random_features(300, generator)
+
+    # Full-sequence synthesis
+    expected = promonet.synthesize.from_features(
+        *features,
+        checkpoint=checkpoint)
+
+    # Streaming synthesis
+    actual = torch.cat(
+        list(promonet.synthesize.from_features_streaming(
+            *features,
+            checkpoint=checkpoint,
+            block_frames=64)),
+        dim=-1)
+
+    # Blocks differ only by floating-point error
+    assert actual.shape == expected.shape
+    assert torch.allclose(actual, expected, atol=1e-4)
+
+
+def test_from_files_to_files_batched(checkpoint, tmp_path):
+    """Batched synthesis matches synthesizing each file separately"""
+    generator = torch.Generator().manual_seed(promonet.RANDOM_SEED)
+    *files, output_files, speakers, _ = promonet.benchmark.random_files(
+        tmp_path,
+        4,
+        20,
+        200,
+        generator)
+    spectral_balance_ratios = [.8, .9, 1.1, 1.2]
+    loudness_ratios = [1.2, 1.1, .9, .8]
+
+    # Synthesize each file separately
+    per_file_files = [
+        file.parent / f'{file.stem}-per-file.wav' for file in output_files]
+    promonet.synthesize.from_files_to_files(
+        *files,
+        per_file_files,
+        speakers,
+        spectral_balance_ratios,
+        loudness_ratios,
+        checkpoint=checkpoint)
+
+    # Synthesize in one batch
+    promonet.synthesize.from_files_to_files(
+        *files,
+        output_files,
+        speakers,
+        spectral_balance_ratios,
+        loudness_ratios,
+        checkpoint=checkpoint,
+        max_frames=4 * 200)
+
+    # Outputs differ only by floating-point error
+    for expected_file, actual_file in zip(per_file_files, output_files):
+        expected, _ = torchaudio.load(expected_file)
+        actual, _ = torchaudio.load(actual_file)
+        assert actual.shape == expected.shape
+        assert torch.allclose(actual, expected, atol=1e-4)